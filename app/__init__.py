@@ -3,6 +3,8 @@ This package contains the implementation of a factory
 function to create and configure a Flask app.
 """
 
+from typing import Any
+
 from flask import Flask
 from flask_bootstrap import Bootstrap5
 from flask_login import LoginManager
@@ -12,6 +14,8 @@ from sqlalchemy import MetaData
 
 from config import ENABLED_FOR_DEV, Config
 
+from .branches import BranchSession, init_branches
+
 # pylint: disable=fixme,import-outside-toplevel
 
 bootstrap = Bootstrap5()
@@ -24,39 +28,59 @@ db = SQLAlchemy(
             "fk": "fk_%(table_name)s_%(column_0_name)s_%(referred_table_name)s",
             "pk": "pk_%(table_name)s",
         }
-    )
+    ),
+    session_options={"class_": BranchSession},
 )
 login_manager = LoginManager()
 login_manager.login_view = "auth.login_get"
 migrate = Migrate()
 
-if ENABLED_FOR_DEV:
-    from flask_debugtoolbar import DebugToolbarExtension
-
-    toolbar = DebugToolbarExtension()
 
-
-def create_app() -> Flask:
-    """Create and configure a Flask application."""
+def create_app(config: dict[str, Any] | None = None) -> Flask:
+    """
+    Create and configure a Flask application.
+    Values in config, if given, override the default configuration.
+    """
     app = Flask(__name__)
-    app.config.from_object(Config)
+    app.config.from_object(Config())
+    if config is not None:
+        app.config.update(config)
 
     # TODO: improve extension initialization
     bootstrap.init_app(app)
     db.init_app(app)
     login_manager.init_app(app)
     migrate.init_app(app, db)
+    init_branches(app)
+
+    from .slow_queries import init_slow_query_log
+
+    init_slow_query_log(app)
+
+    from .fan_out import init_fan_out
+
+    init_fan_out(app)
+
+    # compression is registered before the toolbar, so it runs after it
+    from .assets import init_assets
+
+    init_assets(app)
 
     if ENABLED_FOR_DEV:
-        toolbar.init_app(app)
+        # the toolbar is a development dependency, it is only imported when used
+        from flask_debugtoolbar import DebugToolbarExtension
+
+        DebugToolbarExtension(app)
 
     # TODO: improve blueprint registration
     from .admin import admin as admin_blueprint
+    from .api import api as api_blueprint
     from .auth import auth as auth_blueprint
     from .main import main as main_blueprint
 
     app.register_blueprint(main_blueprint)
     app.register_blueprint(auth_blueprint, url_prefix="/auth")
     app.register_blueprint(admin_blueprint, url_prefix="/admin")
+    app.register_blueprint(api_blueprint, url_prefix="/api")
 
     return app
@@ -8,4 +8,14 @@ from flask import Blueprint
 
 admin = Blueprint("admin", __name__)
 
-from . import views  # pylint: disable=wrong-import-position
+from . import (  # pylint: disable=wrong-import-position
+    branches,
+    deletion,
+    discounts,
+    families,
+    filters,
+    profiles,
+    receipts,
+    reminders,
+    views,
+)
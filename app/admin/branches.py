@@ -0,0 +1,36 @@
+"""
+This module scopes the requests of `admin` blueprint to the branch of the
+logged in user, and contains the command to create a branch, e.g. `flask
+admin create-branch north "North Campus"`.
+"""
+
+import click
+from flask import current_app
+from flask_login import current_user
+
+from .. import db
+from ..branches import set_branch
+from ..models import Branch
+from . import admin
+
+
+@admin.before_request
+def scope_to_branch() -> None:
+    """Scope the queries of the request to the branch of the logged in user."""
+    if not current_user.is_authenticated or current_user.branch_id is None:
+        return
+    code = None
+    if current_app.config["BRANCH_DATABASES"]:
+        code = current_user.branch.code
+    set_branch(current_user.branch_id, code)
+
+
+@admin.cli.command("create-branch")
+@click.argument("code")
+@click.argument("name")
+def create_branch_command(code: str, name: str) -> None:
+    """Create a branch of the school."""
+    branch = Branch(code=code, name=name)
+    db.session.add(branch)
+    db.session.commit()
+    click.echo(f"Created branch {branch.code} with id {branch.id}.")
@@ -0,0 +1,143 @@
+"""
+This module contains view functions associated with `admin` blueprint to
+delete representatives, classes and cycles, after showing what the
+deletion does to the rows depending on them.
+"""
+
+from flask import flash, redirect, render_template, url_for
+from flask.wrappers import Response
+from flask_login import login_required
+from sqlalchemy import select
+from sqlalchemy.exc import IntegrityError
+
+from .. import db
+from ..deletion import (
+    class_impact,
+    cycle_impact,
+    detach_students,
+    representative_impact,
+)
+from ..models import Class, Cycle, Representative, Student
+from . import admin
+from .forms import DeleteForm
+
+
+@admin.get("/representative/delete/<int:representative_id>")
+@login_required
+def delete_representative_get(representative_id: int) -> str:
+    """
+    View function for "/representative/delete/<int:representative_id>"
+    when the method is GET.
+    """
+    representative = db.one_or_404(
+        select(Representative).where(Representative.id == representative_id)
+    )
+    return render_template(
+        "admin/delete.html.jinja",
+        kind="Representative",
+        name=str(representative),
+        impact=representative_impact(representative_id),
+        form=DeleteForm(),
+        action=url_for(
+            "admin.delete_representative", representative_id=representative_id
+        ),
+        cancel=url_for("admin.representative_table"),
+    )
+
+
+@admin.post("/representative/delete/<int:representative_id>")
+@login_required
+def delete_representative(representative_id: int) -> Response:
+    """
+    View function for "/representative/delete/<int:representative_id>"
+    when the method is POST.
+    """
+    representative = db.one_or_404(
+        select(Representative).where(Representative.id == representative_id)
+    )
+
+    session = db.session
+    detach_students(
+        Student.representative_id, Student.representative_id == representative_id
+    )
+    session.delete(representative)
+    session.commit()
+
+    flash("Representative was deleted succesfully!", "primary")
+
+    return redirect(url_for("admin.representative_table"))
+
+
+@admin.get("/cycle/delete/<int:cycle_id>")
+@login_required
+def delete_cycle_get(cycle_id: int) -> str:
+    """View function for "/cycle/delete/<int:cycle_id>" when the method is GET."""
+    cycle = db.one_or_404(select(Cycle).where(Cycle.id == cycle_id))
+    return render_template(
+        "admin/delete.html.jinja",
+        kind="Cycle",
+        name=f"{cycle.month.value} {cycle.year}",
+        impact=cycle_impact(cycle_id),
+        form=DeleteForm(),
+        action=url_for("admin.delete_cycle", cycle_id=cycle_id),
+        cancel=url_for("admin.cycle_table"),
+    )
+
+
+@admin.post("/cycle/delete/<int:cycle_id>")
+@login_required
+def delete_cycle(cycle_id: int) -> Response:
+    """View function for "/cycle/delete/<int:cycle_id>" when the method is POST."""
+    cycle = db.one_or_404(select(Cycle).where(Cycle.id == cycle_id))
+
+    session = db.session
+    try:
+        detach_students(
+            Student.class_id,
+            Student.class_id.in_(select(Class.id).where(Class.cycle_id == cycle_id)),
+        )
+        session.delete(cycle)
+        session.commit()
+    except IntegrityError:
+        session.rollback()
+        flash("Cycles with payments cannot be deleted, archive them.", "danger")
+        return redirect(url_for("admin.cycle_table"))
+
+    flash("Cycle was deleted succesfully!", "primary")
+
+    return redirect(url_for("admin.cycle_table"))
+
+
+@admin.get("/class/delete/<int:class_id>")
+@login_required
+def delete_class_get(class_id: int) -> str:
+    """View function for "/class/delete/<int:class_id>" when the method is GET."""
+    class_ = db.one_or_404(select(Class).where(Class.id == class_id))
+    return render_template(
+        "admin/delete.html.jinja",
+        kind="Class",
+        name=(
+            f"{class_.level.value}{class_.sub_level.value} {class_.mode.value} "
+            f"{class_.start_at:%H:%M}-{class_.end_at:%H:%M}"
+        ),
+        impact=class_impact(class_id),
+        form=DeleteForm(),
+        action=url_for("admin.delete_class", class_id=class_id),
+        cancel=url_for("admin.class_table"),
+    )
+
+
+@admin.post("/class/delete/<int:class_id>")
+@login_required
+def delete_class(class_id: int) -> Response:
+    """View function for "/class/delete/<int:class_id>" when the method is POST."""
+    class_ = db.one_or_404(select(Class).where(Class.id == class_id))
+
+    session = db.session
+    detach_students(Student.class_id, Student.class_id == class_id)
+    session.delete(class_)
+    session.commit()
+
+    flash("Class was deleted succesfully!", "primary")
+
+    return redirect(url_for("admin.class_table"))
@@ -0,0 +1,38 @@
+"""
+This module contains the view function associated with `admin` blueprint
+to apply the sibling discounts of a cycle to its payments, and the command
+to do it when a cycle closes, e.g. `flask admin apply-discounts CYCLE_ID`.
+"""
+
+import click
+from flask import current_app, flash, redirect, url_for
+from flask.wrappers import Response
+from flask_login import login_required
+from sqlalchemy import select
+
+from .. import db
+from ..discounts import apply_sibling_discounts
+from ..models import Cycle
+from . import admin
+
+
+@admin.post("/cycle/<int:cycle_id>/discounts")
+@login_required
+def apply_discounts_post(cycle_id: int) -> Response:
+    """View function for "/cycle/<int:cycle_id>/discounts" when method is POST."""
+    cycle = db.one_or_404(select(Cycle).where(Cycle.id == cycle_id))
+    applied = apply_sibling_discounts(cycle.id, current_app.config["SIBLING_DISCOUNTS"])
+    flash(
+        f"Sibling discounts were applied to {applied} payments succesfully!", "primary"
+    )
+    return redirect(url_for("admin.cycle_table"))
+
+
+@admin.cli.command("apply-discounts")
+@click.argument("cycle_id", type=int)
+def apply_discounts_command(cycle_id: int) -> None:
+    """Apply the sibling discounts of a cycle to its payments."""
+    if db.session.get(Cycle, cycle_id) is None:
+        raise click.BadParameter("Cycle does not exist.", param_hint="CYCLE_ID")
+    applied = apply_sibling_discounts(cycle_id, current_app.config["SIBLING_DISCOUNTS"])
+    click.echo(f"Applied sibling discounts to {applied} payments.")
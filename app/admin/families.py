@@ -0,0 +1,34 @@
+"""
+This module contains the view function associated with `admin` blueprint
+to show the family of a representative.
+"""
+
+from flask import render_template
+from flask_login import login_required
+from sqlalchemy import select
+
+from .. import db
+from ..families import family_students, paid_amounts, recent_cycles
+from ..models import Representative
+from . import admin
+
+
+@admin.get("/representative/<int:representative_id>")
+@login_required
+def representative_view(representative_id: int) -> str:
+    """View function for "/representative/<int:representative_id>" when GET."""
+    representative = db.one_or_404(
+        select(Representative).where(Representative.id == representative_id)
+    )
+    students = family_students(representative_id)
+    cycles = recent_cycles()
+    paid = paid_amounts(
+        [student.id for student in students.items], [cycle.id for cycle in cycles]
+    )
+    return render_template(
+        "admin/representative/representative.html.jinja",
+        representative=representative,
+        students=students,
+        cycles=cycles,
+        paid=paid,
+    )
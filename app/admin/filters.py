@@ -0,0 +1,24 @@
+"""
+This module contains template filters registered by `admin` blueprint.
+"""
+
+from functools import lru_cache
+
+from sqlalchemy_utils import PhoneNumber
+
+from ..models import Student
+from . import admin
+
+PHONE_NUMBER_REGION = Student.__table__.c.phone_number.type.region
+
+
+@admin.app_template_filter("phone_number")
+@lru_cache(maxsize=4096)
+def format_phone_number(e164: str | None) -> str:
+    """
+    Return a phone number stored in E.164 format as PhoneNumber displays
+    it. Results are memoized, so a table parses each number at most once.
+    """
+    if not e164:
+        return ""
+    return PhoneNumber(e164, PHONE_NUMBER_REGION).national
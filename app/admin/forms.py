@@ -1,5 +1,6 @@
 """This module contains forms for `admin` blueprint."""
 
+import datetime
 from typing import Any
 
 from flask_wtf import FlaskForm
@@ -12,14 +13,23 @@ from wtforms import (
     EmailField,
     IntegerField,
     SelectField,
+    SelectMultipleField,
     StringField,
     SubmitField,
     TelField,
     TextAreaField,
 )
-from wtforms.validators import Email, InputRequired, NumberRange
+from wtforms.validators import (
+    DataRequired,
+    Email,
+    InputRequired,
+    Length,
+    NumberRange,
+    ValidationError,
+)
 
 from .. import db
+from ..assets import icon
 from ..models import (
     Class,
     Cycle,
@@ -31,26 +41,88 @@ from ..models import (
     Student,
     SubLevel,
 )
+from ..rollover import PromotionRule
 
 
-class DeleteButtonWidget:  # pylint: disable=too-few-public-methods
-    """This class represents a custom delete button widget."""
+def strip_or_none(value: str | None) -> str | None:
+    """Return value stripped, or None when it is blank."""
+    return value.strip() or None if value else None
+
+
+class IconButtonWidget:  # pylint: disable=too-few-public-methods
+    """This class represents a custom button widget displaying an icon."""
+
+    icon = "question"
 
     def __call__(self, field: SubmitField, **kwargs: Any) -> Markup:
         style = "padding: 0;border: none;background:none;"
         html = (
             f'<button id={field.name} class="text-dark" style="{style}">'
-            '<i class="bi bi-trash3"></i></button>'
+            f"{icon(self.icon)}</button>"
         )
         return Markup(html)
 
 
+class DeleteButtonWidget(IconButtonWidget):  # pylint: disable=too-few-public-methods
+    """This class represents a custom delete button widget."""
+
+    icon = "trash"
+
+
+class ArchiveButtonWidget(IconButtonWidget):  # pylint: disable=too-few-public-methods
+    """This class represents a custom archive button widget."""
+
+    icon = "archive"
+
+
+class RestoreButtonWidget(IconButtonWidget):  # pylint: disable=too-few-public-methods
+    """This class represents a custom restore button widget."""
+
+    icon = "box-arrow-up"
+
+
+class ReminderButtonWidget(IconButtonWidget):  # pylint: disable=too-few-public-methods
+    """This class represents a custom payment reminder button widget."""
+
+    icon = "envelope"
+
+
+class DiscountButtonWidget(IconButtonWidget):  # pylint: disable=too-few-public-methods
+    """This class represents a custom sibling discount button widget."""
+
+    icon = "percent"
+
+
 class DeleteForm(FlaskForm):
     """This class represents a form to delete instances."""
 
     delete = SubmitField(widget=DeleteButtonWidget())
 
 
+class ArchiveForm(FlaskForm):
+    """This class represents a form to archive a cycle."""
+
+    archive = SubmitField(widget=ArchiveButtonWidget())
+
+
+class RestoreForm(FlaskForm):
+    """This class represents a form to restore an archived cycle."""
+
+    restore = SubmitField(widget=RestoreButtonWidget())
+
+
+class ReminderForm(FlaskForm):
+    """This class represents a form to remind the unpaid students of a cycle."""
+
+    remind = SubmitField(widget=ReminderButtonWidget())
+
+
+class DiscountForm(FlaskForm):
+    """This class represents a form to apply the sibling discounts of a cycle."""
+
+    apply = SubmitField(widget=DiscountButtonWidget())
+
+
 class RepresentativeFormMixin(FlaskForm):
     """This class is a mixin form for a representative."""
 
@@ -151,6 +223,33 @@ class StudentEditForm(StudentFormMixin):
     submit = SubmitField("Save")
 
 
+class StudentBulkForm(FlaskForm):
+    """This class represents a form to apply an action to several students."""
+
+    student_ids = SelectMultipleField(
+        "Students", coerce=int, validate_choice=False, validators=[DataRequired()]
+    )
+    class_ = SelectField("Class", default="")
+    assign = SubmitField("Move to class")
+    detach = SubmitField("Detach from class")
+    delete = SubmitField("Delete")
+
+    def __init__(self) -> None:
+        super().__init__()
+        class_choices = [("", "---")]
+        class_choices.extend(
+            [
+                (class_.id, str(class_))
+                for class_ in (
+                    db.session.execute(select(Class).order_by(Class.created_at.desc()))
+                    .scalars()
+                    .all()
+                )
+            ]
+        )
+        self.class_.choices = class_choices
+
+
 class CycleForm(FlaskForm):
     """This class represents a form to create a cycle."""
 
@@ -179,6 +278,39 @@ class CycleForm(FlaskForm):
     submit = SubmitField("Create")
 
 
+class RolloverForm(FlaskForm):
+    """This class represents a form to roll a cycle over into another cycle."""
+
+    source = SelectField("From Cycle", validators=[InputRequired()])
+    target = SelectField("To Cycle", validators=[InputRequired()])
+    rule = SelectField(
+        "Promotion Rule",
+        choices=[
+            (PromotionRule.KEEP.name, PromotionRule.KEEP.value),
+            (PromotionRule.PROMOTE.name, PromotionRule.PROMOTE.value),
+        ],
+        validators=[InputRequired()],
+    )
+    preview = SubmitField("Preview")
+    confirm = SubmitField("Roll Over")
+
+    def __init__(self) -> None:
+        super().__init__()
+        cycle_choices = [("", "---")]
+        cycle_choices.extend(
+            [
+                (cycle.id, str(cycle))
+                for cycle in (
+                    db.session.execute(select(Cycle).order_by(Cycle.created_at.desc()))
+                    .scalars()
+                    .all()
+                )
+            ]
+        )
+        self.source.choices = cycle_choices
+        self.target.choices = cycle_choices
+
+
 class ClassFormMixin(FlaskForm):
     """This class is a mixin form for a class for students."""
 
@@ -193,6 +325,10 @@ class ClassFormMixin(FlaskForm):
     )
     start_at = DateTimeField("Start At", format="%H:%M", validators=[InputRequired()])
     end_at = DateTimeField("End At", format="%H:%M", validators=[InputRequired()])
+    room = StringField("Room", filters=[strip_or_none], validators=[Length(max=64)])
+    teacher = StringField(
+        "Teacher", filters=[strip_or_none], validators=[Length(max=255)]
+    )
     cycle = SelectField("Cycle", validators=[InputRequired()])
     level = SelectField(
         "Level",
@@ -231,6 +367,15 @@ class ClassFormMixin(FlaskForm):
         )
         self.cycle.choices = cycle_choices
 
+    def validate_end_at(self, field: DateTimeField) -> None:
+        """Check the class ends after it starts."""
+        if (
+            self.start_at.data is not None
+            and field.data is not None
+            and field.data <= self.start_at.data
+        ):
+            raise ValidationError("End At must be after Start At.")
+
 
 class ClassCreateForm(ClassFormMixin):
     """This class represents a form to create a class for students."""
@@ -244,6 +389,16 @@ class ClassEditForm(ClassFormMixin):
     submit = SubmitField("Save")
 
 
+class AttendanceForm(FlaskForm):
+    """This class represents a form to record the attendance of a class."""
+
+    session_date = DateField(
+        "Session Date", default=datetime.date.today, validators=[InputRequired()]
+    )
+    present = SelectMultipleField("Present", coerce=int, validate_choice=False)
+    submit = SubmitField("Save")
+
+
 class PaymentForm(FlaskForm):
     """This class represents a form to create a payment."""
 
@@ -0,0 +1,50 @@
+"""
+This module contains view functions associated with `admin` blueprint to
+browse request profiles, and registers the on-demand profiler on the app.
+"""
+
+from flask import abort, current_app, render_template, send_from_directory
+from flask.wrappers import Response
+from flask_login import login_required
+
+from ..profiler import (
+    finish_profile,
+    list_profiles,
+    load_profile,
+    profile_folder,
+    start_profile,
+    tag_response,
+)
+from . import admin
+
+admin.before_app_request(start_profile)
+admin.after_app_request(tag_response)
+admin.teardown_app_request(finish_profile)
+
+
+@admin.get("/profile")
+@login_required
+def profile_table() -> str:
+    """View function for "/profile" route when method is GET."""
+    profiles = list_profiles(profile_folder(current_app))
+    return render_template("admin/profile/table-view.html.jinja", profiles=profiles)
+
+
+@admin.get("/profile/<profile_id>")
+@login_required
+def profile_view(profile_id: str) -> str:
+    """View function for "/profile/<profile_id>" route when method is GET."""
+    profile = load_profile(profile_folder(current_app), profile_id)
+    if profile is None:
+        abort(404)
+    return render_template("admin/profile/profile.html.jinja", profile=profile)
+
+
+@admin.get("/profile/<profile_id>/download")
+@login_required
+def download_profile(profile_id: str) -> Response:
+    """View function for "/profile/<profile_id>/download" route when method is GET."""
+    folder = profile_folder(current_app)
+    if load_profile(folder, profile_id) is None:
+        abort(404)
+    return send_from_directory(folder, f"{profile_id}.prof", as_attachment=True)
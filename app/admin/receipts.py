@@ -0,0 +1,61 @@
+"""
+This module contains view functions associated with `admin` blueprint to
+download payment receipts, one at a time or every receipt of a cycle.
+"""
+
+from flask import abort, current_app, send_file, stream_with_context
+from flask.wrappers import Response
+from flask_login import login_required
+from sqlalchemy import select
+
+from .. import db
+from ..models import Cycle, Payment
+from ..receipts import (
+    build_receipts,
+    get_receipt,
+    receipt_data,
+    receipt_folder,
+    stream_zip,
+)
+from . import admin
+
+
+@admin.get("/payment/<int:payment_id>/receipt")
+@login_required
+def payment_receipt(payment_id: int) -> Response:
+    """View function for "/payment/<int:payment_id>/receipt" when method is GET."""
+    receipts = receipt_data(Payment.id == payment_id)
+    if not receipts:
+        abort(404)
+    path = get_receipt(receipt_folder(current_app), receipts[0])
+    return send_file(
+        path,
+        mimetype="application/pdf",
+        download_name=f"receipt-{payment_id}.pdf",
+    )
+
+
+@admin.get("/cycle/<int:cycle_id>/receipts")
+@login_required
+def cycle_receipts(cycle_id: int) -> Response:
+    """View function for "/cycle/<int:cycle_id>/receipts" when method is GET."""
+    cycle: Cycle = db.one_or_404(select(Cycle).where(Cycle.id == cycle_id))
+    receipts = receipt_data(Payment.cycle_id == cycle_id)
+    paths = build_receipts(
+        receipt_folder(current_app),
+        receipts,
+        current_app.config["RECEIPT_PROCESSES"],
+    )
+    files = [
+        (f"receipt-{data.payment_id}.pdf", path) for data, path in zip(receipts, paths)
+    ]
+    return Response(
+        stream_with_context(stream_zip(files)),
+        mimetype="application/zip",
+        headers={
+            "Content-Disposition": (
+                f'attachment; filename="receipts-{cycle.month.value.lower()}'
+                f'-{cycle.year}.zip"'
+            )
+        },
+    )
@@ -0,0 +1,51 @@
+"""
+This module contains the view function associated with `admin` blueprint
+to queue the payment reminders of a cycle, and the commands to queue and
+send them, e.g. `flask admin send-reminders` from a scheduled job.
+"""
+
+import click
+from flask import current_app, flash, redirect, url_for
+from flask.wrappers import Response
+from flask_login import login_required
+from sqlalchemy import select
+
+from .. import db
+from ..models import Cycle, ReminderStatus
+from ..reminders import mailer_from_config, queue_reminders, send_reminders
+from . import admin
+
+
+@admin.post("/cycle/<int:cycle_id>/reminders")
+@login_required
+def remind_cycle_post(cycle_id: int) -> Response:
+    """View function for "/cycle/<int:cycle_id>/reminders" when method is POST."""
+    cycle = db.one_or_404(select(Cycle).where(Cycle.id == cycle_id))
+    queued = queue_reminders(cycle)
+    flash(f"{queued} payment reminders were queued succesfully!", "primary")
+    return redirect(url_for("admin.cycle_table"))
+
+
+@admin.cli.command("queue-reminders")
+@click.argument("cycle_id", type=int)
+def queue_reminders_command(cycle_id: int) -> None:
+    """Queue the payment reminders of the unpaid students of a cycle."""
+    cycle = db.session.get(Cycle, cycle_id)
+    if cycle is None:
+        raise click.BadParameter("Cycle does not exist.", param_hint="CYCLE_ID")
+    click.echo(f"Queued {queue_reminders(cycle)} payment reminders.")
+
+
+@admin.cli.command("send-reminders")
+def send_reminders_command() -> None:
+    """Send the payment reminders due over a single SMTP connection."""
+    config = current_app.config
+    with mailer_from_config(config) as mailer:
+        counts = send_reminders(
+            mailer, config["MAIL_BATCH_SIZE"], config["MAIL_MAX_ATTEMPTS"]
+        )
+    click.echo(
+        f"Sent {counts[ReminderStatus.SENT]}, "
+        f"failed {counts[ReminderStatus.FAILED]}, "
+        f"retrying {counts[ReminderStatus.PENDING]} payment reminders."
+    )
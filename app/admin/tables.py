@@ -0,0 +1,330 @@
+"""
+This module contains a reusable query layer for the table views of `admin`
+blueprint. Sorting and filtering are driven by query parameters, checked
+against a whitelist of columns and pushed into SQL.
+"""
+
+import datetime
+from dataclasses import dataclass, field
+from decimal import Decimal, InvalidOperation
+from typing import Any, Callable
+
+import sqlalchemy as sa
+from flask import abort
+from sqlalchemy import select
+from sqlalchemy.orm import defer, undefer
+from sqlalchemy.sql import Select
+from werkzeug.datastructures import MultiDict
+
+from .. import db
+from ..audit import AUDITED_MODELS
+from ..models import AuditEntry, Class, Cycle, Payment, Representative, Student, User
+
+Choices = list[tuple[str, str]]
+
+
+def is_indexed(attribute: Any) -> bool:
+    """
+    Whether the column of attribute is the leading column of the primary
+    key, a unique constraint or an index, so that sorting by it can be
+    served by an index. Queries are scoped to a branch, so the column after
+    `branch_id` in an index leading on it counts as leading too.
+    """
+    column = attribute.expression
+    if column.primary_key or column.index or column.unique:
+        return True
+    table = column.table
+    leading_columns = []
+    for index in table.indexes:
+        columns = index.columns.values()
+        leading_columns.append(columns[0])
+        if columns[0].name == "branch_id" and len(columns) > 1:
+            leading_columns.append(columns[1])
+    leading_columns.extend(
+        constraint.columns.values()[0]
+        for constraint in table.constraints
+        if isinstance(constraint, sa.UniqueConstraint)
+    )
+    return any(leading.name == column.name for leading in leading_columns)
+
+
+def parse(column: Any, value: str) -> Any:  # pylint: disable=too-many-return-statements
+    """Convert value, taken from a query parameter, to column's Python type."""
+    column_type = column.type
+    try:
+        if isinstance(column_type, sa.Enum):
+            return column_type.enum_class[value]
+        if isinstance(column_type, sa.Integer):
+            return int(value)
+        if isinstance(column_type, sa.Numeric):
+            return Decimal(value)
+        if isinstance(column_type, sa.DateTime):
+            return datetime.datetime.fromisoformat(value)
+        if isinstance(column_type, sa.Date):
+            return datetime.date.fromisoformat(value)
+        if isinstance(column_type, sa.Time):
+            return datetime.time.fromisoformat(value)
+    except (KeyError, ValueError, InvalidOperation):
+        abort(400)
+    return value
+
+
+@dataclass(frozen=True)
+class Filter:
+    """
+    This class represents a filter over a column. Equality filters read the
+    parameter named after the filter, range filters read `<name>_min` and
+    `<name>_max`.
+    """
+
+    name: str
+    label: str
+    column: Any
+    range: bool = False
+    choices: Callable[[], Choices] | None = None
+
+    @property
+    def parameters(self) -> list[str]:
+        """Query parameters read by the filter."""
+        if self.range:
+            return [f"{self.name}_min", f"{self.name}_max"]
+        return [self.name]
+
+    def options(self) -> Choices | None:
+        """Options a value can be picked from, if the filter has any."""
+        if self.choices is not None:
+            return self.choices()
+        if isinstance(self.column.type, sa.Enum):
+            return [
+                (member.name, member.value) for member in self.column.type.enum_class
+            ]
+        return None
+
+    @property
+    def input_type(self) -> str:
+        """Type of the HTML input used to enter a value of the filter."""
+        column_type = self.column.type
+        if isinstance(column_type, sa.Date):
+            return "date"
+        if isinstance(column_type, sa.Time):
+            return "time"
+        if isinstance(column_type, (sa.Integer, sa.Numeric)):
+            return "number"
+        return "text"
+
+    def clauses(self, args: MultiDict) -> list[sa.sql.ColumnElement]:
+        """Return the SQL conditions for the values of the filter in args."""
+        if not self.range:
+            value = args.get(self.name, "")
+            return [self.column == parse(self.column, value)] if value else []
+
+        clauses = []
+        minimum = args.get(f"{self.name}_min", "")
+        maximum = args.get(f"{self.name}_max", "")
+        if minimum:
+            clauses.append(self.column >= parse(self.column, minimum))
+        if maximum:
+            clauses.append(self.column <= parse(self.column, maximum))
+        return clauses
+
+
+@dataclass
+class TableState:
+    """This class represents the sorting and filtering applied to a table."""
+
+    table: "TableQuery"
+    sort: str
+    direction: str
+    values: dict[str, str]
+
+    @property
+    def filters(self) -> list[Filter]:
+        """Filters available for the table."""
+        return self.table.filters
+
+    @property
+    def sortable(self) -> list[str]:
+        """Names of the columns the table can be sorted by."""
+        return list(self.table.sortable)
+
+    def sort_args(self, name: str) -> dict[str, str]:
+        """
+        Return the query parameters to sort by name, keeping the filters.
+        Sorting again by the current column flips the direction.
+        """
+        direction = "asc"
+        if name == self.sort and self.direction == "asc":
+            direction = "desc"
+        return self.values | {"sort": name, "direction": direction}
+
+
+@dataclass
+class TableQuery:
+    """
+    This class represents the sorting and filtering allowed over the table
+    view of a model. Only indexed columns can be whitelisted for sorting,
+    which is checked when the table query is defined. Loader options are
+    applied to every statement, e.g. to skip columns the table does not show.
+    """
+
+    model: type
+    sortable: dict[str, Any]
+    filters: list[Filter] = field(default_factory=list)
+    options: list[Any] = field(default_factory=list)
+    default_sort: str = "created_at"
+    default_direction: str = "desc"
+
+    def __post_init__(self) -> None:
+        for name, column in self.sortable.items():
+            if not is_indexed(column):
+                raise ValueError(f"Sort column {name!r} is not indexed.")
+
+    def select(self, args: MultiDict) -> tuple[Select, TableState]:
+        """
+        Return a statement selecting the model sorted and filtered as
+        requested by args, along with the state of the table. A request
+        to sort by a column which is not whitelisted is aborted with 400.
+        """
+        sort = args.get("sort", self.default_sort)
+        direction = args.get("direction", self.default_direction)
+        if sort not in self.sortable or direction not in ("asc", "desc"):
+            abort(400)
+
+        column = self.sortable[sort]
+        order = column.asc() if direction == "asc" else column.desc()
+        statement = select(self.model).options(*self.options).order_by(order)
+        if sort != "id":
+            statement = statement.order_by(self.model.id.desc())
+
+        values = {}
+        for filter_ in self.filters:
+            statement = statement.where(*filter_.clauses(args))
+            values.update(
+                {name: args[name] for name in filter_.parameters if args.get(name)}
+            )
+
+        return statement, TableState(self, sort, direction, values)
+
+
+def cycle_choices() -> Choices:
+    """Return the cycles as filter options."""
+    cycles = db.session.execute(select(Cycle).order_by(Cycle.created_at.desc()))
+    return [(str(cycle.id), str(cycle)) for cycle in cycles.scalars()]
+
+
+def class_choices() -> Choices:
+    """Return the classes as filter options."""
+    classes = db.session.execute(select(Class).order_by(Class.created_at.desc()))
+    return [(str(class_.id), str(class_)) for class_ in classes.scalars()]
+
+
+def user_choices() -> Choices:
+    """Return the users as filter options."""
+    users = db.session.execute(select(User).order_by(User.first_name))
+    return [
+        (str(user.id), f"{user.first_name} {user.first_surname}")
+        for user in users.scalars()
+    ]
+
+
+def audited_table_choices() -> Choices:
+    """Return the audited tables as filter options."""
+    return [(model.__tablename__, model.__name__) for model in AUDITED_MODELS]
+
+
+student_table_query = TableQuery(
+    model=Student,
+    sortable={
+        "id": Student.id,
+        "created_at": Student.created_at,
+        "identity_document": Student.identity_document,
+        "first_surname": Student.first_surname,
+        "email": Student.email,
+    },
+    filters=[
+        Filter("sex", "Sex", Student.sex),
+        Filter("class_id", "Class", Student.class_id, choices=class_choices),
+        Filter("birth_date", "Birth Date", Student.birth_date, range=True),
+    ],
+    options=[
+        defer(Student.phone_number, raiseload=True),
+        undefer(Student.phone_number_e164),
+    ],
+)
+
+representative_table_query = TableQuery(
+    model=Representative,
+    sortable={
+        "id": Representative.id,
+        "created_at": Representative.created_at,
+        "identity_document": Representative.identity_document,
+        "first_surname": Representative.first_surname,
+    },
+    filters=[Filter("sex", "Sex", Representative.sex)],
+    options=[
+        defer(Representative.phone_number, raiseload=True),
+        undefer(Representative.phone_number_e164),
+    ],
+)
+
+cycle_table_query = TableQuery(
+    model=Cycle,
+    sortable={
+        "id": Cycle.id,
+        "created_at": Cycle.created_at,
+        "year": Cycle.year,
+        "start_date": Cycle.start_date,
+    },
+    filters=[
+        Filter("month", "Month", Cycle.month),
+        Filter("year", "Year", Cycle.year, range=True),
+    ],
+)
+
+class_table_query = TableQuery(
+    model=Class,
+    sortable={
+        "id": Class.id,
+        "created_at": Class.created_at,
+        "level": Class.level,
+        "cycle_id": Class.cycle_id,
+    },
+    filters=[
+        Filter("mode", "Mode", Class.mode),
+        Filter("level", "Level", Class.level),
+        Filter("sub_level", "Sub Level", Class.sub_level),
+        Filter("cycle_id", "Cycle", Class.cycle_id, choices=cycle_choices),
+        Filter("start_at", "Start At", Class.start_at, range=True),
+    ],
+)
+
+payment_table_query = TableQuery(
+    model=Payment,
+    sortable={
+        "id": Payment.id,
+        "created_at": Payment.created_at,
+        "cycle_id": Payment.cycle_id,
+        "student_id": Payment.student_id,
+    },
+    filters=[
+        Filter("cycle_id", "Cycle", Payment.cycle_id, choices=cycle_choices),
+        Filter("amount", "Amount", Payment.amount, range=True),
+    ],
+)
+
+audit_table_query = TableQuery(
+    model=AuditEntry,
+    sortable={
+        "id": AuditEntry.id,
+        "created_at": AuditEntry.created_at,
+    },
+    filters=[
+        Filter(
+            "table_name", "Table", AuditEntry.table_name, choices=audited_table_choices
+        ),
+        Filter("row_id", "Row ID", AuditEntry.row_id),
+        Filter("action", "Action", AuditEntry.action),
+        Filter("user_id", "User", AuditEntry.user_id, choices=user_choices),
+        Filter("created_at", "Date", AuditEntry.created_at, range=True),
+    ],
+)
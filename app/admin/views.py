@@ -2,48 +2,103 @@
 This module contains view functions associated with `admin` blueprint.
 """
 
-from flask import Response, flash, redirect, render_template, url_for
+import datetime
+
+from flask import (
+    Response,
+    current_app,
+    flash,
+    redirect,
+    render_template,
+    request,
+    url_for,
+)
 from flask_login import login_required
-from sqlalchemy import select
+from sqlalchemy import delete, select
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload
 
 from .. import db
-from ..models import Class, Cycle, Payment, Representative, Student
+from ..archive import ArchiveError, archive_cycle, restore_cycle
+from ..attendance import (
+    class_attendance_rate,
+    record_attendance,
+    roster,
+    student_attendance_rate,
+    student_attendance_rates,
+)
+from ..audit import buffer_entries, bulk_update, deleted_row_changes
+from ..dashboard import get_dashboard, get_stale_dashboard
+from ..discounts import sibling_discount
+from ..fan_out import FanOutError
+from ..models import (
+    ArchivedCycle,
+    AuditAction,
+    AuditEntry,
+    Class,
+    Cycle,
+    Payment,
+    Representative,
+    Student,
+)
+from ..rollover import PromotionRule, RolloverError, preview_rollover, rollover_cycle
+from ..schedule import ScheduleError, check_schedule, conflict_report
 from . import admin
 from .forms import (
+    ArchiveForm,
+    AttendanceForm,
     ClassCreateForm,
     ClassEditForm,
     CycleForm,
     DeleteForm,
+    DiscountForm,
     PaymentForm,
+    ReminderForm,
     RepresentativeCreateForm,
     RepresentativeEditForm,
+    RestoreForm,
+    RolloverForm,
+    StudentBulkForm,
     StudentCreateForm,
     StudentEditForm,
 )
+from .tables import (
+    audit_table_query,
+    class_table_query,
+    cycle_table_query,
+    payment_table_query,
+    representative_table_query,
+    student_table_query,
+)
 
 
 @admin.get("/")
 @login_required
 def index() -> str:
     """View function for "/admin" route when method is GET."""
-    return render_template("admin/index.html.jinja")
+    try:
+        dashboard = get_dashboard()
+    except FanOutError:
+        current_app.logger.exception("The dashboard could not be computed.")
+        dashboard = get_stale_dashboard()
+    return render_template("admin/index.html.jinja", dashboard=dashboard)
 
 
 @admin.get("/student")
 @login_required
 def student_table() -> str:
     """View function for "/student" route when method is GET."""
-    students = (
-        db.session.execute(select(Student).order_by(Student.created_at.desc()))
-        .scalars()
-        .all()
-    )
+    statement, table = student_table_query.select(request.args)
+    students = db.session.execute(statement).scalars().all()
     delete_form = DeleteForm()
+    bulk_form = StudentBulkForm()
 
     return render_template(
         "admin/student/table-view.html.jinja",
         students=students,
+        table=table,
         delete_form=delete_form,
+        bulk_form=bulk_form,
     )
 
 
@@ -110,11 +165,13 @@ def student_view(student_id: int) -> str:
     student = db.one_or_404(select(Student).where(Student.id == student_id))
     representative = student.representative
     class_ = student.class_
+    attendance = student_attendance_rate(student_id)
     return render_template(
         "admin/student/student.html.jinja",
         student=student,
         representative=representative,
         class_=class_,
+        attendance=attendance,
     )
 
 
@@ -190,22 +247,96 @@ def delete_student(student_id: int) -> Response:
     return redirect(url_for("admin.student_table"))
 
 
+def _move_students(student_ids: list[int], class_id: int | None) -> int:
+    """
+    Move students into a class, or detach them when class_id is None, with
+    one UPDATE which also returns their previous class for the audit trail.
+    Return the number of moved students.
+    """
+    session = db.session
+    moved = bulk_update(
+        session, Student.class_id, class_id, Student.id.in_(student_ids)
+    )
+    session.commit()
+    return moved
+
+
+@admin.post("/student/bulk/assign")
+@login_required
+def bulk_assign_students() -> Response:
+    """View function for "/student/bulk/assign" when the method is POST."""
+    form = StudentBulkForm()
+    if form.validate() and form.class_.data != "":
+        moved = _move_students(form.student_ids.data, int(form.class_.data))
+        flash(f"{moved} students were moved succesfully!", "success")
+        return redirect(url_for("admin.student_table"))
+
+    flash(form.errors or "A class must be selected.", "danger")
+
+    return redirect(url_for("admin.student_table"))
+
+
+@admin.post("/student/bulk/detach")
+@login_required
+def bulk_detach_students() -> Response:
+    """View function for "/student/bulk/detach" when the method is POST."""
+    form = StudentBulkForm()
+    if form.validate():
+        detached = _move_students(form.student_ids.data, None)
+        flash(f"{detached} students were detached succesfully!", "success")
+        return redirect(url_for("admin.student_table"))
+
+    if form.errors:
+        flash(form.errors, "danger")
+
+    return redirect(url_for("admin.student_table"))
+
+
+@admin.post("/student/bulk/delete")
+@login_required
+def bulk_delete_students() -> Response:
+    """View function for "/student/bulk/delete" when the method is POST."""
+    form = StudentBulkForm()
+    if form.validate():
+        session = db.session
+        try:
+            rows = session.execute(
+                delete(Student)
+                .where(Student.id.in_(form.student_ids.data))
+                .returning(*Student.__table__.columns)
+                .execution_options(synchronize_session=False)
+            ).all()
+            buffer_entries(
+                session,
+                Student,
+                AuditAction.DELETE,
+                {row.id: deleted_row_changes(row) for row in rows},
+            )
+            session.commit()
+        except IntegrityError:
+            session.rollback()
+            flash("Students with payments cannot be deleted.", "danger")
+            return redirect(url_for("admin.student_table"))
+
+        flash(f"{len(rows)} students were deleted succesfully!", "primary")
+        return redirect(url_for("admin.student_table"))
+
+    if form.errors:
+        flash(form.errors, "danger")
+
+    return redirect(url_for("admin.student_table"))
+
+
 @admin.get("/representative")
 @login_required
 def representative_table() -> str:
     """View function for "/representative" route when method is GET."""
-    representatives = (
-        db.session.execute(
-            select(Representative).order_by(Representative.created_at.desc())
-        )
-        .scalars()
-        .all()
-    )
-    delete_form = DeleteForm()
+    statement, table = representative_table_query.select(request.args)
+    representatives = db.session.execute(statement).scalars().all()
     return render_template(
         "admin/representative/table-view.html.jinja",
         representatives=representatives,
-        delete_form=delete_form,
+        table=table,
     )
 
 
@@ -315,38 +446,22 @@ def edit_representative_post(representative_id: int) -> Response:
     )
 
 
-@admin.post("/representative/delete/<int:representative_id>")
-@login_required
-def delete_representative(representative_id: int) -> Response:
-    """
-    View function for "/representative/delete/<int:representative_id>"
-    when the method is POST.
-    """
-    representative = db.one_or_404(
-        select(Representative).where(Representative.id == representative_id)
-    )
-
-    session = db.session
-    session.delete(representative)
-    session.commit()
-
-    flash("Representative was deleted succesfully!", "primary")
-
-    return redirect(url_for("admin.representative_table"))
-
-
 @admin.get("/cycle")
 @login_required
 def cycle_table() -> str:
     """View function for "/cycle" route when method is GET."""
-    cycles = (
-        db.session.execute(select(Cycle).order_by(Cycle.created_at.desc()))
-        .scalars()
-        .all()
-    )
-    delete_form = DeleteForm()
+    statement, table = cycle_table_query.select(request.args)
+    cycles = db.session.execute(statement).scalars().all()
+    archive_form = ArchiveForm()
+    reminder_form = ReminderForm()
+    discount_form = DiscountForm()
     return render_template(
-        "admin/cycle/table-view.html.jinja", cycles=cycles, delete_form=delete_form
+        "admin/cycle/table-view.html.jinja",
+        cycles=cycles,
+        table=table,
+        archive_form=archive_form,
+        reminder_form=reminder_form,
+        discount_form=discount_form,
     )
 
 
@@ -388,17 +503,109 @@ def create_cycle_post() -> Response:
     return redirect(url_for("admin.create_cycle_get"))
 
 
-@admin.post("/cycle/delete/<int:cycle_id>")
+@admin.post("/cycle/archive/<int:cycle_id>")
 @login_required
-def delete_cycle(cycle_id: int) -> Response:
-    """View function for "/cycle/delete/<int:cycle_id>" when the method is POST."""
-    cycle = db.one_or_404(select(Cycle).where(Cycle.id == cycle_id))
+def archive_cycle_post(cycle_id: int) -> Response:
+    """View function for "/cycle/archive/<int:cycle_id>" when the method is POST."""
+    try:
+        archive_cycle(cycle_id)
+    except ArchiveError as exc:
+        db.session.rollback()
+        flash(str(exc), "danger")
+        return redirect(url_for("admin.cycle_table"))
+
+    flash("Cycle was archived succesfully!", "primary")
+
+    return redirect(url_for("admin.cycle_table"))
+
+
+@admin.get("/cycle/rollover")
+@login_required
+def rollover_cycle_get() -> str:
+    """View function for "/cycle/rollover" when the method is GET."""
+    form = RolloverForm()
+    return render_template("admin/cycle/rollover.html.jinja", form=form, items=None)
 
-    session = db.session
-    session.delete(cycle)
-    session.commit()
 
-    flash("Cycle was deleted succesfully!", "primary")
+@admin.post("/cycle/rollover")
+@login_required
+def rollover_cycle_post() -> Response | str:
+    """
+    View function for "/cycle/rollover" when the method is POST.
+    The rollover is previewed unless the form was confirmed.
+    """
+    form = RolloverForm()
+    if form.validate():
+        source_id = int(form.source.data)
+        target_id = int(form.target.data)
+        rule = PromotionRule[form.rule.data]
+        try:
+            if not form.confirm.data:
+                items = preview_rollover(source_id, target_id, rule)
+                return render_template(
+                    "admin/cycle/rollover.html.jinja", form=form, items=items
+                )
+            count = rollover_cycle(source_id, target_id, rule)
+        except RolloverError as exc:
+            db.session.rollback()
+            flash(str(exc), "danger")
+            return redirect(url_for("admin.rollover_cycle_get"))
+
+        flash(f"{count} classes were rolled over succesfully!", "success")
+        return redirect(url_for("admin.class_table"))
+
+    if form.errors:
+        flash(form.errors, "danger")
+
+    return redirect(url_for("admin.rollover_cycle_get"))
+
+
+@admin.get("/archive")
+@login_required
+def archive_table() -> str:
+    """View function for "/archive" route when method is GET."""
+    cycles = (
+        db.session.execute(
+            select(ArchivedCycle).order_by(ArchivedCycle.archived_at.desc())
+        )
+        .scalars()
+        .all()
+    )
+    restore_form = RestoreForm()
+    return render_template(
+        "admin/archive/table-view.html.jinja",
+        cycles=cycles,
+        restore_form=restore_form,
+    )
+
+
+@admin.get("/archive/<int:cycle_id>")
+@login_required
+def archive_view(cycle_id: int) -> str:
+    """View function for "/archive/<int:cycle_id>" route when method is GET."""
+    cycle: ArchivedCycle = db.one_or_404(
+        select(ArchivedCycle).where(ArchivedCycle.id == cycle_id)
+    )
+    return render_template(
+        "admin/archive/cycle.html.jinja",
+        cycle=cycle,
+        classes=cycle.classes,
+        payments=cycle.payments,
+    )
+
+
+@admin.post("/archive/restore/<int:cycle_id>")
+@login_required
+def restore_cycle_post(cycle_id: int) -> Response:
+    """View function for "/archive/restore/<int:cycle_id>" when the method is POST."""
+    try:
+        restore_cycle(cycle_id)
+    except ArchiveError as exc:
+        db.session.rollback()
+        flash(str(exc), "danger")
+        return redirect(url_for("admin.archive_table"))
+
+    flash("Cycle was restored succesfully!", "primary")
 
     return redirect(url_for("admin.cycle_table"))
 
@@ -407,16 +614,33 @@ def delete_cycle(cycle_id: int) -> Response:
 @login_required
 def class_table() -> str:
     """View function for "/class" route when method is GET."""
-    classes = (
-        db.session.execute(select(Class).order_by(Class.created_at.desc()))
+    statement, table = class_table_query.select(request.args)
+    classes = db.session.execute(statement).scalars().all()
+    return render_template(
+        "admin/class/table-view.html.jinja",
+        classes=classes,
+        table=table,
+    )
+
+
+@admin.get("/class/conflicts")
+@login_required
+def class_conflicts() -> str:
+    """View function for "/class/conflicts" route when method is GET."""
+    cycles = (
+        db.session.execute(select(Cycle).order_by(Cycle.start_date.desc()))
         .scalars()
         .all()
     )
-    delete_form = DeleteForm()
+    cycle_id = request.args.get("cycle_id", type=int)
+    if cycle_id is None and cycles:
+        cycle_id = cycles[0].id
+    conflicts = conflict_report(cycle_id) if cycle_id is not None else []
     return render_template(
-        "admin/class/table-view.html.jinja",
-        classes=classes,
-        delete_form=delete_form,
+        "admin/class/conflicts.html.jinja",
+        cycles=cycles,
+        cycle_id=cycle_id,
+        conflicts=conflicts,
     )
 
 
@@ -435,11 +659,20 @@ def create_class_post() -> Response:
     form = ClassCreateForm()
     if form.validate():
         mode = form.mode.data
-        start_at = form.start_at.data
-        end_at = form.end_at.data
-        cycle_id = form.cycle.data
+        start_at = form.start_at.data.time()
+        end_at = form.end_at.data.time()
+        cycle_id = int(form.cycle.data)
         level = form.level.data
         sub_level = form.sub_level.data
+        room = form.room.data
+        teacher = form.teacher.data
+
+        try:
+            check_schedule(cycle_id, start_at, end_at, room, teacher)
+        except ScheduleError as exc:
+            db.session.rollback()
+            flash(str(exc), "danger")
+            return redirect(url_for("admin.create_class_get"))
 
         class_ = Class(
             mode=mode,
@@ -448,6 +681,8 @@ def create_class_post() -> Response:
             cycle_id=cycle_id,
             level=level,
             sub_level=sub_level,
+            room=room,
+            teacher=teacher,
         )
 
         session = db.session
@@ -469,11 +704,70 @@ def class_view(class_id: int) -> str:
     class_: Class = db.one_or_404(select(Class).where(Class.id == class_id))
     cycle = class_.cycle
     students = class_.students
+    attendance = class_attendance_rate(class_id)
+    student_attendance = student_attendance_rates(class_id)
     return render_template(
-        "admin/class/class.html.jinja", class_=class_, cycle=cycle, students=students
+        "admin/class/class.html.jinja",
+        class_=class_,
+        cycle=cycle,
+        students=students,
+        attendance=attendance,
+        student_attendance=student_attendance,
     )
 
 
+@admin.get("/class/<int:class_id>/attendance")
+@login_required
+def class_attendance_get(class_id: int) -> str:
+    """
+    View function for "/class/<int:class_id>/attendance" route when the method
+    is GET.
+    """
+    class_: Class = db.one_or_404(select(Class).where(Class.id == class_id))
+    session_date = request.args.get(
+        "session_date", default=datetime.date.today(), type=datetime.date.fromisoformat
+    )
+    form = AttendanceForm()
+    form.session_date.data = session_date
+    statuses = roster(class_id, session_date)
+    students = (
+        db.session.execute(
+            select(Student).where(Student.id.in_(statuses)).order_by(Student.id)
+        )
+        .scalars()
+        .all()
+    )
+    return render_template(
+        "admin/class/attendance.html.jinja",
+        class_=class_,
+        form=form,
+        students=students,
+        statuses=statuses,
+    )
+
+
+@admin.post("/class/<int:class_id>/attendance")
+@login_required
+def class_attendance_post(class_id: int) -> Response:
+    """
+    View function for "/class/<int:class_id>/attendance" route when the method
+    is POST.
+    """
+    db.one_or_404(select(Class.id).where(Class.id == class_id))
+    form = AttendanceForm()
+    if form.validate():
+        recorded = record_attendance(
+            class_id, form.session_date.data, set(form.present.data)
+        )
+        flash(f"Attendance of {recorded} students was recorded succesfully!", "success")
+        return redirect(url_for("admin.class_view", class_id=class_id))
+
+    if form.errors:
+        flash(form.errors, "danger")
+
+    return redirect(url_for("admin.class_attendance_get", class_id=class_id))
+
+
 @admin.get("/class/edit/<int:class_id>")
 @login_required
 def edit_class_get(class_id: int) -> str:
@@ -485,6 +779,8 @@ def edit_class_get(class_id: int) -> str:
     form.end_at.data = class_.end_at
     form.level.data = class_.level.name
     form.sub_level.data = class_.sub_level.name
+    form.room.data = class_.room
+    form.teacher.data = class_.teacher
     form.cycle.data = str(class_.cycle_id)
 
     return render_template("admin/class/edit.html.jinja", form=form, class_=class_)
@@ -497,12 +793,27 @@ def edit_class_post(class_id: int) -> Response:
     form = ClassEditForm()
     if form.validate():
         class_: Class = db.one_or_404(select(Class).where(Class.id == class_id))
+        start_at = form.start_at.data.time()
+        end_at = form.end_at.data.time()
+        cycle_id = int(form.cycle.data)
+
+        try:
+            check_schedule(
+                cycle_id, start_at, end_at, form.room.data, form.teacher.data, class_id
+            )
+        except ScheduleError as exc:
+            db.session.rollback()
+            flash(str(exc), "danger")
+            return redirect(url_for("admin.edit_class_get", class_id=class_id))
+
         class_.mode = form.mode.data
-        class_.start_at = form.start_at.data
-        class_.end_at = form.end_at.data
+        class_.start_at = start_at
+        class_.end_at = end_at
         class_.level = form.level.data
         class_.sub_level = form.sub_level.data
-        class_.cycle_id = form.cycle.data
+        class_.room = form.room.data
+        class_.teacher = form.teacher.data
+        class_.cycle_id = cycle_id
 
         db.session.commit()
         flash("Class was edited succesfully!", "success")
@@ -514,34 +825,17 @@ def edit_class_post(class_id: int) -> Response:
     return redirect(url_for("admin.edit_class_get", class_id=class_id))
 
 
-@admin.post("/class/delete/<int:class_id>")
-@login_required
-def delete_class(class_id: int) -> Response:
-    """View function for "/class/delete/<int:class_id>" when the method is POST."""
-    class_ = db.one_or_404(select(Class).where(Class.id == class_id))
-
-    session = db.session
-    session.delete(class_)
-    session.commit()
-
-    flash("Class was deleted succesfully!", "primary")
-
-    return redirect(url_for("admin.class_table"))
-
-
 @admin.get("/payment")
 @login_required
 def payment_table() -> str:
     """View function for "/payment" route when method is GET."""
-    payments = (
-        db.session.execute(select(Payment).order_by(Payment.created_at.desc()))
-        .scalars()
-        .all()
-    )
+    statement, table = payment_table_query.select(request.args)
+    payments = db.session.execute(statement).scalars().all()
     delete_form = DeleteForm()
     return render_template(
         "admin/payment/table-view.html.jinja",
         payments=payments,
+        table=table,
         delete_form=delete_form,
     )
 
@@ -549,8 +843,20 @@ def payment_table() -> str:
 @admin.get("/payment/create")
 @login_required
 def create_payment_get() -> str:
-    """View function for "/payment/create" when the method is GET."""
+    """
+    View function for "/payment/create" when the method is GET. When a
+    student and a cycle are given, the discount is pre-filled with their
+    sibling discount.
+    """
     form = PaymentForm()
+    student_id = request.args.get("student", type=int)
+    cycle_id = request.args.get("cycle", type=int)
+    if student_id and cycle_id:
+        form.student.data = str(student_id)
+        form.cycle.data = str(cycle_id)
+        form.discount.data = sibling_discount(
+            student_id, cycle_id, current_app.config["SIBLING_DISCOUNTS"]
+        )
     return render_template("admin/payment/create.html.jinja", form=form)
 
 
@@ -599,3 +905,21 @@ def delete_payment(payment_id: int) -> Response:
     flash("Payment was deleted succesfully!", "primary")
 
     return redirect(url_for("admin.payment_table"))
+
+
+AUDIT_PAGE_SIZE = 50
+
+
+@admin.get("/audit")
+@login_required
+def audit_table() -> str:
+    """View function for "/audit" route when method is GET."""
+    statement, table = audit_table_query.select(request.args)
+    entries = db.paginate(
+        statement.options(selectinload(AuditEntry.user)),
+        per_page=AUDIT_PAGE_SIZE,
+        max_per_page=AUDIT_PAGE_SIZE,
+    )
+    return render_template(
+        "admin/audit/table-view.html.jinja", entries=entries, table=table
+    )
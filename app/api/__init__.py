@@ -0,0 +1,11 @@
+"""
+This package contains view functions associated with `api` blueprint.
+"""
+
+# pylint: disable=cyclic-import
+
+from flask import Blueprint
+
+api = Blueprint("api", __name__)
+
+from . import views  # pylint: disable=wrong-import-position
@@ -0,0 +1,29 @@
+"""This module contains decorators for view functions of `api` blueprint."""
+
+import hmac
+from functools import wraps
+from typing import Any, Callable
+
+from flask import abort, current_app, request
+
+
+def token_required(view: Callable[..., Any]) -> Callable[..., Any]:
+    """
+    Require the request to carry the configured API token as a bearer token.
+    When no API token is configured, the API is disabled.
+    """
+
+    @wraps(view)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        token = current_app.config.get("API_TOKEN")
+        header = request.headers.get("Authorization", "")
+        scheme, _, credentials = header.partition(" ")
+        if (
+            not token
+            or scheme.lower() != "bearer"
+            or not hmac.compare_digest(credentials.encode(), token.encode())
+        ):
+            abort(401)
+        return view(*args, **kwargs)
+
+    return wrapper
@@ -0,0 +1,83 @@
+"""
+This module contains view functions associated with `api` blueprint.
+"""
+
+from flask import abort, jsonify, request
+from flask.wrappers import Response
+
+from .. import db
+from ..changes import (
+    DEFAULT_LIMIT,
+    MAX_LIMIT,
+    CursorError,
+    changes,
+    decode_cursor,
+    encode_cursor,
+    resources,
+)
+from ..sync import sync_representatives, sync_students
+from . import api
+from .decorators import token_required
+
+MAX_SYNC_RECORDS = 5000
+
+
+@api.post("/sync")
+@token_required
+def sync() -> Response:
+    """
+    View function for "/sync" route when method is POST.
+
+    The body holds `representatives` and `students` lists. Representatives
+    are applied first, so students can link to representatives sent in the
+    same request. The response has an outcome per record.
+    """
+    payload = request.get_json(silent=True)
+    if not isinstance(payload, dict):
+        abort(400)
+
+    representatives = payload.get("representatives", [])
+    students = payload.get("students", [])
+    if not isinstance(representatives, list) or not isinstance(students, list):
+        abort(400)
+    if len(representatives) + len(students) > MAX_SYNC_RECORDS:
+        abort(413)
+
+    representative_outcomes = sync_representatives(representatives)
+    student_outcomes = sync_students(students)
+    db.session.commit()
+
+    return jsonify(representatives=representative_outcomes, students=student_outcomes)
+
+
+@api.get("/changes/<resource>")
+@token_required
+def change_feed(resource: str) -> Response:
+    """
+    View function for "/changes/<resource>" route when method is GET.
+
+    Return the changes of resource after the `cursor` query parameter, at
+    most `limit` of them, and the cursor to request the next page with.
+    Without a cursor the feed starts from the beginning.
+    """
+    if resource not in resources:
+        abort(404)
+
+    limit = request.args.get("limit", DEFAULT_LIMIT, type=int)
+    if limit is None or not 1 <= limit <= MAX_LIMIT:
+        abort(400)
+
+    position = None
+    cursor = request.args.get("cursor")
+    if cursor:
+        try:
+            position = decode_cursor(cursor)
+        except CursorError:
+            abort(400)
+
+    page, position = changes(resource, position, limit)
+    return jsonify(
+        changes=page,
+        cursor=encode_cursor(position) if position is not None else cursor,
+        has_more=len(page) == limit,
+    )
@@ -0,0 +1,175 @@
+"""
+This module contains set-based operations to move closed cycles, along with
+their classes, the attendance of their classes and their payments, in and
+out of the archive tables. Rows are moved unchanged, so the moves are not
+written to the audit trail.
+"""
+
+import datetime
+
+from sqlalchemy import delete, exists, insert, select
+
+from . import db
+from .models import (
+    ArchivedAttendance,
+    ArchivedClass,
+    ArchivedCycle,
+    ArchivedPayment,
+    Attendance,
+    Class,
+    Cycle,
+    Payment,
+    Student,
+    utc_now,
+)
+
+CYCLE_COLUMNS = [
+    "id",
+    "month",
+    "year",
+    "start_date",
+    "end_date",
+    "branch_id",
+    "created_at",
+    "updated_at",
+]
+CLASS_COLUMNS = [
+    "id",
+    "mode",
+    "start_at",
+    "end_at",
+    "level",
+    "sub_level",
+    "room",
+    "teacher",
+    "cycle_id",
+    "branch_id",
+    "created_at",
+    "updated_at",
+]
+PAYMENT_COLUMNS = [
+    "id",
+    "amount",
+    "discount",
+    "description",
+    "student_id",
+    "cycle_id",
+    "branch_id",
+    "created_at",
+    "updated_at",
+]
+
+ATTENDANCE_COLUMNS = ["class_id", "session_date", "student_id", "present"]
+
+
+class ArchiveError(Exception):
+    """This exception is raised when a cycle cannot be archived or restored."""
+
+
+def _copy(
+    source: type, target: type, columns: list[str], where, touch: bool = False
+) -> None:
+    """
+    Copy the rows of source matching where into target with INSERT ... SELECT.
+    When touch is set, updated_at is set to the current time instead of copied.
+    """
+    values = [
+        utc_now() if touch and column == "updated_at" else source.__table__.c[column]
+        for column in columns
+    ]
+    db.session.execute(
+        insert(target.__table__).from_select(columns, select(*values).where(where))
+    )
+
+
+def archive_cycle(cycle_id: int, today: datetime.date | None = None) -> None:
+    """
+    Move a closed cycle, its classes, their attendance and its payments into
+    the archive tables.
+
+    Rows are copied and then deleted with one statement per table, and
+    everything is committed in a single transaction. A cycle is closed when
+    its end_date is in the past. Cycles whose classes still have students
+    enrolled cannot be archived, since the enrollment would be lost.
+    """
+    today = today or datetime.date.today()
+    session = db.session
+    cycle = session.execute(
+        select(Cycle).where(Cycle.id == cycle_id).with_for_update()
+    ).scalar_one_or_none()
+    if cycle is None:
+        raise ArchiveError("Cycle does not exist.")
+    if cycle.end_date >= today:
+        raise ArchiveError("Only closed cycles can be archived.")
+
+    enrolled = session.execute(
+        select(exists().where(Student.class_id == Class.id, Class.cycle_id == cycle_id))
+    ).scalar()
+    if enrolled:
+        raise ArchiveError("Cycle still has students enrolled in its classes.")
+
+    _copy(Cycle, ArchivedCycle, CYCLE_COLUMNS, Cycle.id == cycle_id)
+    _copy(Class, ArchivedClass, CLASS_COLUMNS, Class.cycle_id == cycle_id)
+    _copy(Payment, ArchivedPayment, PAYMENT_COLUMNS, Payment.cycle_id == cycle_id)
+    _copy(
+        Attendance,
+        ArchivedAttendance,
+        ATTENDANCE_COLUMNS,
+        Attendance.class_id.in_(select(Class.id).where(Class.cycle_id == cycle_id)),
+    )
+
+    # the attendance and its counters are deleted along with the classes
+    session.execute(delete(Payment).where(Payment.cycle_id == cycle_id))
+    session.execute(delete(Class).where(Class.cycle_id == cycle_id))
+    session.execute(delete(Cycle).where(Cycle.id == cycle_id))
+    session.commit()
+
+
+def restore_cycle(cycle_id: int) -> None:
+    """
+    Move an archived cycle, its classes, their attendance and its payments
+    back into their tables in a single transaction. Restored rows are
+    touched, so the change feed reports them after their tombstones.
+    """
+    session = db.session
+    archived_cycle = session.execute(
+        select(ArchivedCycle).where(ArchivedCycle.id == cycle_id).with_for_update()
+    ).scalar_one_or_none()
+    if archived_cycle is None:
+        raise ArchiveError("Archived cycle does not exist.")
+
+    _copy(ArchivedCycle, Cycle, CYCLE_COLUMNS, ArchivedCycle.id == cycle_id, touch=True)
+    _copy(
+        ArchivedClass,
+        Class,
+        CLASS_COLUMNS,
+        ArchivedClass.cycle_id == cycle_id,
+        touch=True,
+    )
+    _copy(
+        ArchivedPayment,
+        Payment,
+        PAYMENT_COLUMNS,
+        ArchivedPayment.cycle_id == cycle_id,
+        touch=True,
+    )
+    # the attendance triggers rebuild the counters of the restored rows
+    archived_class_ids = select(ArchivedClass.id).where(
+        ArchivedClass.cycle_id == cycle_id
+    )
+    _copy(
+        ArchivedAttendance,
+        Attendance,
+        ATTENDANCE_COLUMNS,
+        ArchivedAttendance.class_id.in_(archived_class_ids),
+    )
+
+    session.execute(
+        delete(ArchivedAttendance)
+        .where(ArchivedAttendance.class_id.in_(archived_class_ids))
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(delete(ArchivedPayment).where(ArchivedPayment.cycle_id == cycle_id))
+    session.execute(delete(ArchivedClass).where(ArchivedClass.cycle_id == cycle_id))
+    session.execute(delete(ArchivedCycle).where(ArchivedCycle.id == cycle_id))
+    session.commit()
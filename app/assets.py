@@ -0,0 +1,271 @@
+"""
+This module contains the static asset pipeline of the app.
+
+`flask assets build` copies the files of the static folder into `static/dist`
+with a content hash in their names, along with gzip and brotli variants of
+the compressible ones, and writes a manifest mapping source names to built
+names. Templates link assets with `asset_url`, so built files are served
+with immutable far-future cache headers and the best encoding the client
+accepts. HTML responses are compressed on the fly.
+
+Bootstrap, Popper and the Bootstrap Icons sprite are vendored in
+`static/vendor`, see `VENDORED_ASSETS`, so pages do not depend on a CDN.
+Icons are drawn from the sprite with `icon`.
+"""
+
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import re
+from dataclasses import dataclass
+from pathlib import Path
+
+import click
+from flask import Flask, current_app, request, send_from_directory, url_for
+from flask.wrappers import Response
+from markupsafe import Markup, escape
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover
+    brotli = None
+
+DIST = "dist"
+MANIFEST = "manifest.json"
+CACHE_MAX_AGE = 365 * 24 * 60 * 60
+MIN_COMPRESS_SIZE = 512
+COMPRESSIBLE = {".css", ".js", ".json", ".map", ".svg", ".txt", ".webmanifest"}
+CSS_URL = re.compile(r"""url\(\s*(['"]?)([^'")]+?)\1\s*\)""")
+
+
+@dataclass(frozen=True)
+class VendoredAsset:
+    """
+    This class represents a third party asset vendored in the static folder.
+    Should the file be missing, the asset is linked from its CDN url.
+    """
+
+    url: str
+    integrity: str | None = None
+
+
+VENDORED_ASSETS = {
+    "vendor/bootstrap/bootstrap.min.css": VendoredAsset(
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/css/bootstrap.min.css",
+        "sha384-1BmE4kWBq78iYhFldvKuhfTAU6auU8tT94WrHftjDbrCEXSU1oBoqyl2QvZ6jIW3",
+    ),
+    "vendor/bootstrap/bootstrap.min.js": VendoredAsset(
+        "https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.min.js",
+        "sha384-QJHtvGhmr9XOIpI6YVutG+2QOK9T+ZnN4kzFN1RtK3zEFEIsxhlmWl5/YESvpZ13",
+    ),
+    "vendor/popper/popper.min.js": VendoredAsset(
+        "https://cdn.jsdelivr.net/npm/@popperjs/core@2.10.2/dist/umd/popper.min.js",
+        "sha384-7+zCNj/IqJ95wo16oMtfsKbZ9ccEh31eOz1HGyDuCQ6wgnyJNSYdrPa03rtR1zdB",
+    ),
+    "vendor/bootstrap-icons/bootstrap-icons.svg": VendoredAsset(
+        "https://cdn.jsdelivr.net/npm/bootstrap-icons@1.7.2/bootstrap-icons.svg"
+    ),
+}
+ICON_SPRITE = "vendor/bootstrap-icons/bootstrap-icons.svg"
+
+
+def fingerprint(name: str, data: bytes) -> str:
+    """Return name with the content hash of data inserted before its suffix."""
+    stem, suffix = os.path.splitext(name)
+    return f"{stem}.{hashlib.sha256(data).hexdigest()[:12]}{suffix}"
+
+
+def _rewrite_css(name: str, data: bytes, manifest: dict[str, str]) -> bytes:
+    """
+    Point the relative urls of the stylesheet name to the built files they
+    reference. Query strings and fragments used as cache busters are dropped.
+    """
+    directory = os.path.dirname(name)
+
+    def replace(match: re.Match) -> str:
+        reference = match.group(2).strip()
+        path = re.split(r"[?#]", reference, maxsplit=1)[0]
+        if not path or re.match(r"^([a-z]+:|/|#)", reference):
+            return match.group(0)
+        target = os.path.normpath(os.path.join(directory, path)).replace(os.sep, "/")
+        if target not in manifest:
+            return match.group(0)
+        return f'url("{os.path.relpath(manifest[target], directory or ".")}")'
+
+    return CSS_URL.sub(replace, data.decode()).encode()
+
+
+def _write(path: Path, data: bytes) -> None:
+    """Write data to path, along with its gzip and brotli variants if useful."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(data)
+    if path.suffix not in COMPRESSIBLE or len(data) < MIN_COMPRESS_SIZE:
+        return
+    path.with_name(path.name + ".gz").write_bytes(
+        gzip.compress(data, compresslevel=9, mtime=0)
+    )
+    if brotli is not None:
+        path.with_name(path.name + ".br").write_bytes(brotli.compress(data))
+
+
+def build_assets(static_folder: Path) -> dict[str, str]:
+    """
+    Build the files of static_folder into its `dist` folder and return the
+    manifest. Stylesheets are built last, since their content, and so their
+    hash, depends on the names of the files they reference.
+    """
+    dist = static_folder / DIST
+    names = sorted(
+        path.relative_to(static_folder).as_posix()
+        for path in static_folder.rglob("*")
+        if path.is_file() and dist not in path.parents
+    )
+    names.sort(key=lambda name: name.endswith(".css"))
+
+    manifest: dict[str, str] = {}
+    for name in names:
+        data = (static_folder / name).read_bytes()
+        if name.endswith(".css"):
+            data = _rewrite_css(name, data, manifest)
+        manifest[name] = fingerprint(name, data)
+        _write(dist / manifest[name], data)
+
+    (dist / MANIFEST).write_text(json.dumps(manifest, indent=2, sort_keys=True))
+    return manifest
+
+
+def load_manifest(static_folder: Path) -> dict[str, str]:
+    """Return the manifest of the built assets, empty if they were not built."""
+    try:
+        return json.loads((static_folder / DIST / MANIFEST).read_text())
+    except FileNotFoundError:
+        return {}
+
+
+def cdn_fallbacks(static_folder: Path) -> dict[str, str]:
+    """Return the CDN url of the third party assets not vendored in static_folder."""
+    return {
+        filename: vendored.url
+        for filename, vendored in VENDORED_ASSETS.items()
+        if not (static_folder / filename).is_file()
+    }
+
+
+def asset_url(filename: str) -> str:
+    """
+    Return the url of an asset of the static folder: its built file if there
+    is one, its CDN url if it is a third party asset not vendored yet and
+    otherwise the file itself.
+    """
+    state = current_app.extensions["assets"]
+    if filename in state["manifest"]:
+        return url_for("static", filename=f"{DIST}/{state['manifest'][filename]}")
+    if filename in state["fallbacks"]:
+        return state["fallbacks"][filename]
+    return url_for("static", filename=filename)
+
+
+def asset_integrity(filename: str) -> str | None:
+    """Return the subresource integrity of a third party asset, if known."""
+    vendored = VENDORED_ASSETS.get(filename)
+    return vendored.integrity if vendored is not None else None
+
+
+def icon(name: str) -> Markup:
+    """Return the Bootstrap icon name, drawn from the icon sprite."""
+    return Markup(
+        '<svg class="bi" width="1em" height="1em" fill="currentColor" '
+        'style="vertical-align: -0.125em" aria-hidden="true">'
+        f'<use href="{asset_url(ICON_SPRITE)}#{escape(name)}"/></svg>'
+    )
+
+
+def send_static_asset(filename: str) -> Response:
+    """
+    View function for the static route. Built files are served pre-compressed
+    when the client accepts it and are cached for a year, since their names
+    change whenever their content does.
+    """
+    if not filename.startswith(f"{DIST}/"):
+        return current_app.send_static_file(filename)
+
+    static_folder = current_app.static_folder
+    mimetype = mimetypes.guess_type(filename)[0] or "application/octet-stream"
+    response = None
+    for encoding, suffix in (("br", ".br"), ("gzip", ".gz")):
+        if encoding in request.accept_encodings and os.path.isfile(
+            os.path.join(static_folder, filename + suffix)
+        ):
+            response = send_from_directory(
+                static_folder, filename + suffix, mimetype=mimetype
+            )
+            response.headers["Content-Encoding"] = encoding
+            break
+    if response is None:
+        response = send_from_directory(static_folder, filename, mimetype=mimetype)
+
+    response.vary.add("Accept-Encoding")
+    response.cache_control.public = True
+    response.cache_control.max_age = CACHE_MAX_AGE
+    response.cache_control.immutable = True
+    return response
+
+
+def compress_response(response: Response) -> Response:
+    """Compress HTML responses with brotli or gzip, if the client accepts it."""
+    if (
+        response.mimetype != "text/html"
+        or response.direct_passthrough
+        or response.status_code < 200
+        or response.status_code in (204, 304)
+        or "Content-Encoding" in response.headers
+    ):
+        return response
+
+    response.vary.add("Accept-Encoding")
+    data = response.get_data()
+    if len(data) < MIN_COMPRESS_SIZE:
+        return response
+    if brotli is not None and "br" in request.accept_encodings:
+        response.set_data(brotli.compress(data, quality=5))
+        response.headers["Content-Encoding"] = "br"
+    elif "gzip" in request.accept_encodings:
+        response.set_data(gzip.compress(data, compresslevel=6))
+        response.headers["Content-Encoding"] = "gzip"
+    return response
+
+
+@click.group("assets")
+def assets_cli() -> None:
+    """Manage static assets."""
+
+
+@assets_cli.command("build")
+def build_command() -> None:
+    """Fingerprint and compress the static assets."""
+    static_folder = Path(current_app.static_folder)
+    missing = cdn_fallbacks(static_folder)
+    if missing:
+        raise click.ClickException(
+            f"Third party assets are not vendored: {', '.join(sorted(missing))}. "
+            "Run `make assets-vendor` first."
+        )
+    manifest = build_assets(static_folder)
+    click.echo(f"Built {len(manifest)} assets into {static_folder / DIST}.")
+
+
+def init_assets(app: Flask) -> None:
+    """Register the static asset pipeline on app."""
+    static_folder = Path(app.static_folder)
+    app.extensions["assets"] = {
+        "manifest": load_manifest(static_folder),
+        "fallbacks": cdn_fallbacks(static_folder),
+    }
+    app.jinja_env.globals.update(
+        asset_url=asset_url, asset_integrity=asset_integrity, icon=icon
+    )
+    app.view_functions["static"] = send_static_asset
+    app.after_request(compress_response)
+    app.cli.add_command(assets_cli)
@@ -0,0 +1,123 @@
+"""
+This module contains the attendance of students to the sessions of their
+classes. The roster of a session is written with a single multi-row INSERT
+... ON CONFLICT DO UPDATE, so entering or correcting a whole class costs
+one statement. Attendance rates are read from the counters maintained by
+the attendance triggers instead of aggregating attendance rows.
+"""
+
+import datetime
+from dataclasses import dataclass
+
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import insert
+
+from . import db
+from .models import Attendance, AttendanceCounter, Student
+
+
+@dataclass(frozen=True)
+class AttendanceRate:
+    """This class represents how many sessions a student or class attended."""
+
+    sessions: int = 0
+    attended: int = 0
+
+    @property
+    def rate(self) -> float | None:
+        """Fraction of the sessions attended, None when there are none."""
+        return self.attended / self.sessions if self.sessions else None
+
+
+def roster(class_id: int, session_date: datetime.date) -> dict[int, bool | None]:
+    """
+    Return the students of the class mapped to whether they attended the
+    session of session_date, None when it was not recorded.
+    """
+    rows = db.session.execute(
+        select(Student.id, Attendance.present)
+        .outerjoin(
+            Attendance,
+            (Attendance.student_id == Student.id)
+            & (Attendance.class_id == class_id)
+            & (Attendance.session_date == session_date),
+        )
+        .where(Student.class_id == class_id)
+        .order_by(Student.id)
+    )
+    return dict(rows.all())
+
+
+def record_attendance(
+    class_id: int, session_date: datetime.date, present_ids: set[int]
+) -> int:
+    """
+    Record the session of session_date for every student of the class:
+    students in present_ids attended and the rest did not. Rows already
+    recorded for the session are only updated when they change. Return the
+    number of students recorded.
+    """
+    student_ids = (
+        db.session.execute(select(Student.id).where(Student.class_id == class_id))
+        .scalars()
+        .all()
+    )
+    if not student_ids:
+        return 0
+
+    statement = insert(Attendance).values(
+        [
+            {
+                "class_id": class_id,
+                "session_date": session_date,
+                "student_id": student_id,
+                "present": student_id in present_ids,
+            }
+            for student_id in student_ids
+        ]
+    )
+    db.session.execute(
+        statement.on_conflict_do_update(
+            index_elements=["class_id", "session_date", "student_id"],
+            set_={"present": statement.excluded.present},
+            where=Attendance.present.is_distinct_from(statement.excluded.present),
+        )
+    )
+    db.session.commit()
+    return len(student_ids)
+
+
+def _rate(*conditions: object) -> AttendanceRate:
+    """Return the sum of the counters matching conditions."""
+    sessions, attended = db.session.execute(
+        select(
+            func.coalesce(func.sum(AttendanceCounter.sessions), 0),
+            func.coalesce(func.sum(AttendanceCounter.attended), 0),
+        ).where(*conditions)
+    ).one()
+    return AttendanceRate(sessions, attended)
+
+
+def class_attendance_rate(class_id: int) -> AttendanceRate:
+    """Return the attendance rate of the students of the class."""
+    return _rate(AttendanceCounter.class_id == class_id)
+
+
+def student_attendance_rate(student_id: int) -> AttendanceRate:
+    """Return the attendance rate of the student across every class."""
+    return _rate(AttendanceCounter.student_id == student_id)
+
+
+def student_attendance_rates(class_id: int) -> dict[int, AttendanceRate]:
+    """Return the attendance rate in the class of each of its students."""
+    rows = db.session.execute(
+        select(
+            AttendanceCounter.student_id,
+            AttendanceCounter.sessions,
+            AttendanceCounter.attended,
+        ).where(AttendanceCounter.class_id == class_id)
+    )
+    return {
+        student_id: AttendanceRate(sessions, attended)
+        for student_id, sessions, attended in rows
+    }
@@ -0,0 +1,201 @@
+"""
+This module contains the audit trail of changes made through the ORM.
+Attribute-level diffs are collected from session events every time the
+session flushes and buffered in the session. Right before the transaction
+commits, the buffer is written with a single multi-row INSERT, so views pay
+one extra statement per commit rather than one per changed row. Bulk
+statements, which bypass the flush, buffer their entries themselves from
+the rows they return.
+
+Changes made by the registry sync and the moves of archiving are not
+recorded: the former mirror records owned by the external registry, and
+the latter move rows unchanged between the live and the archive tables.
+
+The listeners are registered when this module is imported, which happens
+when `admin` blueprint is registered.
+"""
+
+from typing import Any
+
+import sqlalchemy as sa
+from flask import has_request_context
+from flask_login import current_user
+from sqlalchemy import event, insert, inspect, select, update
+from sqlalchemy.orm import InstrumentedAttribute, Session
+from sqlalchemy.orm.state import InstanceState
+from sqlalchemy.sql import ColumnElement
+
+from .changes import serialize
+from .models import (
+    AuditAction,
+    AuditEntry,
+    Class,
+    Cycle,
+    Payment,
+    Representative,
+    Student,
+)
+
+AUDITED_MODELS = (Student, Representative, Cycle, Class, Payment)
+IGNORED_ATTRIBUTES = frozenset({"created_at", "updated_at"})
+BUFFER_KEY = "audit_entries"
+
+
+def _current_user_id() -> int | None:
+    """Return the id of the logged in user, if any."""
+    if has_request_context() and current_user.is_authenticated:
+        return current_user.id
+    return None
+
+
+def _diff(state: InstanceState, action: AuditAction) -> dict[str, Any]:
+    """
+    Return the changed attributes of state mapped to their old and new
+    values. Only values already loaded are inspected, so no SQL is emitted.
+    """
+    changes = {}
+    for attribute in state.mapper.column_attrs:
+        key = attribute.key
+        if key in IGNORED_ATTRIBUTES or not isinstance(attribute.expression, sa.Column):
+            continue
+        if action == AuditAction.UPDATE:
+            history = state.attrs[key].history
+            if not history.has_changes():
+                continue
+            old = history.deleted[0] if history.deleted else None
+            new = history.added[0] if history.added else None
+        elif key not in state.dict:
+            continue
+        elif action == AuditAction.INSERT:
+            old, new = None, state.dict[key]
+        else:
+            old, new = state.dict[key], None
+        changes[key] = {"old": serialize(old), "new": serialize(new)}
+    return changes
+
+
+def inserted_row_changes(row: Any) -> dict[str, Any]:
+    """Return the changes of a row inserted by a bulk statement, as RETURNING it."""
+    return {
+        key: {"old": None, "new": serialize(value)}
+        for key, value in row._asdict().items()
+        if key not in IGNORED_ATTRIBUTES
+    }
+
+
+def deleted_row_changes(row: Any) -> dict[str, Any]:
+    """Return the changes of a row deleted by a bulk statement, as RETURNING it."""
+    return {
+        key: {"old": serialize(value), "new": None}
+        for key, value in row._asdict().items()
+        if key not in IGNORED_ATTRIBUTES
+    }
+
+
+def buffer_entries(
+    session: Session,
+    model: type,
+    action: AuditAction,
+    changes: dict[int, dict[str, Any]],
+) -> None:
+    """
+    Buffer entries for rows changed by a bulk statement, which bypasses the
+    flush, given their changes keyed by row id. They are written along with
+    the rest of the buffer.
+    """
+    user_id = _current_user_id()
+    session.info.setdefault(BUFFER_KEY, []).extend(
+        {
+            "user_id": user_id,
+            "table_name": model.__tablename__,
+            "row_id": row_id,
+            "action": action,
+            "changes": row_changes,
+        }
+        for row_id, row_changes in changes.items()
+    )
+
+
+def bulk_update(
+    session: Session,
+    attribute: InstrumentedAttribute,
+    value: Any,
+    condition: ColumnElement[bool],
+) -> int:
+    """
+    Set attribute to value on the rows matching condition with one UPDATE,
+    which also returns their previous value, and buffer an entry for every
+    row it changed. Return the number of matching rows.
+    """
+    model = attribute.class_
+    key = attribute.key
+    previous = select(model.id, attribute).where(condition).subquery()
+    rows = session.execute(
+        update(model)
+        .where(model.id == previous.c.id)
+        .values({key: value})
+        .returning(model.id, previous.c[key])
+        .execution_options(synchronize_session=False)
+    ).all()
+    buffer_entries(
+        session,
+        model,
+        AuditAction.UPDATE,
+        {
+            row_id: {key: {"old": serialize(old), "new": serialize(value)}}
+            for row_id, old in rows
+            if old != value
+        },
+    )
+    return len(rows)
+
+
+@event.listens_for(Session, "after_flush")
+def collect_entries(
+    session: Session, flush_context: Any  # pylint: disable=unused-argument
+) -> None:
+    """Buffer an entry for every audited row inserted, updated or deleted."""
+    user_id = None
+    entries = []
+    for action, instances in (
+        (AuditAction.INSERT, session.new),
+        (AuditAction.UPDATE, session.dirty),
+        (AuditAction.DELETE, session.deleted),
+    ):
+        for instance in instances:
+            if not isinstance(instance, AUDITED_MODELS):
+                continue
+            state = inspect(instance)
+            changes = _diff(state, action)
+            if action == AuditAction.UPDATE and not changes:
+                continue
+            if not entries:
+                user_id = _current_user_id()
+            entries.append(
+                {
+                    "user_id": user_id,
+                    "table_name": state.mapper.local_table.name,
+                    "row_id": state.mapper.primary_key_from_instance(instance)[0],
+                    "action": action,
+                    "changes": changes,
+                }
+            )
+    if entries:
+        session.info.setdefault(BUFFER_KEY, []).extend(entries)
+
+
+@event.listens_for(Session, "before_commit")
+def write_entries(session: Session) -> None:
+    """Flush pending changes and write the buffered entries in one INSERT."""
+    session.flush()
+    entries = session.info.pop(BUFFER_KEY, None)
+    if entries:
+        session.execute(insert(AuditEntry.__table__), entries)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def discard_entries(
+    session: Session, previous_transaction: Any  # pylint: disable=unused-argument
+) -> None:
+    """Discard the buffered entries, their changes were rolled back."""
+    session.info.pop(BUFFER_KEY, None)
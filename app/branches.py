@@ -0,0 +1,172 @@
+"""
+This module contains the branch dimension of the school. Students,
+representatives, cycles, classes and payments belong to a branch, and their
+indexes lead on it, so the queries of a branch only read its own rows.
+
+While a branch is set for the current request, see `set_branch`, every ORM
+query of the session is scoped to it and new rows are added to it. The
+`admin` blueprint sets the branch of the logged in user; users without a
+branch see every branch. Rows created outside of a branch, e.g. by the
+sync API, belong to the main branch, which the schema is created with.
+
+A branch may also be routed to its own database, or to its own schema
+through the `search_path` option of a database URI, with the
+`BRANCH_DATABASES` setting mapping branch codes to database URIs. ORM
+statements are routed by their model and Core statements by their tables,
+so that a statement touching the rows of a branch, e.g. an INSERT ...
+SELECT from one table of the branch into another, runs in its database.
+Tables depending on the rows of a branch, like attendance, live with them.
+Organization-wide tables, like users and branches, stay in the main
+database.
+"""
+
+import functools
+import threading
+from typing import Any
+
+import sqlalchemy as sa
+from flask import Flask, current_app, g, has_app_context
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import ORMExecuteState, declared_attr, with_loader_criteria
+from sqlalchemy.sql.util import find_tables
+
+MAIN_BRANCH_ID = 1
+ALL_BRANCHES = "all_branches"
+
+
+class BranchMixin:  # pylint: disable=too-few-public-methods
+    """This class represents a model whose rows belong to a branch."""
+
+    @declared_attr
+    def branch_id(cls) -> sa.Column:  # pylint: disable=no-self-argument
+        """Id of the branch, the main branch unless set."""
+        return sa.Column(
+            sa.Integer,
+            sa.ForeignKey("branch.id"),
+            nullable=False,
+            server_default=sa.text(str(MAIN_BRANCH_ID)),
+        )
+
+
+def set_branch(branch_id: int | None, code: str | None = None) -> None:
+    """
+    Scope the queries of the current request to a branch, routing them to
+    the database of the branch identified by code if it has one. No branch
+    means every branch.
+    """
+    g.branch_id = branch_id
+    g.branch_code = code
+
+
+def current_branch_id() -> int | None:
+    """Return the id of the branch of the current request, if any."""
+    return g.get("branch_id") if has_app_context() else None
+
+
+class BranchSession(Session):  # pylint: disable=too-few-public-methods
+    """
+    This class represents a session routing the rows of a branch to its
+    database, if it has one.
+    """
+
+    def get_bind(  # pylint: disable=arguments-differ
+        self, mapper: Any = None, clause: Any = None, bind: Any = None, **kwargs: Any
+    ) -> Any:
+        if bind is None:
+            engine = branch_engine()
+            if engine is not None and self._of_branch(mapper, clause):
+                return engine
+        return super().get_bind(mapper, clause, bind, **kwargs)
+
+    def _of_branch(self, mapper: Any, clause: Any) -> bool:
+        """Whether the statement touches the rows of a branch."""
+        tables = branch_tables(self._db.Model.registry)
+        if mapper is not None:
+            return mapper.local_table in tables
+        if clause is None:
+            return False
+        return any(table in tables for table in find_tables(clause, include_crud=True))
+
+
+@functools.cache
+def branch_tables(registry: sa.orm.registry) -> frozenset[sa.Table]:
+    """
+    Return the tables of the models of registry which belong to a branch,
+    and of the tables depending on them, like attendance on classes, which
+    live in the same database.
+    """
+    tables = {
+        mapper.local_table
+        for mapper in registry.mappers
+        if issubclass(mapper.class_, BranchMixin)
+    }
+    dependents = {
+        mapper.local_table
+        for mapper in registry.mappers
+        if any(key.column.table in tables for key in mapper.local_table.foreign_keys)
+    }
+    return frozenset(tables | dependents)
+
+
+def branch_engine() -> Engine | None:
+    """
+    Return the engine of the database of the branch of the current request,
+    if it has one. Engines are created on first use, so a pre-fork server
+    creates them in its workers.
+    """
+    if not has_app_context():
+        return None
+    code = g.get("branch_code")
+    uris = current_app.config["BRANCH_DATABASES"]
+    if code is None or code not in uris:
+        return None
+    branches = current_app.extensions["branches"]
+    with branches["lock"]:
+        if code not in branches["engines"]:
+            branches["engines"][code] = sa.create_engine(uris[code])
+        return branches["engines"][code]
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _scope_to_branch(execute_state: ORMExecuteState) -> None:
+    """Filter the rows of ORM statements by the branch of the request."""
+    branch_id = current_branch_id()
+    if (
+        branch_id is None
+        or not (
+            execute_state.is_select
+            or execute_state.is_update
+            or execute_state.is_delete
+        )
+        or execute_state.is_column_load
+        or execute_state.is_relationship_load
+        or execute_state.execution_options.get(ALL_BRANCHES)
+    ):
+        return
+    execute_state.statement = execute_state.statement.options(
+        with_loader_criteria(
+            BranchMixin,
+            lambda cls: cls.branch_id == branch_id,
+            include_aliases=True,
+        )
+    )
+
+
+@event.listens_for(Session, "before_flush")
+def _add_to_branch(
+    session: Session, *args: Any  # pylint: disable=unused-argument
+) -> None:
+    """Add the new rows of the session to the branch of the request."""
+    branch_id = current_branch_id()
+    if branch_id is None:
+        return
+    for instance in session.new:
+        if isinstance(instance, BranchMixin) and instance.branch_id is None:
+            instance.branch_id = branch_id
+
+
+def init_branches(app: Flask) -> None:
+    """Set up the engines of the branches of app with their own database."""
+    app.extensions["branches"] = {"engines": {}, "lock": threading.Lock()}
@@ -0,0 +1,191 @@
+"""
+This module contains the change feed consumed by downstream systems. Rows of
+a resource changed after a cursor are returned in pages ordered by
+(updated_at, id), merged with the tombstones of the rows deleted since then.
+The cursor is opaque to clients and carries the position of the last change.
+
+updated_at is the start time of the transaction which made the change, so a
+long transaction can commit a change behind a cursor already handed out.
+Changes are therefore only returned up to the start of the oldest
+transaction still running on the database, as reported by
+pg_stat_activity, and the rest are held back until it finishes. Only
+client transactions which have already written, and so been assigned a
+transaction id, are considered, so that idle or read-only sessions and
+background processes such as autovacuum do not hold the feed back.
+"""
+
+import base64
+import binascii
+import datetime
+import enum
+import json
+from decimal import Decimal
+from typing import Any, NamedTuple
+
+import sqlalchemy as sa
+from sqlalchemy import select
+from sqlalchemy_utils import PhoneNumber
+
+from . import db
+from .models import Class, Cycle, Payment, Representative, Student, Tombstone
+
+DEFAULT_LIMIT = 100
+MAX_LIMIT = 1000
+
+UPSERT = "upsert"
+DELETE = "delete"
+
+resources: dict[str, type] = {
+    "students": Student,
+    "representatives": Representative,
+    "cycles": Cycle,
+    "classes": Class,
+    "payments": Payment,
+}
+
+Change = dict[str, Any]
+
+
+class CursorError(Exception):
+    """This exception is raised when a cursor cannot be decoded."""
+
+
+class Position(NamedTuple):
+    """This class represents a position in the change feed of a resource."""
+
+    timestamp: datetime.datetime
+    id: int
+
+
+def encode_cursor(position: Position) -> str:
+    """Return position as an opaque, URL-safe cursor."""
+    data = json.dumps([position.timestamp.isoformat(), position.id])
+    return base64.urlsafe_b64encode(data.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Position:
+    """Return the position carried by cursor."""
+    try:
+        timestamp, id_ = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return Position(datetime.datetime.fromisoformat(timestamp), int(id_))
+    except (binascii.Error, UnicodeError, TypeError, ValueError) as exc:
+        raise CursorError("Not a valid cursor.") from exc
+
+
+def serialize(value: Any) -> Any:
+    """Return value as a JSON compatible value."""
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, (datetime.date, datetime.time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return str(value)
+    if isinstance(value, PhoneNumber):
+        return value.e164
+    return value
+
+
+pg_stat_activity = sa.table(
+    "pg_stat_activity",
+    sa.column("datname"),
+    sa.column("pid"),
+    sa.column("backend_type"),
+    sa.column("backend_xid"),
+    sa.column("xact_start"),
+)
+
+
+def horizon() -> datetime.datetime | None:
+    """
+    Return the start time, in UTC, of the oldest writing client transaction
+    still running on the database other than the current one, if any.
+    Changes made from then on may still be followed by changes committed
+    later. It must be read before the changes, so that a transaction
+    finishing in between is seen by the following queries, and not from the
+    snapshot of the statistics cached for the current transaction.
+    """
+    db.session.execute(select(sa.func.pg_stat_clear_snapshot()))
+    return db.session.execute(
+        select(
+            sa.func.min(sa.func.timezone("utc", pg_stat_activity.c.xact_start))
+        ).where(
+            pg_stat_activity.c.datname == sa.func.current_database(),
+            pg_stat_activity.c.pid != sa.func.pg_backend_pid(),
+            pg_stat_activity.c.backend_type == "client backend",
+            pg_stat_activity.c.backend_xid.isnot(None),
+        )
+    ).scalar_one()
+
+
+def _window(
+    columns: tuple[Any, Any],
+    position: Position | None,
+    until: datetime.datetime | None,
+) -> list[Any]:
+    """
+    Return the conditions selecting rows after position, if any, and
+    changed before until, if any.
+    """
+    conditions = []
+    if position is not None:
+        conditions.append(
+            sa.tuple_(*columns) > sa.tuple_(position.timestamp, position.id)
+        )
+    if until is not None:
+        conditions.append(columns[0] < until)
+    return conditions
+
+
+def changes(
+    resource: str, position: Position | None, limit: int = DEFAULT_LIMIT
+) -> tuple[list[Change], Position | None]:
+    """
+    Return at most limit changes of resource after position, oldest first,
+    and the position of the last one. Both queries are served by the
+    (updated_at, id) indexes, so a page costs the same wherever the cursor is.
+    When there are no more changes, position is returned unchanged.
+    """
+    model = resources[resource]
+    table = model.__table__
+    until = horizon()
+
+    rows = db.session.execute(
+        select(table)
+        .where(*_window((table.c.updated_at, table.c.id), position, until))
+        .order_by(table.c.updated_at, table.c.id)
+        .limit(limit)
+    ).all()
+    tombstones = db.session.execute(
+        select(Tombstone.deleted_at, Tombstone.row_id)
+        .where(
+            Tombstone.table_name == table.name,
+            *_window((Tombstone.deleted_at, Tombstone.row_id), position, until),
+        )
+        .order_by(Tombstone.deleted_at, Tombstone.row_id)
+        .limit(limit)
+    ).all()
+
+    entries = [
+        (
+            Position(row.updated_at, row.id),
+            {
+                "operation": UPSERT,
+                "id": row.id,
+                "data": {key: serialize(value) for key, value in row._asdict().items()},
+            },
+        )
+        for row in rows
+    ]
+    entries.extend(
+        (
+            Position(deleted_at, row_id),
+            {"operation": DELETE, "id": row_id, "deleted_at": deleted_at.isoformat()},
+        )
+        for deleted_at, row_id in tombstones
+    )
+    entries.sort(key=lambda entry: entry[0])
+    entries = entries[:limit]
+
+    if entries:
+        position = entries[-1][0]
+    return [change for _, change in entries], position
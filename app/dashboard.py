@@ -0,0 +1,266 @@
+"""
+This module contains the KPIs shown on the admin dashboard. They are
+computed by a small set of aggregate queries, run concurrently on separate
+connections by the fan-out pool, and cached with a TTL. Recomputation is
+single-flight: while a value is being computed, other requests wait for it,
+or get the stale value if there is one, instead of running the queries
+again. When the computation fails, the waiting requests get its error too,
+rather than all running the queries again right when the database is
+struggling.
+"""
+
+import datetime
+import functools
+import threading
+import time
+from concurrent.futures import Future
+from dataclasses import dataclass
+from decimal import Decimal
+from typing import Any, Callable, Hashable
+
+from flask import current_app
+from sqlalchemy import exists, func, select
+from sqlalchemy.engine import Connection
+
+from . import db
+from .branches import branch_engine, current_branch_id
+from .fan_out import run_concurrently
+from .models import Class, Cycle, Level, Payment, Student
+
+
+class SingleFlightCache:
+    """
+    This class represents an in-process cache with a TTL where a missing or
+    expired value is computed by a single caller at a time.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._values: dict[Hashable, tuple[float, Any]] = {}
+        self._inflight: dict[Hashable, Future] = {}
+
+    def get(self, key: Hashable, compute: Callable[[], Any], ttl: float) -> Any:
+        """
+        Return the value cached for key, computing it if it is missing or
+        older than ttl seconds. Callers arriving while it is computed get
+        the stale value if there is one and otherwise wait for the result,
+        or the exception raised by the computation.
+        """
+        with self._lock:
+            expires_at, value = self._values.get(key, (0.0, None))
+            if time.monotonic() < expires_at:
+                return value
+            flight = self._inflight.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._inflight[key] = Future()
+            elif key in self._values:
+                return value
+
+        if not leader:
+            return flight.result()
+
+        try:
+            value = compute()
+        except BaseException as exc:
+            with self._lock:
+                del self._inflight[key]
+            flight.set_exception(exc)
+            raise
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+            del self._inflight[key]
+        flight.set_result(value)
+        return value
+
+    def get_stale(self, key: Hashable) -> Any:
+        """Return the value cached for key, even if expired, or None."""
+        with self._lock:
+            return self._values.get(key, (0.0, None))[1]
+
+    def clear(self) -> None:
+        """Remove every cached value."""
+        with self._lock:
+            self._values.clear()
+
+
+dashboard_cache = SingleFlightCache()
+
+
+@dataclass(frozen=True)
+class ClassFill:
+    """This class represents how full a class is."""
+
+    class_id: int
+    name: str
+    students: int
+    capacity: int
+
+    @property
+    def rate(self) -> float:
+        """Fraction of the capacity taken by students."""
+        return self.students / self.capacity if self.capacity else 0.0
+
+
+@dataclass(frozen=True)
+class Dashboard:  # pylint: disable=too-many-instance-attributes
+    """This class represents the KPIs of the current cycle."""
+
+    cycle: str | None
+    active_students: int
+    students_per_level: dict[Level, int]
+    revenue: Decimal
+    unpaid_students: int
+    class_fill: list[ClassFill]
+    computed_at: datetime.datetime
+
+
+def _active_students(connection: Connection, cycle_id: int) -> int:
+    """Return the number of students enrolled in a class of the cycle."""
+    return connection.execute(
+        select(func.count(Student.id))
+        .join(Class, Student.class_id == Class.id)
+        .where(Class.cycle_id == cycle_id)
+    ).scalar_one()
+
+
+def _students_per_level(connection: Connection, cycle_id: int) -> dict[Level, int]:
+    """Return the number of students enrolled in the cycle per level."""
+    rows = connection.execute(
+        select(Class.level, func.count(Student.id))
+        .join(Class, Student.class_id == Class.id)
+        .where(Class.cycle_id == cycle_id)
+        .group_by(Class.level)
+    )
+    counts = dict(rows.all())
+    return {level: counts.get(level, 0) for level in Level}
+
+
+def _revenue(connection: Connection, cycle_id: int) -> Decimal:
+    """Return the amount paid for the cycle, net of discounts."""
+    return connection.execute(
+        select(
+            func.coalesce(
+                func.sum(Payment.amount - func.coalesce(Payment.discount, 0)), 0
+            )
+        ).where(Payment.cycle_id == cycle_id)
+    ).scalar_one()
+
+
+def _unpaid_students(connection: Connection, cycle_id: int) -> int:
+    """Return the number of students enrolled in the cycle who have not paid."""
+    return connection.execute(
+        select(func.count(Student.id))
+        .join(Class, Student.class_id == Class.id)
+        .where(
+            Class.cycle_id == cycle_id,
+            ~exists().where(
+                Payment.student_id == Student.id, Payment.cycle_id == cycle_id
+            ),
+        )
+    ).scalar_one()
+
+
+def _class_fill(connection: Connection, cycle_id: int) -> list[tuple[Any, ...]]:
+    """Return the classes of the cycle along with their number of students."""
+    return [
+        tuple(row)
+        for row in connection.execute(
+            select(
+                Class.id,
+                Class.level,
+                Class.sub_level,
+                Class.mode,
+                func.count(Student.id),
+            )
+            .outerjoin(Student, Student.class_id == Class.id)
+            .where(Class.cycle_id == cycle_id)
+            .group_by(Class.id)
+            .order_by(Class.level, Class.sub_level, Class.start_at)
+        )
+    ]
+
+
+QUERIES: dict[str, Callable[[Connection, int], Any]] = {
+    "active_students": _active_students,
+    "students_per_level": _students_per_level,
+    "revenue": _revenue,
+    "unpaid_students": _unpaid_students,
+    "class_fill": _class_fill,
+}
+
+
+def current_cycle(today: datetime.date) -> Cycle | None:
+    """Return the cycle today belongs to, if any."""
+    return db.session.execute(
+        select(Cycle)
+        .where(Cycle.start_date <= today, Cycle.end_date >= today)
+        .order_by(Cycle.start_date.desc())
+        .limit(1)
+    ).scalar_one_or_none()
+
+
+def compute_dashboard(today: datetime.date) -> Dashboard:
+    """Compute the KPIs of the cycle today belongs to."""
+    config = current_app.config
+    capacity = config["CLASS_CAPACITY"]
+    now = datetime.datetime.utcnow()
+
+    cycle = current_cycle(today)
+    if cycle is None:
+        return Dashboard(
+            cycle=None,
+            active_students=0,
+            students_per_level={level: 0 for level in Level},
+            revenue=Decimal(0),
+            unpaid_students=0,
+            class_fill=[],
+            computed_at=now,
+        )
+
+    results = run_concurrently(
+        {
+            name: functools.partial(query, cycle_id=cycle.id)
+            for name, query in QUERIES.items()
+        },
+        engine=branch_engine(),
+    )
+    return Dashboard(
+        cycle=str(cycle),
+        active_students=results["active_students"],
+        students_per_level=results["students_per_level"],
+        revenue=results["revenue"],
+        unpaid_students=results["unpaid_students"],
+        class_fill=[
+            ClassFill(
+                class_id=class_id,
+                name=f"{level.value}{sub_level.value} {mode.value}",
+                students=students,
+                capacity=capacity,
+            )
+            for class_id, level, sub_level, mode, students in results["class_fill"]
+        ],
+        computed_at=now,
+    )
+
+
+def get_dashboard(today: datetime.date | None = None) -> Dashboard:
+    """
+    Return the cached KPIs of the current cycle of the branch of the request,
+    computing them if needed.
+    """
+    today = today or datetime.date.today()
+    return dashboard_cache.get(
+        (today, current_branch_id()),
+        lambda: compute_dashboard(today),
+        current_app.config["DASHBOARD_CACHE_TTL"],
+    )
+
+
+def get_stale_dashboard(today: datetime.date | None = None) -> Dashboard | None:
+    """
+    Return the KPIs of the current cycle of the branch of the request last
+    cached, even if expired, if any.
+    """
+    today = today or datetime.date.today()
+    return dashboard_cache.get_stale((today, current_branch_id()))
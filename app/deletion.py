@@ -0,0 +1,101 @@
+"""
+This module contains what deleting a representative, a class or a cycle
+does to the rows depending on it, shown before the deletion is confirmed.
+
+Dependents are handled by the ON DELETE rules of the foreign keys, so a
+deletion is a single DELETE whatever the number of dependents: the
+classes, the attendance and the reminders of a deleted cycle are deleted
+with it, and rows with payments cannot be deleted. Students are detached
+beforehand by a single UPDATE, since SET NULL would leave their updated_at
+and the audit trail untouched. Each impact is counted by a single query.
+"""
+
+from dataclasses import dataclass, field
+
+from sqlalchemy import func, select
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlalchemy.sql import ColumnElement
+
+from . import db
+from .audit import bulk_update
+from .models import Attendance, Class, Payment, Reminder, Student
+
+
+@dataclass(frozen=True)
+class DeleteImpact:
+    """
+    This class represents the number of rows, by kind, which a deletion
+    deletes, detaches, or which prevent it.
+    """
+
+    deleted: dict[str, int] = field(default_factory=dict)
+    detached: dict[str, int] = field(default_factory=dict)
+    blocking: dict[str, int] = field(default_factory=dict)
+
+    @property
+    def blocked(self) -> bool:
+        """Whether the deletion is refused by the database."""
+        return any(self.blocking.values())
+
+
+def _counts(**queries: object) -> dict[str, int]:
+    """Return the counts of the scalar queries, by name, in one round trip."""
+    row = db.session.execute(
+        select(
+            *[query.scalar_subquery().label(name) for name, query in queries.items()]
+        )
+    ).one()
+    return dict(row._mapping)  # pylint: disable=protected-access
+
+
+def representative_impact(representative_id: int) -> DeleteImpact:
+    """Return the impact of deleting the representative."""
+    counts = _counts(
+        students=select(func.count(Student.id)).where(
+            Student.representative_id == representative_id
+        )
+    )
+    return DeleteImpact(detached={"students": counts["students"]})
+
+
+def class_impact(class_id: int) -> DeleteImpact:
+    """Return the impact of deleting the class."""
+    counts = _counts(
+        attendance=select(func.count()).where(Attendance.class_id == class_id),
+        students=select(func.count(Student.id)).where(Student.class_id == class_id),
+    )
+    return DeleteImpact(
+        deleted={"attendance records": counts["attendance"]},
+        detached={"students": counts["students"]},
+    )
+
+
+def cycle_impact(cycle_id: int) -> DeleteImpact:
+    """Return the impact of deleting the cycle."""
+    class_ids = select(Class.id).where(Class.cycle_id == cycle_id)
+    counts = _counts(
+        classes=select(func.count(Class.id)).where(Class.cycle_id == cycle_id),
+        attendance=select(func.count()).where(Attendance.class_id.in_(class_ids)),
+        reminders=select(func.count(Reminder.id)).where(Reminder.cycle_id == cycle_id),
+        students=select(func.count(Student.id)).where(Student.class_id.in_(class_ids)),
+        payments=select(func.count(Payment.id)).where(Payment.cycle_id == cycle_id),
+    )
+    return DeleteImpact(
+        deleted={
+            "classes": counts["classes"],
+            "attendance records": counts["attendance"],
+            "payment reminders": counts["reminders"],
+        },
+        detached={"students": counts["students"]},
+        blocking={"payments": counts["payments"]},
+    )
+
+
+def detach_students(
+    attribute: InstrumentedAttribute, condition: ColumnElement[bool]
+) -> int:
+    """
+    Set attribute to NULL on the students matching condition, and return
+    the number of detached students.
+    """
+    return bulk_update(db.session, attribute, None, condition)
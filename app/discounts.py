@@ -0,0 +1,118 @@
+"""
+This module contains the sibling discounts of a cycle. Students enrolled in
+a class of the cycle are grouped by representative, and each of them gets
+the discount of the highest tier their number of enrolled siblings, them
+included, reaches. Tiers map a number of siblings to a discount amount per
+student, see `SIBLING_DISCOUNTS`.
+
+Discounts are computed for the whole cycle by one query, with a window
+count over the representatives, so pre-filling a payment and applying the
+discounts to the payments of a cycle cost a single statement each. A
+student gets the discount once per cycle, on their earliest payment.
+"""
+
+from decimal import Decimal
+
+from sqlalchemy import case, exists, func, select, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.sql import Select
+
+from . import db
+from .audit import buffer_entries
+from .changes import serialize
+from .models import AuditAction, Class, Payment, Student
+
+Tiers = dict[int, Decimal]
+
+
+def discount_query(cycle_id: int, tiers: Tiers) -> Select:
+    """
+    Return a query of the students enrolled in the cycle who get a sibling
+    discount, with columns `student_id` and `discount`.
+    """
+    siblings = func.count().over(partition_by=Student.representative_id)
+    enrolled = (
+        select(Student.id.label("student_id"), siblings.label("siblings"))
+        .join(Class, Student.class_id == Class.id)
+        .where(Class.cycle_id == cycle_id, Student.representative_id.isnot(None))
+        .subquery("enrolled")
+    )
+    discount = case(
+        *[
+            (enrolled.c.siblings >= count, amount)
+            for count, amount in sorted(tiers.items(), reverse=True)
+        ]
+    )
+    return select(enrolled.c.student_id, discount.label("discount")).where(
+        enrolled.c.siblings >= min(tiers)
+    )
+
+
+def sibling_discounts(cycle_id: int, tiers: Tiers) -> dict[int, Decimal]:
+    """Return the sibling discounts of the cycle by student id."""
+    if not tiers:
+        return {}
+    return dict(db.session.execute(discount_query(cycle_id, tiers)).all())
+
+
+def sibling_discount(student_id: int, cycle_id: int, tiers: Tiers) -> Decimal:
+    """Return the sibling discount of the student for the cycle, zero if none."""
+    if not tiers:
+        return Decimal(0)
+    discounts = discount_query(cycle_id, tiers).subquery("discounts")
+    discount = db.session.execute(
+        select(discounts.c.discount).where(discounts.c.student_id == student_id)
+    ).scalar_one_or_none()
+    return discount or Decimal(0)
+
+
+def apply_sibling_discounts(cycle_id: int, tiers: Tiers) -> int:
+    """
+    Set the sibling discount on the earliest payment of the cycle of each
+    student none of whose payments of the cycle has a discount yet, without
+    exceeding its amount, with one UPDATE which also returns its previous
+    discount for the audit trail. Manual discounts are kept, and applying
+    the discounts again changes nothing. Return the number of updated
+    payments.
+    """
+    if not tiers:
+        return 0
+    session = db.session
+    discounts = discount_query(cycle_id, tiers).subquery("discounts")
+    discounted = aliased(Payment)
+    previous = (
+        select(Payment.id, Payment.discount)
+        .where(
+            Payment.cycle_id == cycle_id,
+            ~exists().where(
+                discounted.student_id == Payment.student_id,
+                discounted.cycle_id == cycle_id,
+                func.coalesce(discounted.discount, 0) != 0,
+            ),
+        )
+        .distinct(Payment.student_id)
+        .order_by(Payment.student_id, Payment.id)
+        .subquery("previous")
+    )
+    rows = session.execute(
+        update(Payment)
+        .where(
+            Payment.id == previous.c.id,
+            Payment.student_id == discounts.c.student_id,
+        )
+        .values(discount=func.least(discounts.c.discount, Payment.amount))
+        .returning(Payment.id, previous.c.discount, Payment.discount)
+        .execution_options(synchronize_session=False)
+    ).all()
+    buffer_entries(
+        session,
+        Payment,
+        AuditAction.UPDATE,
+        {
+            payment_id: {"discount": {"old": serialize(old), "new": serialize(new)}}
+            for payment_id, old, new in rows
+            if old != new
+        },
+    )
+    session.commit()
+    return len(rows)
@@ -0,0 +1,69 @@
+"""
+This module contains the data of the family page of a representative: the
+students they represent, with their current class, and what each of them
+paid for the recent cycles. Students are paginated and their classes are
+loaded with select-in loads, and the payments of the whole page are summed
+by a single aggregate, so the page costs the same few queries whatever the
+size of the family.
+"""
+
+from decimal import Decimal
+
+from flask_sqlalchemy.pagination import Pagination
+from sqlalchemy import func, select
+from sqlalchemy.orm import selectinload
+
+from . import db
+from .models import Class, Cycle, Payment, Student
+
+FAMILY_PAGE_SIZE = 20
+RECENT_CYCLES = 6
+
+
+def family_students(representative_id: int) -> Pagination:
+    """
+    Return the requested page of the students of the representative, with
+    their class and its cycle loaded.
+    """
+    return db.paginate(
+        select(Student)
+        .where(Student.representative_id == representative_id)
+        .order_by(Student.first_surname, Student.first_name, Student.id)
+        .options(selectinload(Student.class_).selectinload(Class.cycle)),
+        per_page=FAMILY_PAGE_SIZE,
+        max_per_page=FAMILY_PAGE_SIZE,
+    )
+
+
+def recent_cycles(count: int = RECENT_CYCLES) -> list[Cycle]:
+    """Return the last count cycles, the latest first."""
+    return (
+        db.session.execute(
+            select(Cycle)
+            .order_by(Cycle.start_date.desc(), Cycle.id.desc())
+            .limit(count)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def paid_amounts(
+    student_ids: list[int], cycle_ids: list[int]
+) -> dict[tuple[int, int], Decimal]:
+    """
+    Return the amount each student paid for each cycle, net of discounts,
+    keyed by student and cycle id. Pairs without payments are left out.
+    """
+    if not student_ids or not cycle_ids:
+        return {}
+    rows = db.session.execute(
+        select(
+            Payment.student_id,
+            Payment.cycle_id,
+            func.sum(Payment.amount - func.coalesce(Payment.discount, 0)),
+        )
+        .where(Payment.student_id.in_(student_ids), Payment.cycle_id.in_(cycle_ids))
+        .group_by(Payment.student_id, Payment.cycle_id)
+    )
+    return {(student_id, cycle_id): paid for student_id, cycle_id, paid in rows}
@@ -0,0 +1,163 @@
+"""
+This module contains the fan-out of independent read-only queries, for pages
+built from several aggregates, like the dashboard. Each query runs in a
+read-only transaction on its own pooled connection, in a thread pool shared
+by the process, so a page waits for its slowest query instead of their sum.
+
+Every query is bounded by a timeout, enforced by PostgreSQL through
+`statement_timeout`. When a query fails or the caller stops waiting, the
+queries not started yet are cancelled and the running ones are interrupted,
+so no connection is left busy with a result nobody reads.
+
+Each query runs in a copy of the context of the caller, so context
+variables, like the recording of a profiled request, follow it.
+
+Queries on separate connections do not share a snapshot: they may see
+different commits, which is fine for KPIs but not for figures which must
+add up across queries.
+"""
+
+import contextvars
+import threading
+from concurrent.futures import FIRST_EXCEPTION, ThreadPoolExecutor, wait
+from typing import Any, Callable, Mapping
+
+from flask import Flask, current_app
+from sqlalchemy.engine import Connection, Engine
+
+Query = Callable[[Connection], Any]
+
+
+class FanOutError(Exception):
+    """This exception is raised when a query fails or times out."""
+
+
+def _statement_timeout(timeout: float) -> str:
+    """Return timeout, in seconds, as a value of `statement_timeout`."""
+    return f"{max(int(timeout * 1000), 1)}ms"
+
+
+class FanOut:  # pylint: disable=too-few-public-methods
+    """
+    This class represents a pool of threads running queries concurrently on
+    the connections of an engine. The threads are started on first use, so
+    a pre-fork server only starts them in its workers.
+    """
+
+    def __init__(self, engine: Engine, workers: int, timeout: float) -> None:
+        self.engine = engine
+        self.workers = workers
+        self.timeout = timeout
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        """Return the thread pool, starting it if needed."""
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.workers, thread_name_prefix="fan-out"
+                )
+            return self._executor
+
+    def run(
+        self,
+        queries: Mapping[str, Query],
+        timeout: float | None = None,
+        engine: Engine | None = None,
+    ) -> dict[str, Any]:
+        """
+        Run every query of queries on engine, the default engine if not
+        given, and return their results by name. Each query gets timeout
+        seconds, the default timeout if not given, and the whole run does
+        too, since queries may wait for a free thread. With less than two
+        workers, queries run one after the other on the connection of the
+        session.
+        """
+        timeout = self.timeout if timeout is None else timeout
+        if self.workers < 2:
+            return self._run_serially(queries, timeout, engine)
+        engine = engine or self.engine
+
+        running: dict[str, Any] = {}
+        running_lock = threading.Lock()
+
+        def run(name: str, query: Query) -> Any:
+            with engine.connect() as connection:
+                with connection.begin():
+                    connection.exec_driver_sql("SET TRANSACTION READ ONLY")
+                    connection.exec_driver_sql(
+                        f"SET LOCAL statement_timeout = '{_statement_timeout(timeout)}'"
+                    )
+                    with running_lock:
+                        running[name] = connection.connection.dbapi_connection
+                    try:
+                        return query(connection)
+                    finally:
+                        with running_lock:
+                            del running[name]
+
+        executor = self._get_executor()
+        futures = {
+            executor.submit(contextvars.copy_context().run, run, name, query): name
+            for name, query in queries.items()
+        }
+        done, pending = wait(futures, timeout=timeout, return_when=FIRST_EXCEPTION)
+        failed = next((future for future in done if future.exception()), None)
+        if failed is None and not pending:
+            return {name: future.result() for future, name in futures.items()}
+
+        for future in pending:
+            future.cancel()
+        with running_lock:
+            for connection in running.values():
+                connection.cancel()
+        if failed is not None:
+            raise FanOutError(
+                f"Query {futures[failed]} failed: {failed.exception()}"
+            ) from failed.exception()
+        names = ", ".join(sorted(futures[future] for future in pending))
+        raise FanOutError(f"Queries {names} timed out after {timeout:g}s.")
+
+    @staticmethod
+    def _run_serially(
+        queries: Mapping[str, Query], timeout: float, engine: Engine | None
+    ) -> dict[str, Any]:
+        """Run every query of queries on the connection of the session."""
+        session = current_app.extensions["sqlalchemy"].session
+        connection = session.connection(
+            bind_arguments=None if engine is None else {"bind": engine}
+        )
+        previous = connection.exec_driver_sql("SHOW statement_timeout").scalar_one()
+        connection.exec_driver_sql(
+            f"SET LOCAL statement_timeout = '{_statement_timeout(timeout)}'"
+        )
+        results = {}
+        for name, query in queries.items():
+            try:
+                results[name] = query(connection)
+            except Exception as exc:
+                # the transaction failed, rolling it back resets the timeout
+                raise FanOutError(f"Query {name} failed: {exc}") from exc
+        connection.exec_driver_sql(f"SET LOCAL statement_timeout = '{previous}'")
+        return results
+
+
+def init_fan_out(app: Flask) -> FanOut:
+    """Create the fan-out pool of app, sized by its configuration."""
+    with app.app_context():
+        engine = app.extensions["sqlalchemy"].engine
+    fan_out = FanOut(
+        engine, app.config["FAN_OUT_WORKERS"], app.config["FAN_OUT_TIMEOUT"]
+    )
+    app.extensions["fan_out"] = fan_out
+    return fan_out
+
+
+def run_concurrently(
+    queries: Mapping[str, Query],
+    timeout: float | None = None,
+    engine: Engine | None = None,
+) -> dict[str, Any]:
+    """Run queries with the fan-out pool of the current app, see FanOut.run."""
+    return current_app.extensions["fan_out"].run(queries, timeout, engine)
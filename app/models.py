@@ -5,15 +5,17 @@ from typing import Any
 
 import sqlalchemy as sa
 from flask_login import UserMixin
-from sqlalchemy import select
+from sqlalchemy import DDL, event, select
+from sqlalchemy.dialects.postgresql import JSONB, NUMRANGE
 from sqlalchemy.ext.compiler import compiles
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import column_property, relationship
 from sqlalchemy.sql.compiler import SQLCompiler
 from sqlalchemy.sql.expression import FunctionElement
 from sqlalchemy_utils import EmailType, PhoneNumberType
 from werkzeug.security import check_password_hash, generate_password_hash
 
 from . import db, login_manager
+from .branches import MAIN_BRANCH_ID, BranchMixin
 
 
 class utc_now(FunctionElement):  # pylint: disable=invalid-name,too-many-ancestors
@@ -37,14 +39,46 @@ class BaseModel(db.Model):  # pylint: disable=too-few-public-methods
     """This class represents a base abstract model."""
 
     __abstract__ = True
-    created_at = sa.Column(sa.DateTime, default=utc_now(), nullable=False)
+    created_at = sa.Column(sa.DateTime, default=utc_now(), nullable=False, index=True)
     updated_at = sa.Column(
         sa.DateTime, default=utc_now(), onupdate=utc_now(), nullable=False
     )
 
 
+class Branch(BaseModel):  # pylint: disable=too-few-public-methods
+    """
+    This class is used to model the locations of the school, see
+    `app/branches.py`. The main branch is created along with the schema.
+    """
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    code = sa.Column(sa.Unicode(32), unique=True, nullable=False)
+    name = sa.Column(sa.Unicode(255), nullable=False)
+
+    def __str__(self) -> str:
+        return str(self.name)
+
+    def __repr__(self) -> str:
+        return f'Branch(code="{self.code}", name="{self.name}")'
+
+
+MAIN_BRANCH = (
+    "INSERT INTO branch (id, code, name, created_at, updated_at) "
+    f"VALUES ({MAIN_BRANCH_ID}, 'main', 'Main', "
+    "TIMEZONE('utc', CURRENT_TIMESTAMP), TIMEZONE('utc', CURRENT_TIMESTAMP)); "
+    f"SELECT setval(pg_get_serial_sequence('branch', 'id'), {MAIN_BRANCH_ID})"
+)
+
+event.listen(
+    Branch.__table__, "after_create", DDL(MAIN_BRANCH).execute_if(dialect="postgresql")
+)
+
+
 class User(UserMixin, BaseModel):  # pylint: disable=too-few-public-methods
-    """This class is used to model users."""
+    """
+    This class is used to model users. A user of a branch only sees the
+    rows of that branch, a user without a branch sees every branch.
+    """
 
     id = sa.Column(sa.Integer, primary_key=True)
     first_name = sa.Column(sa.Unicode(255), nullable=False)
@@ -53,6 +87,8 @@ class User(UserMixin, BaseModel):  # pylint: disable=too-few-public-methods
     second_surname = sa.Column(sa.Unicode(255))
     email = sa.Column(EmailType, unique=True, nullable=False)
     password_hash = sa.Column(sa.Unicode(255))
+    branch_id = sa.Column(sa.Integer, sa.ForeignKey("branch.id"), index=True)
+    branch = relationship("Branch")
 
     def __str__(self) -> str:
         return f"{self.first_name} {self.first_surname} - {self.email}"
@@ -105,9 +141,14 @@ class Sex(str, Enum):  # pylint: disable=too-few-public-methods
     MALE = "Male"
 
 
-class Student(BaseModel):  # pylint: disable=too-few-public-methods
+class Student(BranchMixin, BaseModel):  # pylint: disable=too-few-public-methods
     """This class is used to model students."""
 
+    __table_args__ = (
+        sa.Index("ix_student_branch_id_first_surname", "branch_id", "first_surname"),
+        sa.Index("ix_student_branch_id_created_at", "branch_id", "created_at"),
+    )
+
     id = sa.Column(sa.Integer, primary_key=True)
     identity_document = sa.Column(sa.Unicode(255), unique=True, nullable=False)
     first_name = sa.Column(sa.Unicode(255), nullable=False)
@@ -118,12 +159,23 @@ class Student(BaseModel):  # pylint: disable=too-few-public-methods
     email = sa.Column(EmailType, unique=True, nullable=False)
     birth_date = sa.Column(sa.Date, nullable=False)
     phone_number = sa.Column(PhoneNumberType())
+    # the stored E.164 string, loaded by list views instead of a PhoneNumber
+    phone_number_e164 = column_property(
+        sa.type_coerce(phone_number, sa.Unicode(20)), deferred=True
+    )
 
-    representative_id = sa.Column(sa.Integer, sa.ForeignKey("representative.id"))
+    representative_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("representative.id", ondelete="SET NULL"),
+        index=True,
+    )
     representative = relationship("Representative", back_populates="students")
-    class_id = sa.Column(sa.Integer, sa.ForeignKey("class.id"))
+    class_id = sa.Column(
+        sa.Integer, sa.ForeignKey("class.id", ondelete="SET NULL"), index=True
+    )
     class_ = relationship("Class", back_populates="students")
-    payments = relationship("Payment", back_populates="student")
+    # students with payments cannot be deleted, the database refuses it
+    payments = relationship("Payment", back_populates="student", passive_deletes="all")
 
     def __str__(self) -> str:
         return f"{self.identity_document} - {self.first_name} {self.first_surname}"
@@ -136,9 +188,16 @@ class Student(BaseModel):  # pylint: disable=too-few-public-methods
         )
 
 
-class Representative(BaseModel):  # pylint: disable=too-few-public-methods
+class Representative(BranchMixin, BaseModel):  # pylint: disable=too-few-public-methods
     """This class is used to model students' representatives."""
 
+    __table_args__ = (
+        sa.Index(
+            "ix_representative_branch_id_first_surname", "branch_id", "first_surname"
+        ),
+        sa.Index("ix_representative_branch_id_created_at", "branch_id", "created_at"),
+    )
+
     id = sa.Column(sa.Integer, primary_key=True)
     identity_document = sa.Column(sa.Unicode(255), unique=True, nullable=False)
     first_name = sa.Column(sa.Unicode(255), nullable=False)
@@ -148,8 +207,14 @@ class Representative(BaseModel):  # pylint: disable=too-few-public-methods
     sex = sa.Column(sa.Enum(Sex), nullable=False)
     email = sa.Column(EmailType, unique=True)
     phone_number = sa.Column(PhoneNumberType(), nullable=False)
+    # the stored E.164 string, loaded by list views instead of a PhoneNumber
+    phone_number_e164 = column_property(
+        sa.type_coerce(phone_number, sa.Unicode(20)), deferred=True
+    )
 
-    students = relationship("Student", back_populates="representative")
+    students = relationship(
+        "Student", back_populates="representative", passive_deletes=True
+    )
 
     def __str__(self) -> str:
         return f"{self.identity_document} - {self.first_name} {self.first_surname}"
@@ -179,17 +244,25 @@ class Month(str, Enum):  # pylint: disable=too-few-public-methods
     DECEMBER = "December"
 
 
-class Cycle(BaseModel):  # pylint: disable=too-few-public-methods
+class Cycle(BranchMixin, BaseModel):  # pylint: disable=too-few-public-methods
     """This class is used to model cycles."""
 
+    __table_args__ = (
+        sa.Index("ix_cycle_branch_id_year_month", "branch_id", "year", "month"),
+        sa.Index("ix_cycle_branch_id_start_date", "branch_id", "start_date"),
+    )
+
     id = sa.Column(sa.Integer, primary_key=True)
     month = sa.Column(sa.Enum(Month), nullable=False)
     year = sa.Column(sa.Integer, nullable=False)
     start_date = sa.Column(sa.Date, nullable=False)
     end_date = sa.Column(sa.Date, nullable=False)
 
-    classes = relationship("Class", back_populates="cycle")
-    payments = relationship("Payment", back_populates="cycle")
+    classes = relationship(
+        "Class", back_populates="cycle", cascade="all, delete", passive_deletes=True
+    )
+    # cycles with payments cannot be deleted, the database refuses it
+    payments = relationship("Payment", back_populates="cycle", passive_deletes="all")
 
     def __str__(self) -> str:
         return f"{self.month} {self.year}"
@@ -222,19 +295,33 @@ class SubLevel(str, Enum):  # pylint: disable=too-few-public-methods
     P4 = "P4"
 
 
-class Class(BaseModel):  # pylint: disable=too-few-public-methods
+class Class(BranchMixin, BaseModel):  # pylint: disable=too-few-public-methods
     """This class is used to model classes."""
 
+    __table_args__ = (
+        sa.Index(
+            "ix_class_branch_id_level_sub_level", "branch_id", "level", "sub_level"
+        ),
+        sa.CheckConstraint("start_at < end_at", name="time_range"),
+    )
+
     id = sa.Column(sa.Integer, primary_key=True)
     mode = sa.Column(sa.Enum(Mode), nullable=False)
     start_at = sa.Column(sa.Time, nullable=False)
     end_at = sa.Column(sa.Time, nullable=False)
     level = sa.Column(sa.Enum(Level), nullable=False)
-    sub_level = sa.Column(sa.Enum(SubLevel), nullable=False)
-
-    cycle_id = sa.Column(sa.Integer, sa.ForeignKey("cycle.id"), nullable=False)
+    sub_level = sa.Column(sa.Enum(SubLevel, name="sub_level"), nullable=False)
+    room = sa.Column(sa.Unicode(64))
+    teacher = sa.Column(sa.Unicode(255))
+
+    cycle_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("cycle.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
     cycle = relationship("Cycle", back_populates="classes")
-    students = relationship("Student", back_populates="class_")
+    students = relationship("Student", back_populates="class_", passive_deletes=True)
 
     def __str__(self) -> str:
         return f"{self.level}{self.sub_level} {self.mode}"
@@ -247,17 +334,74 @@ class Class(BaseModel):  # pylint: disable=too-few-public-methods
         )
 
 
-class Payment(BaseModel):  # pylint: disable=too-few-public-methods
+# A class takes its room and teacher every day of its cycle from start_at to
+# end_at. class_slot() maps that schedule to a numeric range: each cycle and
+# room (or teacher) owns a disjoint unit interval, hashed from its name, and
+# the times of the day are fractions of it. Two classes clash when their
+# slots overlap, which a GiST index answers without the btree_gist extension.
+CLASS_SLOT_FUNCTION = """
+CREATE OR REPLACE FUNCTION class_slot(
+    cycle_id integer, resource text, start_at time, end_at time
+) RETURNS numrange AS $$
+    SELECT numrange(
+        cycle_id * 4294967296.0 + hashtext(resource) + 2147483648
+            + EXTRACT(EPOCH FROM start_at)::numeric / 86400,
+        cycle_id * 4294967296.0 + hashtext(resource) + 2147483648
+            + EXTRACT(EPOCH FROM end_at)::numeric / 86400
+    )
+$$ LANGUAGE sql IMMUTABLE STRICT PARALLEL SAFE
+"""
+
+
+def class_slot(cycle_id: Any, resource: Any, start_at: Any, end_at: Any) -> Any:
+    """Return an SQL expression computing the slot a class takes in a resource."""
+    return sa.func.class_slot(cycle_id, resource, start_at, end_at, type_=NUMRANGE)
+
+
+event.listen(
+    db.metadata,
+    "before_create",
+    DDL(CLASS_SLOT_FUNCTION).execute_if(dialect="postgresql"),
+)
+event.listen(
+    db.metadata,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS class_slot").execute_if(dialect="postgresql"),
+)
+for slot_column in (Class.room, Class.teacher):
+    sa.Index(
+        f"ix_class_{slot_column.name}_slot",
+        class_slot(Class.cycle_id, slot_column, Class.start_at, Class.end_at),
+        postgresql_using="gist",
+        postgresql_where=slot_column.isnot(None),
+    )
+
+
+class Payment(BranchMixin, BaseModel):  # pylint: disable=too-few-public-methods
     """This class is used to model payments."""
 
+    __table_args__ = (
+        sa.Index("ix_payment_branch_id_created_at", "branch_id", "created_at"),
+    )
+
     id = sa.Column(sa.Integer, primary_key=True)
     amount = sa.Column(sa.Numeric(10, 2), nullable=False)
     discount = sa.Column(sa.Numeric(10, 2))
     description = sa.Column(sa.Unicode(255))
 
-    student_id = sa.Column(sa.Integer, sa.ForeignKey("student.id"), nullable=False)
+    student_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("student.id", ondelete="RESTRICT"),
+        nullable=False,
+        index=True,
+    )
     student = relationship("Student", back_populates="payments")
-    cycle_id = sa.Column(sa.Integer, sa.ForeignKey("cycle.id"), nullable=False)
+    cycle_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("cycle.id", ondelete="RESTRICT"),
+        nullable=False,
+        index=True,
+    )
     cycle = relationship("Cycle", back_populates="payments")
 
     def __str__(self) -> str:
@@ -271,4 +415,400 @@ class Payment(BaseModel):  # pylint: disable=too-few-public-methods
         return f"Payment(amount=${self.amount})"
 
 
-models = [User, Student, Representative, Cycle, Class, Payment]
+class ArchivedCycle(BranchMixin, db.Model):  # pylint: disable=too-few-public-methods
+    """This class is used to model cycles moved out of the `cycle` table."""
+
+    __tablename__ = "archived_cycle"
+    __table_args__ = (
+        sa.Index("ix_archived_cycle_branch_id_archived_at", "branch_id", "archived_at"),
+    )
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=False)
+    month = sa.Column(sa.Enum(Month), nullable=False)
+    year = sa.Column(sa.Integer, nullable=False)
+    start_date = sa.Column(sa.Date, nullable=False)
+    end_date = sa.Column(sa.Date, nullable=False)
+    created_at = sa.Column(sa.DateTime, nullable=False)
+    updated_at = sa.Column(sa.DateTime, nullable=False)
+    archived_at = sa.Column(sa.DateTime, default=utc_now(), nullable=False)
+
+    classes = relationship("ArchivedClass", back_populates="cycle")
+    payments = relationship("ArchivedPayment", back_populates="cycle")
+
+    def __str__(self) -> str:
+        return f"{self.month} {self.year}"
+
+    def __repr__(self) -> str:
+        return f'ArchivedCycle(month="{self.month}", year={self.year})'
+
+
+class ArchivedClass(BranchMixin, db.Model):  # pylint: disable=too-few-public-methods
+    """This class is used to model classes of an archived cycle."""
+
+    __tablename__ = "archived_class"
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=False)
+    mode = sa.Column(sa.Enum(Mode), nullable=False)
+    start_at = sa.Column(sa.Time, nullable=False)
+    end_at = sa.Column(sa.Time, nullable=False)
+    level = sa.Column(sa.Enum(Level), nullable=False)
+    sub_level = sa.Column(sa.Enum(SubLevel, name="sub_level"), nullable=False)
+    room = sa.Column(sa.Unicode(64))
+    teacher = sa.Column(sa.Unicode(255))
+    created_at = sa.Column(sa.DateTime, nullable=False)
+    updated_at = sa.Column(sa.DateTime, nullable=False)
+
+    cycle_id = sa.Column(
+        sa.Integer, sa.ForeignKey("archived_cycle.id"), nullable=False, index=True
+    )
+    cycle = relationship("ArchivedCycle", back_populates="classes")
+
+    def __str__(self) -> str:
+        return f"{self.level}{self.sub_level} {self.mode}"
+
+
+class ArchivedPayment(BranchMixin, db.Model):  # pylint: disable=too-few-public-methods
+    """This class is used to model payments of an archived cycle."""
+
+    __tablename__ = "archived_payment"
+
+    id = sa.Column(sa.Integer, primary_key=True, autoincrement=False)
+    amount = sa.Column(sa.Numeric(10, 2), nullable=False)
+    discount = sa.Column(sa.Numeric(10, 2))
+    description = sa.Column(sa.Unicode(255))
+    created_at = sa.Column(sa.DateTime, nullable=False)
+    updated_at = sa.Column(sa.DateTime, nullable=False)
+
+    student_id = sa.Column(
+        sa.Integer, sa.ForeignKey("student.id", ondelete="RESTRICT"), nullable=False
+    )
+    student = relationship("Student")
+    cycle_id = sa.Column(
+        sa.Integer, sa.ForeignKey("archived_cycle.id"), nullable=False, index=True
+    )
+    cycle = relationship("ArchivedCycle", back_populates="payments")
+
+    def __str__(self) -> str:
+        if self.discount is not None:
+            return f"${self.amount - self.discount} = ${self.amount} - ${self.discount}"
+        return f"${self.amount}"
+
+
+class ArchivedAttendance(db.Model):  # pylint: disable=too-few-public-methods
+    """
+    This class is used to model the attendance of the classes of an archived
+    cycle. Counters are not archived: restoring the attendance rebuilds them
+    through the attendance triggers.
+    """
+
+    __tablename__ = "archived_attendance"
+
+    class_id = sa.Column(
+        sa.Integer, sa.ForeignKey("archived_class.id"), primary_key=True
+    )
+    session_date = sa.Column(sa.Date, primary_key=True)
+    student_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("student.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    present = sa.Column(sa.Boolean, nullable=False)
+
+
+class Tombstone(db.Model):  # pylint: disable=too-few-public-methods
+    """
+    This class is used to model rows deleted from the tables exposed by the
+    change feed. Tombstones are recorded by a database trigger, so they are
+    also written by bulk deletes.
+    """
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    table_name = sa.Column(sa.Unicode(255), nullable=False)
+    row_id = sa.Column(sa.Integer, nullable=False)
+    deleted_at = sa.Column(sa.DateTime, default=utc_now(), nullable=False)
+
+    __table_args__ = (
+        sa.Index(
+            "ix_tombstone_table_name_deleted_at_row_id", table_name, deleted_at, row_id
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return f'Tombstone(table_name="{self.table_name}", row_id={self.row_id})'
+
+
+class AuditAction(str, Enum):  # pylint: disable=too-few-public-methods
+    """This enumeration is used to represent the kind of an audited change."""
+
+    INSERT = "Insert"
+    UPDATE = "Update"
+    DELETE = "Delete"
+
+
+class AuditEntry(db.Model):  # pylint: disable=too-few-public-methods
+    """
+    This class is used to model changes made to a row through the ORM, see
+    `app/audit.py`. Changes map attribute names to their old and new values.
+    """
+
+    __tablename__ = "audit_entry"
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    created_at = sa.Column(sa.DateTime, default=utc_now(), nullable=False, index=True)
+    user_id = sa.Column(sa.Integer, sa.ForeignKey("user.id"), index=True)
+    user = relationship("User")
+    table_name = sa.Column(sa.Unicode(255), nullable=False)
+    row_id = sa.Column(sa.Integer, nullable=False)
+    action = sa.Column(sa.Enum(AuditAction, name="audit_action"), nullable=False)
+    changes = sa.Column(JSONB, nullable=False)
+
+    __table_args__ = (sa.Index("ix_audit_entry_table_name_row_id", table_name, row_id),)
+
+    def __repr__(self) -> str:
+        return (
+            f'AuditEntry(table_name="{self.table_name}", row_id={self.row_id}, '
+            f"action={self.action.name})"
+        )
+
+
+TOMBSTONE_FUNCTION = """
+CREATE OR REPLACE FUNCTION record_tombstones() RETURNS trigger AS $$
+BEGIN
+    INSERT INTO tombstone (table_name, row_id, deleted_at)
+    SELECT TG_TABLE_NAME, deleted.id, TIMEZONE('utc', CURRENT_TIMESTAMP)
+    FROM deleted;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+TOMBSTONE_TRIGGER = """
+CREATE TRIGGER %(trigger)s
+AFTER DELETE ON %(table)s
+REFERENCING OLD TABLE AS deleted
+FOR EACH STATEMENT EXECUTE FUNCTION record_tombstones()
+"""
+
+# models exposed by the change feed
+feed_models = [Student, Representative, Cycle, Class, Payment]
+
+event.listen(
+    db.metadata,
+    "before_create",
+    DDL(TOMBSTONE_FUNCTION).execute_if(dialect="postgresql"),
+)
+event.listen(
+    db.metadata,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS record_tombstones").execute_if(dialect="postgresql"),
+)
+for feed_model in feed_models:
+    sa.Index(
+        f"ix_{feed_model.__tablename__}_updated_at_id",
+        feed_model.updated_at,
+        feed_model.id,
+    )
+    event.listen(
+        feed_model.__table__,
+        "after_create",
+        DDL(
+            TOMBSTONE_TRIGGER,
+            context={"trigger": f"{feed_model.__tablename__}_tombstones"},
+        ).execute_if(dialect="postgresql"),
+    )
+
+
+class Attendance(db.Model):  # pylint: disable=too-few-public-methods
+    """
+    This class is used to model whether a student attended a session of a
+    class. There is a row per student per session, so rows are kept narrow:
+    the key is the class, the date of the session and the student, and there
+    are no timestamps.
+    """
+
+    class_id = sa.Column(
+        sa.Integer, sa.ForeignKey("class.id", ondelete="CASCADE"), primary_key=True
+    )
+    session_date = sa.Column(sa.Date, primary_key=True)
+    student_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("student.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    present = sa.Column(sa.Boolean, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"Attendance(class_id={self.class_id}, "
+            f'session_date="{self.session_date}", '
+            f"student_id={self.student_id}, present={self.present})"
+        )
+
+
+class AttendanceCounter(db.Model):  # pylint: disable=too-few-public-methods
+    """
+    This class is used to model the number of sessions of a class recorded
+    for a student and how many of them the student attended. Counters are
+    maintained by a database trigger on the attendance table, so attendance
+    rates are read without scanning attendance rows.
+    """
+
+    __tablename__ = "attendance_counter"
+
+    class_id = sa.Column(
+        sa.Integer, sa.ForeignKey("class.id", ondelete="CASCADE"), primary_key=True
+    )
+    student_id = sa.Column(
+        sa.Integer,
+        sa.ForeignKey("student.id", ondelete="CASCADE"),
+        primary_key=True,
+        index=True,
+    )
+    sessions = sa.Column(sa.Integer, nullable=False)
+    attended = sa.Column(sa.Integer, nullable=False)
+
+    def __repr__(self) -> str:
+        return (
+            f"AttendanceCounter(class_id={self.class_id}, "
+            f"student_id={self.student_id}, sessions={self.sessions}, "
+            f"attended={self.attended})"
+        )
+
+
+# Rows are counted per statement from its transition tables. Removed rows
+# only update existing counters: when a class or a student is deleted, its
+# counters may already be gone along with its attendance.
+ATTENDANCE_COUNTER_FUNCTION = """
+CREATE OR REPLACE FUNCTION count_attendance() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        UPDATE attendance_counter AS counter
+        SET sessions = counter.sessions - removed.sessions,
+            attended = counter.attended - removed.attended
+        FROM (
+            SELECT class_id, student_id, count(*) AS sessions,
+                count(*) FILTER (WHERE present) AS attended
+            FROM old_rows
+            GROUP BY class_id, student_id
+        ) AS removed
+        WHERE counter.class_id = removed.class_id
+            AND counter.student_id = removed.student_id;
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        INSERT INTO attendance_counter AS counter
+            (class_id, student_id, sessions, attended)
+        SELECT class_id, student_id, count(*), count(*) FILTER (WHERE present)
+        FROM new_rows
+        GROUP BY class_id, student_id
+        ON CONFLICT (class_id, student_id) DO UPDATE
+        SET sessions = counter.sessions + excluded.sessions,
+            attended = counter.attended + excluded.attended;
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql
+"""
+# a trigger with transition tables can only handle a single event
+ATTENDANCE_COUNTER_TRIGGERS = {
+    "attendance_inserted": (
+        "AFTER INSERT ON attendance REFERENCING NEW TABLE AS new_rows"
+    ),
+    "attendance_updated": (
+        "AFTER UPDATE ON attendance "
+        "REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows"
+    ),
+    "attendance_deleted": (
+        "AFTER DELETE ON attendance REFERENCING OLD TABLE AS old_rows"
+    ),
+}
+
+event.listen(
+    db.metadata,
+    "before_create",
+    DDL(ATTENDANCE_COUNTER_FUNCTION).execute_if(dialect="postgresql"),
+)
+event.listen(
+    db.metadata,
+    "after_drop",
+    DDL("DROP FUNCTION IF EXISTS count_attendance").execute_if(dialect="postgresql"),
+)
+for trigger, timing in ATTENDANCE_COUNTER_TRIGGERS.items():
+    event.listen(
+        Attendance.__table__,
+        "after_create",
+        DDL(
+            f"CREATE TRIGGER {trigger} {timing} "
+            "FOR EACH STATEMENT EXECUTE FUNCTION count_attendance()"
+        ).execute_if(dialect="postgresql"),
+    )
+
+
+class ReminderStatus(str, Enum):  # pylint: disable=too-few-public-methods
+    """This enumeration is used to represent the delivery of a reminder."""
+
+    PENDING = "Pending"
+    SENT = "Sent"
+    FAILED = "Failed"
+
+
+class Reminder(BaseModel):  # pylint: disable=too-few-public-methods
+    """
+    This class is used to model a payment reminder queued for delivery, see
+    `app/reminders.py`. There is a reminder per recipient per cycle, so the
+    representative of several students gets a single message.
+    """
+
+    id = sa.Column(sa.Integer, primary_key=True)
+    cycle_id = sa.Column(
+        sa.Integer, sa.ForeignKey("cycle.id", ondelete="CASCADE"), nullable=False
+    )
+    cycle = relationship("Cycle")
+    recipient = sa.Column(sa.Unicode(255), nullable=False)
+    subject = sa.Column(sa.Unicode(255), nullable=False)
+    body = sa.Column(sa.UnicodeText, nullable=False)
+    status = sa.Column(
+        sa.Enum(ReminderStatus, name="reminder_status"),
+        default=ReminderStatus.PENDING,
+        nullable=False,
+    )
+    attempts = sa.Column(sa.Integer, default=0, nullable=False)
+    next_attempt_at = sa.Column(sa.DateTime, default=utc_now(), nullable=False)
+    sent_at = sa.Column(sa.DateTime)
+    error = sa.Column(sa.UnicodeText)
+
+    __table_args__ = (
+        sa.UniqueConstraint(cycle_id, recipient),
+        # the queue only scans the reminders left to send
+        sa.Index(
+            "ix_reminder_next_attempt_at_pending",
+            next_attempt_at,
+            postgresql_where=sa.text("status = 'PENDING'"),
+        ),
+    )
+
+    def __repr__(self) -> str:
+        return (
+            f'Reminder(cycle_id={self.cycle_id}, recipient="{self.recipient}", '
+            f"status={self.status.name})"
+        )
+
+
+models = [
+    Branch,
+    User,
+    Student,
+    Representative,
+    Cycle,
+    Class,
+    Payment,
+    ArchivedCycle,
+    ArchivedClass,
+    ArchivedPayment,
+    ArchivedAttendance,
+    Tombstone,
+    AuditEntry,
+    Attendance,
+    AttendanceCounter,
+    Reminder,
+]
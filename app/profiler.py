@@ -0,0 +1,193 @@
+"""
+This module contains an on-demand request profiler. A logged in user asks
+for a single request to be profiled by sending the `X-Profile` header or
+the `_profile` query argument. The request then runs under cProfile, with
+its SQL statements timed, and the result is stored in the profile folder,
+where the `admin` blueprint lists it. The hooks are registered on the app
+by the `admin` blueprint.
+
+Requests that do not ask for a profile only pay for looking up the header
+and the query argument, and for reading a context variable per statement.
+The SQL listeners are registered on every engine once, when this module is
+imported, so the main and branch databases are covered and no listener is
+added or removed while other threads execute statements. They record the
+statements of the recording found in the context, which the fan-out copies
+into its threads.
+"""
+
+import contextvars
+import cProfile
+import datetime
+import io
+import json
+import pstats
+import re
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, current_app, g, request
+from flask.wrappers import Response
+from flask_login import current_user
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+HEADER = "X-Profile"
+QUERY_ARG = "_profile"
+STATS_LIMIT = 60
+PROFILE_ID = re.compile(r"^\d{8}T\d{6}-[0-9a-f]{8}$")
+
+
+@dataclass
+class _Recording:  # pylint: disable=too-many-instance-attributes
+    """This class represents the profile of the request being recorded."""
+
+    profile_id: str
+    user: str
+    started_at: datetime.datetime
+    started: float
+    profiler: cProfile.Profile
+    queries: list[dict[str, Any]] = field(default_factory=list)
+    status_code: int | None = None
+
+
+_recording: contextvars.ContextVar[_Recording | None] = contextvars.ContextVar(
+    "profiler_recording", default=None
+)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(  # pylint: disable=too-many-arguments
+    conn: Any,  # pylint: disable=unused-argument
+    cursor: Any,  # pylint: disable=unused-argument
+    statement: str,  # pylint: disable=unused-argument
+    parameters: Any,  # pylint: disable=unused-argument
+    context: Any,
+    executemany: bool,  # pylint: disable=unused-argument
+) -> None:
+    """Start timing a statement, if it runs for a profiled request."""
+    if _recording.get() is not None:
+        context.profiler_started = time.perf_counter()
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(  # pylint: disable=too-many-arguments
+    conn: Any,  # pylint: disable=unused-argument
+    cursor: Any,  # pylint: disable=unused-argument
+    statement: str,
+    parameters: Any,  # pylint: disable=unused-argument
+    context: Any,
+    executemany: bool,  # pylint: disable=unused-argument
+) -> None:
+    """Record statement along with when it started and how long it took."""
+    recording = _recording.get()
+    started = getattr(context, "profiler_started", None)
+    if recording is None or started is None:
+        return
+    recording.queries.append(
+        {
+            "statement": statement,
+            "offset_ms": (started - recording.started) * 1000,
+            "duration_ms": (time.perf_counter() - started) * 1000,
+        }
+    )
+
+
+def profile_folder(app: Flask) -> Path:
+    """Return the folder profiles of app are stored in."""
+    return Path(app.config["PROFILER_FOLDER"] or Path(app.instance_path) / "profiles")
+
+
+def _requested() -> bool:
+    """Return whether the current request asks to be profiled."""
+    return HEADER in request.headers or QUERY_ARG in request.args
+
+
+def start_profile() -> None:
+    """Start profiling the current request, if a logged in user asks for it."""
+    if not _requested() or not current_user.is_authenticated:
+        return
+
+    now = datetime.datetime.utcnow()
+    recording = _Recording(
+        profile_id=f"{now:%Y%m%dT%H%M%S}-{uuid.uuid4().hex[:8]}",
+        user=str(current_user.email),
+        started_at=now,
+        started=time.perf_counter(),
+        profiler=cProfile.Profile(),
+    )
+    _recording.set(recording)
+    g.profiler_recording = recording
+    recording.profiler.enable()
+
+
+def tag_response(response: Response) -> Response:
+    """Record the status of the profiled response and point to its profile."""
+    recording = g.get("profiler_recording")
+    if recording is not None:
+        recording.status_code = response.status_code
+        response.headers["X-Profile-Id"] = recording.profile_id
+    return response
+
+
+def finish_profile(exc: BaseException | None) -> None:
+    """Stop profiling the current request and store its profile."""
+    recording = g.pop("profiler_recording", None)
+    if recording is None:
+        return
+
+    recording.profiler.disable()
+    duration_ms = (time.perf_counter() - recording.started) * 1000
+    _recording.set(None)
+
+    stream = io.StringIO()
+    stats = pstats.Stats(recording.profiler, stream=stream)
+    stats.sort_stats(pstats.SortKey.CUMULATIVE).print_stats(STATS_LIMIT)
+
+    folder = profile_folder(current_app)
+    folder.mkdir(parents=True, exist_ok=True)
+    stats.dump_stats(folder / f"{recording.profile_id}.prof")
+    summary = {
+        "id": recording.profile_id,
+        "started_at": recording.started_at.isoformat(),
+        "method": request.method,
+        "path": request.full_path.rstrip("?"),
+        "endpoint": request.endpoint,
+        "status_code": 500 if exc is not None else recording.status_code,
+        "user": recording.user,
+        "duration_ms": duration_ms,
+        "sql_ms": sum(query["duration_ms"] for query in recording.queries),
+        "queries": recording.queries,
+        "stats": stream.getvalue(),
+    }
+    (folder / f"{recording.profile_id}.json").write_text(json.dumps(summary))
+    _prune(folder, current_app.config["PROFILER_MAX_PROFILES"])
+
+
+def _prune(folder: Path, keep: int) -> None:
+    """Delete the oldest profiles of folder, keeping the newest keep ones."""
+    for path in sorted(folder.glob("*.json"), reverse=True)[keep:]:
+        path.unlink(missing_ok=True)
+        path.with_suffix(".prof").unlink(missing_ok=True)
+
+
+def list_profiles(folder: Path) -> list[dict[str, Any]]:
+    """Return the summaries of the profiles of folder, newest first."""
+    profiles = []
+    for path in sorted(folder.glob("*.json"), reverse=True):
+        summary = json.loads(path.read_text())
+        del summary["queries"], summary["stats"]
+        profiles.append(summary)
+    return profiles
+
+
+def load_profile(folder: Path, profile_id: str) -> dict[str, Any] | None:
+    """Return the profile of folder identified by profile_id, if any."""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    try:
+        return json.loads((folder / f"{profile_id}.json").read_text())
+    except FileNotFoundError:
+        return None
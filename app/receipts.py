@@ -0,0 +1,249 @@
+"""
+This module contains the rendering of payment receipts as PDF files. The
+data of a receipt is loaded with a single query and rendered without the
+database, so the receipts of a whole cycle are rendered in a pool of
+processes, one per core. Each receipt is cached on disk, keyed by the id of
+its payment and the last update of the payment, its student, the
+representative of the student or its cycle, so a receipt is only rendered
+again when what it shows changes.
+
+The receipts of a cycle are streamed as a zip archive, written while it is
+sent instead of being built in memory first.
+"""
+
+import datetime
+import math
+import multiprocessing
+import os
+import tempfile
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from decimal import Decimal
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from flask import Flask
+from fpdf import FPDF
+from sqlalchemy import func, select
+from sqlalchemy.sql import Select
+
+from . import db
+from .models import Cycle, Payment, Representative, Student
+
+SCHOOL_NAME = "Blueberry School"
+CHUNK_SIZE = 64 * 1024
+# receipts rendered per task sent to a process, to amortize the round trips
+RENDER_CHUNK_SIZE = 16
+
+
+@dataclass(frozen=True)
+class ReceiptData:  # pylint: disable=too-many-instance-attributes
+    """This class represents what a receipt shows about a payment."""
+
+    payment_id: int
+    version: datetime.datetime
+    paid_at: datetime.datetime
+    amount: Decimal
+    discount: Decimal | None
+    description: str | None
+    student: str
+    identity_document: str
+    representative: str | None
+    cycle: str
+
+    @property
+    def total(self) -> Decimal:
+        """Amount paid, net of the discount."""
+        return self.amount - (self.discount or 0)
+
+    @property
+    def filename(self) -> str:
+        """Name of the cached receipt, which changes with its version."""
+        return f"{self.payment_id}-{self.version:%Y%m%dT%H%M%S%f}.pdf"
+
+
+def receipt_folder(app: Flask) -> Path:
+    """Return the folder receipts of app are cached in."""
+    return Path(app.config["RECEIPT_FOLDER"] or Path(app.instance_path) / "receipts")
+
+
+def receipt_data(*conditions: object) -> list[ReceiptData]:
+    """Return the receipts of the payments matching conditions, by payment id."""
+    statement: Select = (
+        select(
+            Payment.id,
+            func.greatest(
+                Payment.updated_at,
+                Student.updated_at,
+                # students without a representative are outer joined to NULL
+                func.coalesce(Representative.updated_at, Payment.updated_at),
+                Cycle.updated_at,
+            ),
+            Payment.created_at,
+            Payment.amount,
+            Payment.discount,
+            Payment.description,
+            func.concat_ws(
+                " ",
+                Student.first_name,
+                Student.second_name,
+                Student.first_surname,
+                Student.second_surname,
+            ),
+            Student.identity_document,
+            func.concat_ws(
+                " ", Representative.first_name, Representative.first_surname
+            ),
+            Cycle.month,
+            Cycle.year,
+        )
+        .join(Student, Payment.student_id == Student.id)
+        .outerjoin(Representative, Student.representative_id == Representative.id)
+        .join(Cycle, Payment.cycle_id == Cycle.id)
+        .where(*conditions)
+        .order_by(Payment.id)
+    )
+    return [
+        ReceiptData(*row[:8], row[8] or None, f"{month.value} {year}")
+        for *row, month, year in db.session.execute(statement)
+    ]
+
+
+def _latin_1(text: str) -> str:
+    """Return text with the characters the core PDF fonts lack replaced."""
+    return text.encode("latin-1", "replace").decode("latin-1")
+
+
+def render_receipt(data: ReceiptData) -> bytes:
+    """Render the receipt of data as a PDF document."""
+    pdf = FPDF(format="A5")
+    pdf.set_title(f"Receipt {data.payment_id}")
+    pdf.set_creation_date(data.version)
+    pdf.add_page()
+    pdf.set_font("Helvetica", "B", 16)
+    pdf.cell(0, 10, SCHOOL_NAME, new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", "", 10)
+    pdf.cell(0, 6, f"Receipt No. {data.payment_id:08d}", new_x="LMARGIN", new_y="NEXT")
+    pdf.cell(0, 6, f"Date: {data.paid_at:%Y-%m-%d}", new_x="LMARGIN", new_y="NEXT")
+    pdf.ln(4)
+
+    rows = [
+        ("Student", data.student),
+        ("Identity document", data.identity_document),
+        ("Representative", data.representative or ""),
+        ("Cycle", data.cycle),
+        ("Description", data.description or ""),
+        ("Amount", f"${data.amount}"),
+        ("Discount", f"${data.discount or 0:.2f}"),
+    ]
+    for label, value in rows:
+        pdf.set_font("Helvetica", "B", 10)
+        pdf.cell(40, 7, label)
+        pdf.set_font("Helvetica", "", 10)
+        pdf.cell(0, 7, _latin_1(value), new_x="LMARGIN", new_y="NEXT")
+    pdf.set_font("Helvetica", "B", 12)
+    pdf.cell(40, 9, "Total")
+    pdf.cell(0, 9, f"${data.total:.2f}", new_x="LMARGIN", new_y="NEXT")
+    return bytes(pdf.output())
+
+
+def _write_receipt(folder: Path, data: ReceiptData) -> Path:
+    """
+    Render the receipt of data into folder and delete its older versions.
+    The file is written under a temporary name and then renamed, so readers
+    never see a partial receipt.
+    """
+    path = folder / data.filename
+    with tempfile.NamedTemporaryFile(
+        dir=folder, prefix=f".{data.payment_id}-", delete=False
+    ) as file:
+        file.write(render_receipt(data))
+    os.replace(file.name, path)
+    for old_path in folder.glob(f"{data.payment_id}-*.pdf"):
+        if old_path != path:
+            old_path.unlink(missing_ok=True)
+    return path
+
+
+def get_receipt(folder: Path, data: ReceiptData) -> Path:
+    """Return the path of the receipt of data, rendering it if needed."""
+    path = folder / data.filename
+    if path.exists():
+        return path
+    folder.mkdir(parents=True, exist_ok=True)
+    return _write_receipt(folder, data)
+
+
+def build_receipts(
+    folder: Path, receipts: list[ReceiptData], processes: int
+) -> list[Path]:
+    """
+    Return the paths of the receipts, rendering the missing ones in a pool
+    of processes. With less than two processes, or too few receipts to pay
+    for starting them, they are rendered in the current process.
+    """
+    folder.mkdir(parents=True, exist_ok=True)
+    missing = [data for data in receipts if not (folder / data.filename).exists()]
+    if processes < 2 or len(missing) <= RENDER_CHUNK_SIZE:
+        for data in missing:
+            _write_receipt(folder, data)
+    else:
+        # processes are spawned, since forking a threaded server is unsafe
+        with ProcessPoolExecutor(
+            max_workers=min(processes, math.ceil(len(missing) / RENDER_CHUNK_SIZE)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as executor:
+            list(
+                executor.map(
+                    _write_receipt,
+                    [folder] * len(missing),
+                    missing,
+                    chunksize=RENDER_CHUNK_SIZE,
+                )
+            )
+    return [folder / data.filename for data in receipts]
+
+
+class _ZipStream:
+    """This class represents an unseekable file buffering what is written."""
+
+    def __init__(self) -> None:
+        self._chunks: list[bytes] = []
+        self._position = 0
+
+    def write(self, data: bytes) -> int:
+        """Buffer data."""
+        self._chunks.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        """Return how many bytes were written."""
+        return self._position
+
+    def flush(self) -> None:
+        """Do nothing, chunks are taken by drain."""
+
+    def drain(self) -> bytes:
+        """Return the bytes buffered since the last call."""
+        data = b"".join(self._chunks)
+        self._chunks.clear()
+        return data
+
+
+def stream_zip(files: Iterable[tuple[str, Path]]) -> Iterator[bytes]:
+    """
+    Yield a zip archive of files, pairs of a name in the archive and the
+    path of the file, as it is written. PDF files are already compressed,
+    so they are stored as they are.
+    """
+    stream = _ZipStream()
+    with zipfile.ZipFile(stream, "w", compression=zipfile.ZIP_STORED) as archive:
+        for name, path in files:
+            with path.open("rb") as source, archive.open(name, "w") as target:
+                while chunk := source.read(CHUNK_SIZE):
+                    target.write(chunk)
+                    yield stream.drain()
+            yield stream.drain()
+    yield stream.drain()
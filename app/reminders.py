@@ -0,0 +1,324 @@
+"""
+This module contains the payment reminders mailed when students of a cycle
+have not paid it. Reminders are queued in the `reminder` table: their
+messages are rendered in bulk when they are queued, one per recipient, so
+the representative of several students gets a single message listing them,
+and students without a representative email are reminded at their own.
+
+The queue is drained outside of web requests, by `flask admin
+send-reminders`, over a single SMTP connection kept open for the whole run
+and throttled to `MAIL_RATE_LIMIT` messages per second. Transient failures,
+including network errors, are retried with an exponential backoff, up to
+`MAIL_MAX_ATTEMPTS` times, while permanent ones fail the reminder right
+away. Batches are claimed with FOR UPDATE SKIP LOCKED and leased by pushing
+their next attempt back by `CLAIM_DURATION`, so concurrent runs never send a
+reminder twice, and each reminder is committed as soon as it is sent, so a
+run stopping halfway does not send again what it already sent.
+"""
+
+import datetime
+import smtplib
+import time
+from dataclasses import dataclass
+from email.message import EmailMessage
+from typing import Any
+
+from flask import current_app
+from sqlalchemy import case, exists, func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by, insert
+
+from . import db
+from .models import (
+    Class,
+    Cycle,
+    Payment,
+    Reminder,
+    ReminderStatus,
+    Representative,
+    Student,
+    utc_now,
+)
+
+CHUNK_SIZE = 500
+TEMPLATE = "mail/payment_reminder.txt.jinja"
+RETRY_DELAY = datetime.timedelta(minutes=5)
+# how long a claimed batch is kept from other runs, to be sent within
+CLAIM_DURATION = datetime.timedelta(minutes=15)
+
+
+class MailError(Exception):
+    """This exception is raised when the SMTP server cannot be reached."""
+
+
+class Mailer:  # pylint: disable=too-many-instance-attributes
+    """
+    This class represents a persistent connection to an SMTP server. It is
+    opened on first use and reopened once when the server dropped it, and
+    sends at most rate messages per second, any number when rate is zero.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        host: str,
+        port: int,
+        sender: str,
+        username: str | None = None,
+        password: str | None = None,
+        use_tls: bool = False,
+        rate: float = 0,
+        timeout: float = 30,
+    ) -> None:
+        self.host = host
+        self.port = port
+        self.sender = sender
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.rate = rate
+        self.timeout = timeout
+        self.connections = 0
+        self._smtp: smtplib.SMTP | None = None
+        self._next_send = 0.0
+
+    def _connect(self) -> smtplib.SMTP:
+        """Open a connection to the server and log in if configured to."""
+        try:
+            smtp = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+            if self.use_tls:
+                smtp.starttls()
+            if self.username:
+                smtp.login(self.username, self.password or "")
+        except (OSError, smtplib.SMTPException) as exc:
+            raise MailError(f"Could not connect to {self.host}:{self.port}.") from exc
+        self.connections += 1
+        return smtp
+
+    def _throttle(self) -> None:
+        """Wait until the rate allows sending another message."""
+        if self.rate <= 0:
+            return
+        now = time.monotonic()
+        if now < self._next_send:
+            time.sleep(self._next_send - now)
+        self._next_send = max(now, self._next_send) + 1 / self.rate
+
+    def send(self, message: EmailMessage) -> None:
+        """
+        Send message, raising smtplib errors the server answers with, and
+        OSError when the connection fails, e.g. times out, after dropping it.
+        """
+        self._throttle()
+        if self._smtp is None:
+            self._smtp = self._connect()
+        try:
+            try:
+                self._smtp.send_message(message)
+            except smtplib.SMTPServerDisconnected:
+                self._smtp = self._connect()
+                self._smtp.send_message(message)
+        except smtplib.SMTPException:
+            raise
+        except OSError:
+            self._smtp.close()
+            self._smtp = None
+            raise
+
+    def close(self) -> None:
+        """Close the connection, if it is open."""
+        if self._smtp is not None:
+            try:
+                self._smtp.quit()
+            except (OSError, smtplib.SMTPException):
+                self._smtp.close()
+            self._smtp = None
+
+    def __enter__(self) -> "Mailer":
+        return self
+
+    def __exit__(self, *args: Any) -> None:
+        self.close()
+
+
+def mailer_from_config(config: dict[str, Any]) -> Mailer:
+    """Return a mailer configured by config."""
+    return Mailer(
+        host=config["MAIL_SERVER"],
+        port=config["MAIL_PORT"],
+        sender=config["MAIL_SENDER"],
+        username=config["MAIL_USERNAME"],
+        password=config["MAIL_PASSWORD"],
+        use_tls=config["MAIL_USE_TLS"],
+        rate=config["MAIL_RATE_LIMIT"],
+    )
+
+
+@dataclass(frozen=True)
+class Recipient:
+    """This class represents who is reminded of the students who did not pay."""
+
+    email: str
+    name: str
+    students: list[str]
+
+
+def unpaid_recipients(cycle_id: int) -> list[Recipient]:
+    """
+    Return who to remind of the students of the cycle who have not paid it:
+    their representative if it has an email, the student otherwise.
+    """
+    has_representative_email = Representative.email.isnot(None)
+    email = func.coalesce(Representative.email, Student.email)
+    student_name = func.concat_ws(" ", Student.first_name, Student.first_surname)
+    statement = (
+        select(
+            email,
+            func.min(
+                case(
+                    (
+                        has_representative_email,
+                        func.concat_ws(
+                            " ", Representative.first_name, Representative.first_surname
+                        ),
+                    ),
+                    else_=student_name,
+                )
+            ),
+            func.array_agg(aggregate_order_by(student_name, student_name)),
+        )
+        .select_from(Student)
+        .join(Class, Student.class_id == Class.id)
+        .outerjoin(Representative, Student.representative_id == Representative.id)
+        .where(
+            Class.cycle_id == cycle_id,
+            ~exists().where(
+                Payment.student_id == Student.id, Payment.cycle_id == cycle_id
+            ),
+        )
+        .group_by(email)
+        .order_by(email)
+    )
+    return [
+        Recipient(email, name, students)
+        for email, name, students in db.session.execute(statement)
+    ]
+
+
+def queue_reminders(cycle: Cycle) -> int:
+    """
+    Queue a reminder for each recipient of the unpaid students of cycle and
+    return how many were queued. Recipients already reminded for the cycle
+    are skipped, so queueing twice does not mail anyone twice.
+    """
+    recipients = unpaid_recipients(cycle.id)
+    template = current_app.jinja_env.get_template(TEMPLATE)
+    subject = f"Payment reminder: {cycle.month.value} {cycle.year}"
+    rows = [
+        {
+            "cycle_id": cycle.id,
+            "recipient": recipient.email,
+            "subject": subject,
+            "body": template.render(recipient=recipient, cycle=cycle),
+        }
+        for recipient in recipients
+    ]
+
+    queued = 0
+    for start in range(0, len(rows), CHUNK_SIZE):
+        statement = (
+            insert(Reminder)
+            .values(rows[start : start + CHUNK_SIZE])
+            .on_conflict_do_nothing(index_elements=["cycle_id", "recipient"])
+            .returning(Reminder.id)
+        )
+        queued += len(db.session.execute(statement).all())
+    db.session.commit()
+    return queued
+
+
+def _message(reminder: Reminder, sender: str) -> EmailMessage:
+    """Return the message of reminder."""
+    message = EmailMessage()
+    message["From"] = sender
+    message["To"] = reminder.recipient
+    message["Subject"] = reminder.subject
+    message.set_content(reminder.body)
+    return message
+
+
+def _permanent(exc: Exception) -> bool:
+    """Return whether the server rejected a message for good."""
+    if isinstance(exc, smtplib.SMTPRecipientsRefused):
+        return all(code >= 500 for code, _ in exc.recipients.values())
+    return isinstance(exc, smtplib.SMTPResponseException) and exc.smtp_code >= 500
+
+
+def _record_failure(
+    reminder: Reminder, exc: Exception, max_attempts: int
+) -> ReminderStatus:
+    """
+    Record that reminder could not be sent because of exc and return its
+    status: it is retried later unless the failure is permanent or it ran
+    out of attempts.
+    """
+    reminder.error = str(exc)
+    transient = isinstance(exc, MailError) or not _permanent(exc)
+    if transient and reminder.attempts < max_attempts:
+        reminder.next_attempt_at = datetime.datetime.utcnow() + RETRY_DELAY * 2 ** (
+            reminder.attempts - 1
+        )
+        return ReminderStatus.PENDING
+    reminder.status = ReminderStatus.FAILED
+    return ReminderStatus.FAILED
+
+
+def send_reminders(
+    mailer: Mailer, batch_size: int, max_attempts: int
+) -> dict[ReminderStatus, int]:
+    """
+    Send the reminders due, batch_size at a time, and return how many were
+    sent, failed or are left to retry. When the server cannot be reached,
+    the run stops and the reminders left wait for the next one.
+    """
+    session = db.session
+    counts = {status: 0 for status in ReminderStatus}
+    while True:
+        reminders = (
+            db.session.execute(
+                select(Reminder)
+                .where(
+                    Reminder.status == ReminderStatus.PENDING,
+                    Reminder.next_attempt_at <= utc_now(),
+                )
+                .order_by(Reminder.next_attempt_at, Reminder.id)
+                .limit(batch_size)
+                .with_for_update(skip_locked=True)
+            )
+            .scalars()
+            .all()
+        )
+        if not reminders:
+            return counts
+
+        claimed_until = datetime.datetime.utcnow() + CLAIM_DURATION
+        for reminder in reminders:
+            reminder.next_attempt_at = claimed_until
+        session.commit()
+
+        for index, reminder in enumerate(reminders):
+            reminder.attempts += 1
+            try:
+                mailer.send(_message(reminder, mailer.sender))
+            # smtplib errors are OSErrors, as are network errors
+            except (MailError, OSError) as exc:
+                counts[_record_failure(reminder, exc, max_attempts)] += 1
+                if isinstance(exc, MailError):
+                    for left in reminders[index + 1 :]:
+                        left.next_attempt_at = datetime.datetime.utcnow()
+                    session.commit()
+                    return counts
+            else:
+                reminder.status = ReminderStatus.SENT
+                reminder.sent_at = datetime.datetime.utcnow()
+                reminder.error = None
+                counts[ReminderStatus.SENT] += 1
+            session.commit()
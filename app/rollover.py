@@ -0,0 +1,232 @@
+"""
+This module contains the monthly rollover of a cycle: the classes of a cycle
+are cloned into another cycle and their students are re-enrolled in the
+clones, optionally promoting every class to the next sub level.
+"""
+
+import datetime
+from dataclasses import dataclass
+from enum import Enum
+
+import sqlalchemy as sa
+from sqlalchemy import exists, func, insert, select, update
+
+from . import db
+from .audit import buffer_entries, inserted_row_changes
+from .models import AuditAction, Class, Cycle, Level, Mode, Student, SubLevel, utc_now
+
+
+class PromotionRule(str, Enum):  # pylint: disable=too-few-public-methods
+    """This enumeration is used to represent how classes are rolled over."""
+
+    KEEP = "Keep the same sub level"
+    PROMOTE = "Promote to the next sub level"
+
+
+class RolloverError(Exception):
+    """This exception is raised when a cycle cannot be rolled over."""
+
+
+@dataclass
+class RolloverItem:  # pylint: disable=too-many-instance-attributes
+    """This class represents how a single class is going to be rolled over."""
+
+    class_id: int
+    mode: Mode
+    start_at: datetime.time
+    end_at: datetime.time
+    level: Level
+    sub_level: SubLevel
+    new_level: Level
+    new_sub_level: SubLevel
+    students: int
+
+    @property
+    def promoted(self) -> bool:
+        """Whether the class changes its level or sub level."""
+        return (self.level, self.sub_level) != (self.new_level, self.new_sub_level)
+
+
+def promote(level: Level, sub_level: SubLevel) -> tuple[Level, SubLevel]:
+    """
+    Return the level and sub level following level and sub level.
+    After the last sub level of a level comes the first sub level of the
+    next level. The last sub level of the last level is kept.
+    """
+    steps = [(level_, sub_level_) for level_ in Level for sub_level_ in SubLevel]
+    index = steps.index((level, sub_level))
+    return steps[min(index + 1, len(steps) - 1)]
+
+
+def _promoted_columns() -> tuple[sa.sql.ColumnElement, sa.sql.ColumnElement]:
+    """Return SQL expressions computing the promoted level and sub level."""
+    level_whens = []
+    sub_level_whens = []
+    for level in Level:
+        for sub_level in SubLevel:
+            condition = (Class.level == level) & (Class.sub_level == sub_level)
+            new_level, new_sub_level = promote(level, sub_level)
+            level_whens.append(
+                (
+                    condition,
+                    sa.cast(sa.literal(new_level, Class.level.type), Class.level.type),
+                )
+            )
+            sub_level_whens.append(
+                (
+                    condition,
+                    sa.cast(
+                        sa.literal(new_sub_level, Class.sub_level.type),
+                        Class.sub_level.type,
+                    ),
+                )
+            )
+    return sa.case(*level_whens), sa.case(*sub_level_whens)
+
+
+def _check(source_id: int, target_id: int, lock: bool = False) -> None:
+    """
+    Raise RolloverError if source cannot be rolled over into target. When
+    lock is set, both cycles are locked before target is checked, so that a
+    concurrent rollover into target waits and then sees its classes.
+    """
+    if source_id == target_id:
+        raise RolloverError("Source and target cycles must be different.")
+
+    cycles = (
+        select(Cycle.id).where(Cycle.id.in_([source_id, target_id])).order_by(Cycle.id)
+    )
+    if lock:
+        cycles = cycles.with_for_update()
+    found = db.session.execute(cycles).scalars().all()
+    if len(found) != 2:
+        raise RolloverError("Cycle does not exist.")
+
+    has_classes = db.session.execute(
+        select(exists().where(Class.cycle_id == target_id))
+    ).scalar()
+    if has_classes:
+        raise RolloverError("Target cycle already has classes.")
+
+
+def preview_rollover(
+    source_id: int, target_id: int, rule: PromotionRule
+) -> list[RolloverItem]:
+    """
+    Return how every class of the source cycle is going to be rolled over
+    into the target cycle, along with the number of students it moves.
+    """
+    _check(source_id, target_id)
+
+    student_count = (
+        select(func.count(Student.id))
+        .where(Student.class_id == Class.id)
+        .scalar_subquery()
+        .label("students")
+    )
+    rows = db.session.execute(
+        select(
+            Class.id,
+            Class.mode,
+            Class.start_at,
+            Class.end_at,
+            Class.level,
+            Class.sub_level,
+            student_count,
+        )
+        .where(Class.cycle_id == source_id)
+        .order_by(Class.level, Class.sub_level, Class.start_at)
+    ).all()
+
+    items = []
+    for row in rows:
+        new_level, new_sub_level = (
+            promote(row.level, row.sub_level)
+            if rule == PromotionRule.PROMOTE
+            else (row.level, row.sub_level)
+        )
+        # the class columns are selected in the order of the fields
+        items.append(RolloverItem(*row[:6], new_level, new_sub_level, row.students))
+    return items
+
+
+def rollover_cycle(source_id: int, target_id: int, rule: PromotionRule) -> int:
+    """
+    Clone the classes of the source cycle into the target cycle and move
+    their students into the clones, in a single transaction.
+
+    Ids for the clones are drawn from the class sequence up front, so the
+    classes are copied with one INSERT ... SELECT and the students are
+    re-enrolled with one UPDATE, whatever the size of the school. Both
+    return their rows for the audit trail. Return the number of cloned classes.
+    """
+    _check(source_id, target_id, lock=True)
+    session = db.session
+
+    sequence = func.pg_get_serial_sequence(Class.__tablename__, "id")
+    mapping_rows = session.execute(
+        select(Class.id, func.nextval(sequence))
+        .where(Class.cycle_id == source_id)
+        .with_for_update()
+    ).all()
+    if not mapping_rows:
+        return 0
+
+    mapping = (
+        sa.values(
+            sa.column("old_id", sa.Integer),
+            sa.column("new_id", sa.Integer),
+            name="class_mapping",
+        )
+        .data([tuple(row) for row in mapping_rows])
+        .alias("class_mapping")
+    )
+
+    if rule == PromotionRule.PROMOTE:
+        level, sub_level = _promoted_columns()
+    else:
+        level, sub_level = Class.level, Class.sub_level
+
+    values = {
+        "id": mapping.c.new_id,
+        "mode": Class.mode,
+        "start_at": Class.start_at,
+        "end_at": Class.end_at,
+        "level": level,
+        "sub_level": sub_level,
+        "room": Class.room,
+        "teacher": Class.teacher,
+        "cycle_id": sa.literal(target_id),
+        "branch_id": Class.branch_id,
+        "created_at": utc_now(),
+        "updated_at": utc_now(),
+    }
+    clones = session.execute(
+        insert(Class)
+        .from_select(
+            list(values),
+            select(*values.values()).join(mapping, mapping.c.old_id == Class.id),
+        )
+        .returning(*Class.__table__.columns)
+    ).all()
+    buffer_entries(
+        session,
+        Class,
+        AuditAction.INSERT,
+        {row.id: inserted_row_changes(row) for row in clones},
+    )
+    moves = session.execute(
+        update(Student)
+        .where(Student.class_id == mapping.c.old_id)
+        .values(class_id=mapping.c.new_id, updated_at=utc_now())
+        .returning(Student.id, mapping.c.old_id, mapping.c.new_id)
+        .execution_options(synchronize_session=False)
+    )
+    changes = {
+        student_id: {"class_id": {"old": old_id, "new": new_id}}
+        for student_id, old_id, new_id in moves
+    }
+    buffer_entries(session, Student, AuditAction.UPDATE, changes)
+    session.commit()
+
+    return len(mapping_rows)
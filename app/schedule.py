@@ -0,0 +1,144 @@
+"""
+This module contains the detection of schedule conflicts between classes.
+Two classes of a cycle clash when they share a room or a teacher and their
+times overlap. Overlaps are looked up through the GiST indexes on the slot
+a class takes in its room and teacher, so checking a class costs an index
+probe rather than a scan of the classes of its cycle.
+"""
+
+import datetime
+from dataclasses import dataclass
+
+from sqlalchemy import select
+from sqlalchemy.orm import aliased
+
+from . import db
+from .models import Class, Cycle, class_slot
+
+RESOURCES = ("room", "teacher")
+
+
+class ScheduleError(Exception):
+    """This exception is raised when a class clashes with another class."""
+
+
+@dataclass(frozen=True)
+class Conflict:
+    """This class represents two classes sharing a room or a teacher."""
+
+    resource: str
+    value: str
+    first: Class
+    second: Class
+
+
+def find_clashes(  # pylint: disable=too-many-arguments
+    cycle_id: int,
+    start_at: datetime.time,
+    end_at: datetime.time,
+    room: str | None,
+    teacher: str | None,
+    class_id: int | None = None,
+) -> list[tuple[str, Class]]:
+    """
+    Return the classes of the cycle that would clash with a class taking
+    room and teacher from start_at to end_at, along with the resource they
+    share. class_id is the id of the class being edited, which does not
+    clash with itself.
+    """
+    clashes = []
+    for resource, value in zip(RESOURCES, (room, teacher)):
+        if value is None:
+            continue
+        column = getattr(Class, resource)
+        statement = (
+            select(Class)
+            .where(
+                class_slot(
+                    Class.cycle_id, column, Class.start_at, Class.end_at
+                ).overlaps(class_slot(cycle_id, value, start_at, end_at)),
+                # slots of different resources may overlap on a hash collision
+                Class.cycle_id == cycle_id,
+                column == value,
+            )
+            .order_by(Class.start_at, Class.id)
+        )
+        if class_id is not None:
+            statement = statement.where(Class.id != class_id)
+        clashes.extend(
+            (resource, class_) for class_ in db.session.execute(statement).scalars()
+        )
+    return clashes
+
+
+def check_schedule(  # pylint: disable=too-many-arguments
+    cycle_id: int,
+    start_at: datetime.time,
+    end_at: datetime.time,
+    room: str | None,
+    teacher: str | None,
+    class_id: int | None = None,
+) -> None:
+    """
+    Raise ScheduleError if a class taking room and teacher from start_at to
+    end_at would clash with another class of the cycle. The cycle row is
+    locked until the transaction ends, so concurrent checks of the same
+    cycle cannot both pass before either class is saved.
+    """
+    if start_at >= end_at:
+        raise ScheduleError("A class must end after it starts.")
+
+    cycle = db.session.execute(
+        select(Cycle).where(Cycle.id == cycle_id).with_for_update()
+    ).scalar_one_or_none()
+    if cycle is None:
+        raise ScheduleError("Cycle does not exist.")
+
+    clashes = find_clashes(cycle_id, start_at, end_at, room, teacher, class_id)
+    if clashes:
+        raise ScheduleError(
+            " ".join(
+                f"The {resource} {getattr(class_, resource)} is taken by {class_} "
+                f"from {class_.start_at:%H:%M} to {class_.end_at:%H:%M}."
+                for resource, class_ in clashes
+            )
+        )
+
+
+def conflict_report(cycle_id: int) -> list[Conflict]:
+    """
+    Return every pair of classes of the cycle that clash, per room and per
+    teacher. Each pair is reported once, ordered by the start of the first
+    class.
+    """
+    first, second = aliased(Class), aliased(Class)
+    conflicts = []
+    for resource in RESOURCES:
+        first_column = getattr(first, resource)
+        second_column = getattr(second, resource)
+        statement = (
+            select(first_column, first, second)
+            .join(
+                second,
+                class_slot(
+                    second.cycle_id, second_column, second.start_at, second.end_at
+                ).overlaps(
+                    class_slot(
+                        first.cycle_id, first_column, first.start_at, first.end_at
+                    )
+                ),
+            )
+            .where(
+                first.cycle_id == cycle_id,
+                first_column.isnot(None),
+                second.cycle_id == first.cycle_id,
+                second_column == first_column,
+                first.id < second.id,
+            )
+            .order_by(first.start_at, first.id, second.id)
+        )
+        conflicts.extend(
+            Conflict(resource, value, first_class, second_class)
+            for value, first_class, second_class in db.session.execute(statement)
+        )
+    return conflicts
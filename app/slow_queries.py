@@ -0,0 +1,244 @@
+"""
+This module contains the slow query log. Every statement taking longer than
+`SLOW_QUERY_THRESHOLD_MS` is recorded along with its parameters and the
+endpoint that issued it. Its plan is captured in a background thread, with
+`EXPLAIN (ANALYZE, BUFFERS)` when `SLOW_QUERY_ANALYZE` is set, e.g. in
+development and staging, and with a plain `EXPLAIN` otherwise, so that
+production never runs a slow statement twice. Only SELECT statements are
+analyzed: the others still hold their locks in the transaction that issued
+them, which running them again would wait for.
+
+Entries are written as JSON lines to a rotating log file, so the log stays
+bounded on disk. Each process writes its own file, suffixed with its pid,
+since the workers forked by a pre-fork server would otherwise rotate a
+shared file from under each other.
+"""
+
+import datetime
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from logging.handlers import RotatingFileHandler
+from pathlib import Path
+from typing import Any
+
+from flask import Flask, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+EXPLAINED_STATEMENTS = ("SELECT", "WITH", "INSERT", "UPDATE", "DELETE")
+ANALYZED_STATEMENTS = ("SELECT",)
+EXPLAIN_TIMEOUT = "30s"
+LOCK_TIMEOUT = "1s"
+MAX_PENDING_EXPLAINS = 8
+MAX_PARAMETER_LENGTH = 200
+LOG_BACKUPS = 3
+
+
+def _parameters(parameters: Any) -> Any:
+    """Return parameters as JSON compatible values, truncating long ones."""
+    if isinstance(parameters, dict):
+        return {key: _parameters(value) for key, value in parameters.items()}
+    if isinstance(parameters, (list, tuple)):
+        return [_parameters(value) for value in parameters]
+    if parameters is None or isinstance(parameters, (bool, int, float)):
+        return parameters
+    return repr(parameters)[:MAX_PARAMETER_LENGTH]
+
+
+class ProcessRotatingFileHandler(RotatingFileHandler):
+    """
+    This class represents a rotating log file per process. The file is named
+    after the pid of the process which writes to it, looked up on every
+    record, so a handler created before the server forks is not shared by
+    its workers.
+    """
+
+    def __init__(self, path: Path, max_bytes: int, backup_count: int) -> None:
+        self.path = path
+        self.pid = os.getpid()
+        super().__init__(
+            self._path_of(self.pid),
+            maxBytes=max_bytes,
+            backupCount=backup_count,
+            delay=True,
+        )
+
+    def _path_of(self, pid: int) -> Path:
+        """Return the path of the log file of the process pid."""
+        return self.path.with_name(f"{self.path.stem}.{pid}{self.path.suffix}")
+
+    def emit(self, record: logging.LogRecord) -> None:
+        """Write record to the log file of the current process."""
+        pid = os.getpid()
+        if pid != self.pid:
+            # the file was opened by the parent process, which keeps it
+            if self.stream is not None:
+                self.stream.close()
+                self.stream = None
+            self.pid = pid
+            self.baseFilename = os.path.abspath(self._path_of(pid))
+        super().emit(record)
+
+
+class SlowQueryLog:  # pylint: disable=too-many-instance-attributes
+    """
+    This class represents the slow query log of an engine. The plans of slow
+    statements are captured by a single background thread. When too many are
+    pending, statements are logged without a plan rather than queued.
+    """
+
+    def __init__(
+        self, engine: Engine, logger: logging.Logger, threshold: float, analyze: bool
+    ) -> None:
+        self.engine = engine
+        self.logger = logger
+        self.threshold = threshold
+        self.analyze = analyze
+        self._executor: ThreadPoolExecutor | None = None
+        self._lock = threading.Lock()
+        self._pending = threading.BoundedSemaphore(MAX_PENDING_EXPLAINS)
+        self._futures: set[Any] = set()
+
+    def before_cursor_execute(  # pylint: disable=too-many-arguments
+        self,
+        conn: Any,  # pylint: disable=unused-argument
+        cursor: Any,  # pylint: disable=unused-argument
+        statement: str,  # pylint: disable=unused-argument
+        parameters: Any,  # pylint: disable=unused-argument
+        context: Any,
+        executemany: bool,  # pylint: disable=unused-argument
+    ) -> None:
+        """Start timing the statement."""
+        context.slow_query_started = time.perf_counter()
+
+    def after_cursor_execute(  # pylint: disable=too-many-arguments
+        self,
+        conn: Any,  # pylint: disable=unused-argument
+        cursor: Any,  # pylint: disable=unused-argument
+        statement: str,
+        parameters: Any,
+        context: Any,
+        executemany: bool,
+    ) -> None:
+        """Record the statement if it was slow."""
+        duration_ms = (time.perf_counter() - context.slow_query_started) * 1000
+        if duration_ms < self.threshold or context.execution_options.get(
+            "slow_query_explain"
+        ):
+            return
+
+        entry = {
+            "timestamp": datetime.datetime.utcnow().isoformat(),
+            "endpoint": request.endpoint if has_request_context() else None,
+            "duration_ms": round(duration_ms, 3),
+            "statement": statement,
+            "parameters": _parameters(parameters),
+        }
+        explainable = not executemany and statement.lstrip().upper().startswith(
+            EXPLAINED_STATEMENTS
+        )
+        # released by _done once the plan is logged
+        acquired = (
+            explainable
+            and self._pending.acquire(  # pylint: disable=consider-using-with
+                blocking=False
+            )
+        )
+        if not acquired:
+            self.logger.warning(json.dumps(entry))
+            return
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix="explain"
+                )
+            future = self._executor.submit(self._explain, entry, parameters)
+            self._futures.add(future)
+        future.add_done_callback(self._done)
+
+    def _done(self, future: Any) -> None:
+        """Forget future and make room for another plan."""
+        with self._lock:
+            self._futures.discard(future)
+        self._pending.release()
+
+    def _explain(self, entry: dict[str, Any], parameters: Any) -> None:
+        """
+        Capture the plan of the statement of entry and log it. The statement
+        runs in a transaction which is rolled back, since EXPLAIN ANALYZE
+        executes it.
+        """
+        analyze = self.analyze and entry["statement"].lstrip().upper().startswith(
+            ANALYZED_STATEMENTS
+        )
+        options = "ANALYZE, BUFFERS, FORMAT TEXT" if analyze else "FORMAT TEXT"
+        entry["analyze"] = analyze
+        try:
+            with self.engine.connect() as connection:
+                connection = connection.execution_options(slow_query_explain=True)
+                transaction = connection.begin()
+                try:
+                    connection.exec_driver_sql(
+                        f"SET LOCAL statement_timeout = '{EXPLAIN_TIMEOUT}'"
+                    )
+                    connection.exec_driver_sql(
+                        f"SET LOCAL lock_timeout = '{LOCK_TIMEOUT}'"
+                    )
+                    rows = connection.exec_driver_sql(
+                        f"EXPLAIN ({options}) {entry['statement']}", parameters
+                    ).scalars()
+                    entry["plan"] = "\n".join(rows)
+                finally:
+                    transaction.rollback()
+        except Exception as exc:  # pylint: disable=broad-except
+            entry["error"] = str(exc).strip()
+        self.logger.warning(json.dumps(entry))
+
+    def wait(self) -> None:
+        """Wait for the plans being captured to be logged."""
+        with self._lock:
+            futures = list(self._futures)
+        for future in futures:
+            future.result()
+
+
+def init_slow_query_log(app: Flask) -> SlowQueryLog | None:
+    """
+    Register the slow query log on the engine of app, unless it is disabled
+    with a threshold of zero or less.
+    """
+    config = app.config
+    if config["SLOW_QUERY_THRESHOLD_MS"] <= 0:
+        return None
+
+    path = Path(
+        config["SLOW_QUERY_LOG"] or Path(app.instance_path) / "slow_queries.log"
+    )
+    path.parent.mkdir(parents=True, exist_ok=True)
+    logger = logging.getLogger(f"{app.import_name}.slow_queries")
+    logger.propagate = False
+    logger.setLevel(logging.WARNING)
+    for handler in logger.handlers[:]:
+        logger.removeHandler(handler)
+        handler.close()
+    handler = ProcessRotatingFileHandler(
+        path, config["SLOW_QUERY_LOG_MAX_BYTES"], LOG_BACKUPS
+    )
+    logger.addHandler(handler)
+
+    with app.app_context():
+        engine = app.extensions["sqlalchemy"].engine
+    slow_query_log = SlowQueryLog(
+        engine,
+        logger,
+        config["SLOW_QUERY_THRESHOLD_MS"],
+        config["SLOW_QUERY_ANALYZE"],
+    )
+    event.listen(engine, "before_cursor_execute", slow_query_log.before_cursor_execute)
+    event.listen(engine, "after_cursor_execute", slow_query_log.after_cursor_execute)
+    app.extensions["slow_queries"] = slow_query_log
+    return slow_query_log
@@ -0,0 +1,275 @@
+"""
+This module contains the batch synchronization of representatives and
+students pushed by an external registry. Records are keyed on their
+identity document and upserted in chunks with INSERT ... ON CONFLICT DO
+UPDATE, reporting an outcome per record. The upserts mirror records owned
+by the registry and are not written to the audit trail.
+"""
+
+import datetime
+from typing import Any, Callable
+
+import sqlalchemy as sa
+from email_validator import EmailNotValidError, validate_email
+from phonenumbers import NumberParseException
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy_utils import PhoneNumber
+
+from . import db
+from .models import Representative, Sex, Student, utc_now
+
+CHUNK_SIZE = 500
+
+CREATED = "created"
+UPDATED = "updated"
+INVALID = "invalid"
+DUPLICATE = "duplicate"
+ERROR = "error"
+
+Record = dict[str, Any]
+Outcome = dict[str, Any]
+
+
+def _required(value: Any) -> str:
+    """Return value stripped, it must be a non-empty string."""
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError("This field is required.")
+    return value.strip()
+
+
+def _optional(value: Any) -> str | None:
+    """Return value stripped, or None when it is missing."""
+    if value is None or value == "":
+        return None
+    if not isinstance(value, str):
+        raise ValueError("This field must be a string.")
+    return value.strip()
+
+
+def _sex(value: Any) -> Sex:
+    """Return the Sex named value."""
+    try:
+        return Sex[value]
+    except (KeyError, TypeError) as exc:
+        raise ValueError("Not a valid choice.") from exc
+
+
+def _email(value: Any) -> str:
+    """Return value normalized, it must be a valid email address."""
+    try:
+        return validate_email(_required(value), check_deliverability=False).email
+    except EmailNotValidError as exc:
+        raise ValueError(str(exc)) from exc
+
+
+def _optional_email(value: Any) -> str | None:
+    """Return value as an email address, or None when it is missing."""
+    return None if value is None or value == "" else _email(value)
+
+
+def _phone_number(value: Any) -> str:
+    """Return value in E.164 format, it must be a valid phone number."""
+    try:
+        return PhoneNumber(_required(value)).e164
+    except NumberParseException as exc:
+        raise ValueError("Not a valid phone number.") from exc
+
+
+def _optional_phone_number(value: Any) -> str | None:
+    """Return value as a phone number, or None when it is missing."""
+    return None if value is None or value == "" else _phone_number(value)
+
+
+def _date(value: Any) -> datetime.date:
+    """Return value, an ISO 8601 string, as a date."""
+    try:
+        return datetime.date.fromisoformat(_required(value))
+    except ValueError as exc:
+        raise ValueError("Not a valid date.") from exc
+
+
+Schema = dict[str, Callable[[Any], Any]]
+
+PERSON_SCHEMA: Schema = {
+    "identity_document": _required,
+    "first_name": _required,
+    "second_name": _optional,
+    "first_surname": _required,
+    "second_surname": _optional,
+    "sex": _sex,
+}
+REPRESENTATIVE_SCHEMA: Schema = PERSON_SCHEMA | {
+    "email": _optional_email,
+    "phone_number": _phone_number,
+}
+STUDENT_SCHEMA: Schema = PERSON_SCHEMA | {
+    "email": _email,
+    "birth_date": _date,
+    "phone_number": _optional_phone_number,
+    "representative_identity_document": _optional,
+}
+
+
+def column_lengths(model: type) -> dict[str, int]:
+    """Return the maximum length of the string columns of model, by name."""
+    return {
+        column.name: column.type.length
+        for column in model.__table__.columns
+        if getattr(column.type, "length", None)
+    }
+
+
+def validate(
+    record: Any, schema: Schema, lengths: dict[str, int] | None = None
+) -> tuple[Record, dict[str, str]]:
+    """
+    Validate and convert the fields of record according to schema, strings
+    must fit in the lengths given by field. Return the converted values and
+    the errors found, keyed by field.
+    """
+    if not isinstance(record, dict):
+        return {}, {"record": "A record must be an object."}
+
+    lengths = lengths or {}
+    values, errors = {}, {}
+    for name, convert in schema.items():
+        try:
+            values[name] = convert(record.get(name))
+        except ValueError as exc:
+            errors[name] = str(exc)
+            continue
+        length = lengths.get(name)
+        if isinstance(values[name], str) and length and len(values[name]) > length:
+            errors[name] = f"Field cannot be longer than {length} characters."
+    return values, errors
+
+
+def _chunks(items: list[Any]) -> list[list[Any]]:
+    """Split items into lists of at most CHUNK_SIZE items."""
+    return [items[i : i + CHUNK_SIZE] for i in range(0, len(items), CHUNK_SIZE)]
+
+
+def _upsert(model: type, rows: list[Record]) -> dict[str, str]:
+    """
+    Upsert rows into model's table keyed on identity_document and return
+    whether each document was created or updated.
+    """
+    statement = insert(model.__table__).values(rows)
+    columns = [name for name in rows[0] if name != "identity_document"]
+    statement = statement.on_conflict_do_update(
+        index_elements=["identity_document"],
+        set_={name: statement.excluded[name] for name in columns}
+        | {"updated_at": utc_now()},
+    ).returning(
+        model.__table__.c.identity_document,
+        # xmax is only zero for rows inserted by the statement
+        sa.literal_column("xmax = 0"),
+    )
+    return {
+        document: CREATED if inserted else UPDATED
+        for document, inserted in db.session.execute(statement)
+    }
+
+
+def _apply(model: type, rows: list[Record], outcomes: dict[str, Outcome]) -> None:
+    """
+    Upsert rows in chunks, each one in a SAVEPOINT. When a chunk is refused
+    by the database, its rows are retried one by one so that only the
+    offending records are reported as errors.
+    """
+    session = db.session
+    for chunk in _chunks(rows):
+        try:
+            with session.begin_nested():
+                statuses = _upsert(model, chunk)
+        except DBAPIError:
+            statuses = {}
+            for row in chunk:
+                try:
+                    with session.begin_nested():
+                        statuses |= _upsert(model, [row])
+                except DBAPIError as exc:
+                    outcomes[row["identity_document"]].update(
+                        status=ERROR, errors={"record": str(exc.orig).strip()}
+                    )
+        for document, status in statuses.items():
+            outcomes[document]["status"] = status
+
+
+def _prepare(
+    records: list[Any], schema: Schema, model: type
+) -> tuple[list[Outcome], dict[str, Outcome], list[Record]]:
+    """
+    Validate records against schema and the columns of model, and return an
+    outcome per record, the outcomes of the records to be applied keyed by
+    identity document, and their values. When a document appears more than
+    once, its last record is applied.
+    """
+    outcomes = []
+    pending: dict[str, tuple[Outcome, Record]] = {}
+    lengths = column_lengths(model)
+    for record in records:
+        values, errors = validate(record, schema, lengths)
+        document = values.get("identity_document")
+        outcome = {"identity_document": document, "status": INVALID}
+        if errors:
+            outcome["errors"] = errors
+        else:
+            if document in pending:
+                pending[document][0]["status"] = DUPLICATE
+            pending[document] = (outcome, values)
+        outcomes.append(outcome)
+
+    return (
+        outcomes,
+        {document: outcome for document, (outcome, _) in pending.items()},
+        [values for _, values in pending.values()],
+    )
+
+
+def sync_representatives(records: list[Any]) -> list[Outcome]:
+    """Upsert representatives and return an outcome per record."""
+    outcomes, pending, rows = _prepare(records, REPRESENTATIVE_SCHEMA, Representative)
+    if rows:
+        _apply(Representative, rows, pending)
+    return outcomes
+
+
+def sync_students(records: list[Any]) -> list[Outcome]:
+    """
+    Upsert students and return an outcome per record. Representatives are
+    linked by their identity document, which must already exist.
+    """
+    outcomes, pending, rows = _prepare(records, STUDENT_SCHEMA, Student)
+
+    documents = {
+        row["representative_identity_document"]
+        for row in rows
+        if row["representative_identity_document"] is not None
+    }
+    representative_ids = {}
+    for chunk in _chunks(sorted(documents)):
+        representative_ids.update(
+            db.session.execute(
+                select(Representative.identity_document, Representative.id).where(
+                    Representative.identity_document.in_(chunk)
+                )
+            ).all()
+        )
+
+    resolved = []
+    for row in rows:
+        document = row.pop("representative_identity_document")
+        if document is not None and document not in representative_ids:
+            pending[row["identity_document"]]["errors"] = {
+                "representative_identity_document": "Representative does not exist."
+            }
+            continue
+        row["representative_id"] = representative_ids.get(document)
+        resolved.append(row)
+
+    if resolved:
+        _apply(Student, resolved, pending)
+    return outcomes
@@ -0,0 +1,38 @@
+"""
+This module contains the warm-up of the app for pre-fork servers, see
+`gunicorn.conf.py`. Templates are compiled once in the master process, so
+workers share them through copy-on-write memory. Each worker then gets its
+own database connections, since connections must not cross a fork, and
+loads its reference data before serving its first request.
+"""
+
+from flask import Flask
+from sqlalchemy import text
+
+from . import db
+from .dashboard import get_dashboard
+
+
+def warm_templates(app: Flask) -> int:
+    """Compile every template of app into its cache, return how many."""
+    names = app.jinja_env.list_templates(extensions=["jinja"])
+    for name in names:
+        app.jinja_env.get_template(name)
+    return len(names)
+
+
+def dispose_engine(app: Flask) -> None:
+    """
+    Drop the connections inherited from the parent process, without closing
+    them, since they still belong to it.
+    """
+    with app.app_context():
+        db.engine.dispose(close=False)
+
+
+def warm_worker(app: Flask) -> None:
+    """Open a database connection and compute the dashboard of the worker."""
+    with app.app_context():
+        db.session.execute(text("SELECT 1"))
+        get_dashboard()
+        db.session.remove()
@@ -1,24 +1,87 @@
 """This module defines configuration classes for a Flask app."""
 
+import json
 import os
+from decimal import Decimal
 
 DEBUG = os.getenv("FLASK_DEBUG") == "1"
 TESTING = os.getenv("TESTING") == "1"
 SQL_ECHO = os.getenv("SQL_ECHO") == "1"
 LOCAL_TEST = TESTING and DEBUG
 ENABLED_FOR_DEV = DEBUG and not TESTING
-DB_URI = os.environ["SQLALCHEMY_DATABASE_URI"]
 
 
-class Config:  # pylint: disable=too-few-public-methods
-    """This class represents a basic configuration for a Flask app."""
+class Config:  # pylint: disable=too-few-public-methods,too-many-instance-attributes,invalid-name
+    """
+    This class represents a basic configuration for a Flask app.
+    Environment variables are read when an instance is created instead of
+    when this module is imported.
+    """
 
-    SECRET_KEY = os.environ["SECRET_KEY"]
     TESTING = TESTING
     WTF_CSRF_ENABLED = not TESTING
     DEBUG_TB_INTERCEPT_REDIRECTS = False
 
     # SQLAlchemy
-    SQLALCHEMY_DATABASE_URI = f"{DB_URI}_test" if LOCAL_TEST else DB_URI
     SQLALCHEMY_ECHO = SQL_ECHO
     SQLALCHEMY_RECORD_QUERIES = ENABLED_FOR_DEV
+
+    def __init__(self) -> None:
+        db_uri = os.environ["SQLALCHEMY_DATABASE_URI"]
+        self.SECRET_KEY = os.environ["SECRET_KEY"]
+        self.API_TOKEN = os.getenv("API_TOKEN")
+        self.SQLALCHEMY_DATABASE_URI = f"{db_uri}_test" if LOCAL_TEST else db_uri
+
+        # Branches routed to their own database, by branch code
+        self.BRANCH_DATABASES = json.loads(os.getenv("BRANCH_DATABASES") or "{}")
+
+        # Dashboard
+        self.DASHBOARD_CACHE_TTL = int(os.getenv("DASHBOARD_CACHE_TTL", "300"))
+        self.CLASS_CAPACITY = int(os.getenv("CLASS_CAPACITY", "12"))
+
+        # Concurrent read-only queries
+        self.FAN_OUT_WORKERS = int(os.getenv("FAN_OUT_WORKERS", "4"))
+        self.FAN_OUT_TIMEOUT = float(os.getenv("FAN_OUT_TIMEOUT", "10"))
+
+        # Slow queries
+        self.SLOW_QUERY_THRESHOLD_MS = float(
+            os.getenv("SLOW_QUERY_THRESHOLD_MS", "500")
+        )
+        self.SLOW_QUERY_ANALYZE = (
+            os.getenv("SLOW_QUERY_ANALYZE", "1" if DEBUG else "0") == "1"
+        )
+        self.SLOW_QUERY_LOG = os.getenv("SLOW_QUERY_LOG")
+        self.SLOW_QUERY_LOG_MAX_BYTES = int(
+            os.getenv("SLOW_QUERY_LOG_MAX_BYTES", "1048576")
+        )
+
+        # Sibling discounts, amounts per student by number of enrolled siblings
+        self.SIBLING_DISCOUNTS = {
+            int(siblings): Decimal(str(amount))
+            for siblings, amount in json.loads(
+                os.getenv("SIBLING_DISCOUNTS") or "{}"
+            ).items()
+        }
+
+        # Receipts
+        self.RECEIPT_FOLDER = os.getenv("RECEIPT_FOLDER")
+        self.RECEIPT_PROCESSES = int(
+            os.getenv("RECEIPT_PROCESSES") or os.cpu_count() or 1
+        )
+
+        # Mail
+        self.MAIL_SERVER = os.getenv("MAIL_SERVER", "localhost")
+        self.MAIL_PORT = int(os.getenv("MAIL_PORT", "25"))
+        self.MAIL_USE_TLS = os.getenv("MAIL_USE_TLS") == "1"
+        self.MAIL_USERNAME = os.getenv("MAIL_USERNAME")
+        self.MAIL_PASSWORD = os.getenv("MAIL_PASSWORD")
+        self.MAIL_SENDER = os.getenv(
+            "MAIL_SENDER", "Blueberry School <school@localhost>"
+        )
+        self.MAIL_RATE_LIMIT = float(os.getenv("MAIL_RATE_LIMIT", "10"))
+        self.MAIL_BATCH_SIZE = int(os.getenv("MAIL_BATCH_SIZE", "100"))
+        self.MAIL_MAX_ATTEMPTS = int(os.getenv("MAIL_MAX_ATTEMPTS", "5"))
+
+        # Profiler
+        self.PROFILER_FOLDER = os.getenv("PROFILER_FOLDER")
+        self.PROFILER_MAX_PROFILES = int(os.getenv("PROFILER_MAX_PROFILES", "100"))
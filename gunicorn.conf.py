@@ -0,0 +1,51 @@
+"""
+This file contains the gunicorn configuration, used as follows:
+
+    gunicorn -c gunicorn.conf.py wsgi:app
+
+The app is preloaded in the master process so workers share its memory.
+Each worker drops the database connections inherited from the master and
+warms itself up before accepting requests. Workers and threads are sized
+from the CPU count, unless WEB_CONCURRENCY and GUNICORN_THREADS are set.
+"""
+
+# pylint: disable=invalid-name,import-outside-toplevel,unused-argument
+
+import gc
+import multiprocessing
+import os
+from typing import Any
+
+bind = os.getenv("GUNICORN_BIND", "127.0.0.1:8000")
+preload_app = True
+worker_class = "gthread"
+# requests mostly wait on the database, so a few threads per worker keep a
+# core busy with a fraction of the memory of as many workers
+workers = int(os.getenv("WEB_CONCURRENCY") or multiprocessing.cpu_count() + 1)
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+# recycle workers now and then to bound memory growth
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "1000"))
+max_requests_jitter = max_requests // 10
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "30"))
+accesslog = os.getenv("GUNICORN_ACCESS_LOG")
+
+
+def pre_fork(server: Any, worker: Any) -> None:
+    """
+    Move the objects of the preloaded app out of the garbage collector's
+    reach, so collections in workers do not copy the pages holding them.
+    """
+    gc.freeze()
+
+
+def post_fork(server: Any, worker: Any) -> None:
+    """Give the worker its own database connections and warm it up."""
+    from app.warmup import dispose_engine, warm_worker
+    from wsgi import app
+
+    dispose_engine(app)
+    try:
+        warm_worker(app)
+    except Exception:  # pylint: disable=broad-except
+        # a cold worker is better than a worker failing to boot
+        worker.log.exception("Worker %s could not warm up.", worker.pid)
@@ -7,7 +7,6 @@ from typing import Any
 
 from app import create_app, db
 from app.models import models
-from factories import factories
 
 app = create_app()
 
@@ -15,7 +14,12 @@ app = create_app()
 # Shell Context Processor
 @app.shell_context_processor
 def make_shell_context() -> dict[str, Any]:
-    """Load items into the shell."""
+    """
+    Load items into the shell. Factories depend on faker and factory_boy,
+    which are only needed in the shell, so they are imported here.
+    """
+    from factories import factories  # pylint: disable=import-outside-toplevel
+
     factory_dict = {cls.__name__: cls for cls in factories}
     model_dict = {cls.__name__: cls for cls in models}
     return factory_dict | model_dict | dict(db=db, session=db.session)
@@ -0,0 +1,44 @@
+"""
+This file contains a script to benchmark the startup of the Flask app.
+It reports the time to import `school` in a fresh interpreter and the time
+to call `create_app()` once its modules are already imported.
+"""
+
+import statistics
+import subprocess
+import sys
+import time
+
+from app import create_app
+
+ROUNDS = 10
+
+
+def cold_import() -> float:
+    """Return the seconds taken to import `school` in a fresh interpreter."""
+    code = (
+        "import time; start = time.perf_counter(); import school; "
+        "print(time.perf_counter() - start)"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, check=True, text=True
+    )
+    return float(result.stdout.strip().splitlines()[-1])
+
+
+def warm_create_app() -> float:
+    """Return the seconds taken by `create_app()` once its modules are imported."""
+    start = time.perf_counter()
+    create_app()
+    return time.perf_counter() - start
+
+
+def report(name: str, samples: list[float]) -> None:
+    """Print the median and the maximum of samples, in milliseconds."""
+    median = statistics.median(samples) * 1000
+    maximum = max(samples) * 1000
+    print(f"{name:<20} median {median:8.1f} ms    max {maximum:8.1f} ms")
+
+
+report("import school", [cold_import() for _ in range(ROUNDS)])
+report("create_app()", [warm_create_app() for _ in range(ROUNDS)])
@@ -0,0 +1,370 @@
+"""
+This file contains a load test harness for the admin. Virtual users, spread
+over several processes, log in and go through the flows staff use the most:
+browsing the student table, opening a student and creating a payment. At
+the end, the throughput, the latency percentiles and the error rate of each
+endpoint are reported.
+
+The harness only depends on the standard library to generate load. It can
+seed the database with `--seed` and start the app locally with `--serve`;
+otherwise it targets the app running at `--url`, e.g. under gunicorn.
+
+    python -m scripts.load_test --seed 500 --serve --users 20 --duration 60
+"""
+
+import argparse
+import http.cookiejar
+import multiprocessing
+import random
+import re
+import statistics
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+from collections import defaultdict
+from typing import Any, NamedTuple
+
+LOAD_TEST_EMAIL = "load-test@example.com"
+LOAD_TEST_PASSWORD = "load-test"
+REQUEST_TIMEOUT = 30
+SORTS = ["id", "created_at", "identity_document", "first_surname", "email"]
+
+CSRF_INPUT = re.compile(r'<input[^>]*name="csrf_token"[^>]*>')
+VALUE = re.compile(r'value="([^"]*)"')
+STUDENT_LINK = re.compile(r'href="/admin/student/(\d+)"')
+
+
+class Sample(NamedTuple):
+    """This class represents the outcome of a single request."""
+
+    endpoint: str
+    latency: float
+    error: str | None
+
+
+class _NoRedirect(urllib.request.HTTPRedirectHandler):
+    """Return redirects as responses, so each endpoint is timed on its own."""
+
+    def redirect_request(  # pylint: disable=unused-argument
+        self, *args: Any, **kwargs: Any
+    ) -> None:
+        return None
+
+
+class VirtualUser:
+    """
+    This class represents a member of the staff using the admin. It has its
+    own cookies, so it logs in and keeps its session like a browser would.
+    """
+
+    def __init__(
+        self,
+        base_url: str,
+        think_time: float,
+        samples: list[Sample],
+        random_seed: int,
+    ) -> None:
+        self.base_url = base_url.rstrip("/")
+        self.think_time = think_time
+        self.samples = samples
+        self.random = random.Random(random_seed)
+        self.opener = urllib.request.build_opener(
+            urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()),
+            _NoRedirect,
+        )
+
+    def request(
+        self,
+        endpoint: str,
+        path: str,
+        data: dict[str, Any] | None = None,
+        redirect: str | None = None,
+    ) -> str:
+        """
+        Request path, posting data if given, record how long it took and
+        return the body of the response. A request fails if its status is
+        not successful or if it does not redirect to redirect, when given.
+        """
+        body = urllib.parse.urlencode(data, doseq=True).encode() if data else None
+        error = None
+        text = ""
+        start = time.perf_counter()
+        try:
+            with self.opener.open(
+                self.base_url + path, data=body, timeout=REQUEST_TIMEOUT
+            ) as response:
+                text = response.read().decode()
+            if redirect is not None:
+                error = f"expected a redirect to {redirect}"
+        except urllib.error.HTTPError as exc:
+            location = urllib.parse.urlsplit(exc.headers.get("Location", "")).path
+            if exc.code not in (301, 302, 303):
+                error = f"HTTP {exc.code}"
+            elif redirect is not None and location != redirect:
+                error = f"redirected to {location}"
+        except OSError as exc:
+            error = type(exc).__name__
+        self.samples.append(Sample(endpoint, time.perf_counter() - start, error))
+        return text
+
+    def pause(self) -> None:
+        """Wait like a user reading the page."""
+        if self.think_time > 0:
+            time.sleep(self.random.uniform(0, 2 * self.think_time))
+
+    def login(self, email: str, password: str) -> None:
+        """Log in through the login form."""
+        page = self.request("auth.login_get", "/auth/login")
+        self.request(
+            "auth.login_post",
+            "/auth/login",
+            {"email": email, "password": password, "csrf_token": _csrf_token(page)},
+            redirect="/admin/",
+        )
+
+    def browse_students(self) -> list[str]:
+        """Open the student table sorted at random, return the ids listed."""
+        query = urllib.parse.urlencode(
+            {
+                "sort": self.random.choice(SORTS),
+                "direction": self.random.choice(["asc", "desc"]),
+            }
+        )
+        page = self.request("admin.student_table", f"/admin/student?{query}")
+        return STUDENT_LINK.findall(page)
+
+    def view_student(self, student_id: str) -> None:
+        """Open a student."""
+        self.request("admin.student_view", f"/admin/student/{student_id}")
+
+    def create_payment(self) -> None:
+        """Create a payment for a student through the payment form."""
+        page = self.request("admin.create_payment_get", "/admin/payment/create")
+        students, cycles = _options(page, "student"), _options(page, "cycle")
+        if not students or not cycles:
+            return
+        self.request(
+            "admin.create_payment_post",
+            "/admin/payment/create",
+            {
+                "amount": f"{self.random.randint(20, 120)}.00",
+                "discount": "0.00",
+                "description": "Load test",
+                "student": self.random.choice(students),
+                "cycle": self.random.choice(cycles),
+                "csrf_token": _csrf_token(page),
+            },
+            redirect="/admin/payment",
+        )
+
+    def run(self, email: str, password: str, deadline: float) -> None:
+        """Log in and go through the scenario until deadline."""
+        self.login(email, password)
+        while time.monotonic() < deadline:
+            student_ids = self.browse_students()
+            self.pause()
+            for student_id in self.random.sample(student_ids, min(3, len(student_ids))):
+                self.view_student(student_id)
+                self.pause()
+            if self.random.random() < 0.3:
+                self.create_payment()
+                self.pause()
+
+
+def _csrf_token(page: str) -> str:
+    """Return the CSRF token of the form of page, if any."""
+    match = CSRF_INPUT.search(page)
+    value = VALUE.search(match.group(0)) if match else None
+    return value.group(1) if value else ""
+
+
+def _options(page: str, name: str) -> list[str]:
+    """Return the non-empty option values of the select called name."""
+    match = re.search(rf'<select[^>]*name="{name}"[^>]*>(.*?)</select>', page, re.S)
+    return [value for value in VALUE.findall(match.group(1)) if value] if match else []
+
+
+def run_process(options: dict[str, Any]) -> list[Sample]:
+    """Run the virtual users of a process, each in its own thread."""
+    samples: list[Sample] = []
+    deadline = time.monotonic() + options["duration"]
+    threads = []
+    for index in range(options["users"]):
+        user = VirtualUser(
+            options["url"],
+            options["think_time"],
+            samples,
+            options["random_seed"] + index,
+        )
+        thread = threading.Thread(
+            target=user.run,
+            args=(options["email"], options["password"], deadline),
+        )
+        thread.start()
+        threads.append(thread)
+        # ramp users up over the first seconds
+        time.sleep(options["ramp_up"] / max(options["users"], 1))
+    for thread in threads:
+        thread.join()
+    return samples
+
+
+def percentiles(latencies: list[float]) -> tuple[float, float, float]:
+    """Return the 50th, 95th and 99th percentiles of latencies."""
+    if len(latencies) == 1:
+        return latencies[0], latencies[0], latencies[0]
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return cuts[49], cuts[94], cuts[98]
+
+
+def report(samples: list[Sample], elapsed: float) -> str:
+    """Return a table with the throughput, latency and errors per endpoint."""
+    by_endpoint: dict[str, list[Sample]] = defaultdict(list)
+    for sample in samples:
+        by_endpoint[sample.endpoint].append(sample)
+    by_endpoint["total"] = samples
+
+    lines = [
+        f"{'endpoint':<28}{'requests':>9}{'req/s':>9}{'p50 ms':>9}"
+        f"{'p95 ms':>9}{'p99 ms':>9}{'errors':>9}"
+    ]
+    for endpoint, endpoint_samples in sorted(
+        by_endpoint.items(), key=lambda item: (item[0] == "total", item[0])
+    ):
+        if not endpoint_samples:
+            continue
+        p50, p95, p99 = percentiles([sample.latency for sample in endpoint_samples])
+        errors = sum(sample.error is not None for sample in endpoint_samples)
+        lines.append(
+            f"{endpoint:<28}{len(endpoint_samples):>9}"
+            f"{len(endpoint_samples) / elapsed:>9.1f}"
+            f"{p50 * 1000:>9.1f}{p95 * 1000:>9.1f}{p99 * 1000:>9.1f}"
+            f"{errors / len(endpoint_samples):>9.1%}"
+        )
+
+    errors: dict[str, int] = defaultdict(int)
+    for sample in samples:
+        if sample.error is not None:
+            errors[f"{sample.endpoint}: {sample.error}"] += 1
+    lines.extend(f"  {count} x {error}" for error, count in sorted(errors.items()))
+    return "\n".join(lines)
+
+
+def seed(students: int) -> None:
+    """
+    Create the load test user, a cycle with classes and students, with their
+    representatives, in the configured database.
+    """
+    # pylint: disable=import-outside-toplevel
+    from sqlalchemy import select
+
+    from app import create_app, db
+    from app.models import User
+    from factories import ClassFactory, CycleFactory, StudentFactory, UserFactory
+
+    app = create_app()
+    with app.app_context():
+        user = db.session.execute(
+            select(User).where(User.email == LOAD_TEST_EMAIL)
+        ).scalar_one_or_none()
+        if user is None:
+            UserFactory(email=LOAD_TEST_EMAIL, password=LOAD_TEST_PASSWORD)
+        classes = ClassFactory.create_batch(8, cycle=CycleFactory())
+        db.session.add_all(
+            StudentFactory.build(class_=random.choice(classes)) for _ in range(students)
+        )
+        db.session.commit()
+
+
+def _serve(host: str, port: int) -> None:
+    """Serve the app with a threaded development server."""
+    # pylint: disable=import-outside-toplevel
+    import logging
+
+    from werkzeug.serving import make_server
+
+    from app import create_app
+
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)
+    make_server(host, port, create_app(), threaded=True).serve_forever()
+
+
+def serve(host: str, port: int) -> multiprocessing.Process:
+    """Start the app in another process and wait until it accepts requests."""
+    process = multiprocessing.Process(target=_serve, args=(host, port), daemon=True)
+    process.start()
+    url = f"http://{host}:{port}/"
+    for _ in range(100):
+        try:
+            with urllib.request.urlopen(url, timeout=1):
+                return process
+        except urllib.error.HTTPError:
+            return process
+        except OSError:
+            time.sleep(0.1)
+    process.terminate()
+    raise RuntimeError(f"The app did not start on {url}.")
+
+
+def main() -> None:
+    """Run the load test as configured by the command line."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n", maxsplit=1)[0])
+    parser.add_argument("--url", default="http://127.0.0.1:5000")
+    parser.add_argument("--users", type=int, default=10, help="virtual users")
+    parser.add_argument(
+        "--processes", type=int, default=multiprocessing.cpu_count(), help="workers"
+    )
+    parser.add_argument("--duration", type=float, default=30, help="seconds")
+    parser.add_argument("--ramp-up", type=float, default=5, help="seconds")
+    parser.add_argument("--think-time", type=float, default=1, help="mean seconds")
+    parser.add_argument("--email", default=LOAD_TEST_EMAIL)
+    parser.add_argument("--password", default=LOAD_TEST_PASSWORD)
+    parser.add_argument("--seed", type=int, metavar="STUDENTS", help="seed the db")
+    parser.add_argument(
+        "--serve", action="store_true", help="start the app locally on --url"
+    )
+    args = parser.parse_args()
+
+    if args.seed:
+        seed(args.seed)
+    server = None
+    if args.serve:
+        url = urllib.parse.urlsplit(args.url)
+        server = serve(url.hostname, url.port or 80)
+
+    processes = max(1, min(args.processes, args.users))
+    options = [
+        {
+            "url": args.url,
+            "users": args.users // processes + (index < args.users % processes),
+            "duration": args.duration,
+            "ramp_up": args.ramp_up,
+            "think_time": args.think_time,
+            "email": args.email,
+            "password": args.password,
+            "random_seed": index * args.users,
+        }
+        for index in range(processes)
+    ]
+    print(
+        f"Running {args.users} virtual users in {processes} processes "
+        f"for {args.duration:g}s against {args.url}"
+    )
+    start = time.monotonic()
+    try:
+        with multiprocessing.Pool(processes) as pool:
+            samples = [
+                sample
+                for process_samples in pool.map(run_process, options)
+                for sample in process_samples
+            ]
+    finally:
+        if server is not None:
+            server.terminate()
+    print(report(samples, time.monotonic() - start))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,39 @@
+"""
+This file contains a script to vendor the third party assets listed in
+`app/assets.py` into the static folder. Downloads are checked against their
+subresource integrity when it is known.
+"""
+
+import base64
+import hashlib
+import sys
+import urllib.request
+from pathlib import Path
+
+from app.assets import VENDORED_ASSETS
+
+STATIC_FOLDER = Path(__file__).resolve().parent.parent / "app" / "static"
+
+
+def integrity(data: bytes) -> str:
+    """Return the sha384 subresource integrity of data."""
+    return "sha384-" + base64.b64encode(hashlib.sha384(data).digest()).decode()
+
+
+def main() -> int:
+    """Download every vendored asset, return a non-zero code on a mismatch."""
+    for filename, vendored in VENDORED_ASSETS.items():
+        with urllib.request.urlopen(vendored.url, timeout=30) as response:
+            data = response.read()
+        if vendored.integrity is not None and integrity(data) != vendored.integrity:
+            print(f"{filename}: integrity mismatch for {vendored.url}", file=sys.stderr)
+            return 1
+        path = STATIC_FOLDER / filename
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_bytes(data)
+        print(f"{filename}: {len(data)} bytes, {integrity(data)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
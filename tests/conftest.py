@@ -1,17 +1,170 @@
-"""This module is used to define fixtures."""
+"""
+This module is used to define fixtures.
+
+The schema is created once per run. Every test runs inside a transaction
+which is rolled back when the test finishes, while commits issued by the
+code under test only release a SAVEPOINT. When tests run in parallel with
+pytest-xdist, each worker gets its own database cloned from the schema.
+"""
+
+import contextlib
+import os
+from typing import Any, Callable, ContextManager, Iterator
 
 import pytest
+import sqlalchemy as sa
 from flask import Flask
+from flask.testing import FlaskClient
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+from sqlalchemy.engine import URL, make_url
 
+from app import models  # pylint: disable=unused-import
 from app import create_app, db
+from config import Config
+
+API_TOKEN = "secret-token"
+
+
+class ConnectionSession(Session):  # pylint: disable=too-few-public-methods
+    """This class represents a session bound to the connection of a test."""
+
+    def get_bind(
+        self, *args: Any, **kwargs: Any  # pylint: disable=unused-argument
+    ) -> sa.engine.Connection:
+        return self.bind
+
+
+def template_url() -> URL:
+    """Return the URL of the database holding the test schema."""
+    return make_url(Config().SQLALCHEMY_DATABASE_URI)
+
+
+def maintenance_engine(url: URL) -> sa.engine.Engine:
+    """Return an engine to create and drop databases in url's server."""
+    return sa.create_engine(url.set(database="postgres"), isolation_level="AUTOCOMMIT")
+
+
+def pytest_configure(config: pytest.Config) -> None:
+    """Create the test schema once, before any xdist worker starts."""
+    if hasattr(config, "workerinput"):
+        return
+
+    engine = sa.create_engine(template_url())
+    db.metadata.drop_all(engine)
+    db.metadata.create_all(engine)
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def database_url() -> URL:
+    """
+    Return the URL of the database used by the current process.
+    xdist workers use a clone of the template database which is dropped
+    at the end of the session.
+    """
+    url = template_url()
+    worker = os.getenv("PYTEST_XDIST_WORKER")
+    if worker is None:
+        yield url
+        return
+
+    worker_url = url.set(database=f"{url.database}_{worker}")
+    engine = maintenance_engine(url)
+    with engine.connect() as connection:
+        connection.execute(sa.text(f'DROP DATABASE IF EXISTS "{worker_url.database}"'))
+        connection.execute(
+            sa.text(
+                f'CREATE DATABASE "{worker_url.database}" TEMPLATE "{url.database}"'
+            )
+        )
+    yield worker_url
+    with engine.connect() as connection:
+        connection.execute(sa.text(f'DROP DATABASE "{worker_url.database}"'))
+    engine.dispose()
+
+
+@pytest.fixture(scope="session")
+def _app(database_url: URL) -> Flask:  # pylint: disable=redefined-outer-name
+    """Return a Flask app instance shared by the whole session."""
+    _app = create_app(
+        {"SQLALCHEMY_DATABASE_URI": database_url.render_as_string(hide_password=False)}
+    )
+    yield _app
+    with _app.app_context():
+        db.engine.dispose()
 
 
 @pytest.fixture
-def app() -> Flask:
-    """Return a Flask app instance."""
-    _app = create_app()
+def app(_app: Flask) -> Flask:  # pylint: disable=redefined-outer-name
+    """
+    Return a Flask app instance whose session is bound to a connection
+    in an outer transaction, rolled back after the test.
+    """
     with _app.app_context():
-        db.create_all()
+        connection = db.engine.connect()
+        transaction = connection.begin()
+        nested = connection.begin_nested()
+
+        session_factory = db.session.session_factory
+        session_class = session_factory.class_
+        session_factory.class_ = ConnectionSession
+        session_factory.configure(bind=connection)
+        session = db.session()
+
+        @event.listens_for(session, "after_transaction_end")
+        def restart_savepoint(*args: Any) -> None:  # pylint: disable=unused-argument
+            nonlocal nested
+            if not nested.is_active:
+                nested = connection.begin_nested()
+
         yield _app
+
         db.session.remove()
-        db.drop_all()
+        session_factory.class_ = session_class
+        session_factory.configure(bind=None)
+        transaction.rollback()
+        connection.close()
+
+
+@pytest.fixture
+def statements(
+    app: Flask,  # pylint: disable=redefined-outer-name,unused-argument
+) -> Callable[[], ContextManager[list[str]]]:
+    """
+    Return a context manager recording the SQL statements executed by the
+    database engine within it, into the list it returns.
+    """
+
+    @contextlib.contextmanager
+    def record_statements() -> Iterator[list[str]]:
+        executed = []
+
+        def record(conn, cursor, statement, *args):  # pylint: disable=unused-argument
+            executed.append(statement)
+
+        engine = db.engine
+        event.listen(engine, "before_cursor_execute", record)
+        try:
+            yield executed
+        finally:
+            event.remove(engine, "before_cursor_execute", record)
+
+    return record_statements
+
+
+@pytest.fixture
+def api_client(
+    app: Flask,  # pylint: disable=redefined-outer-name
+    client: FlaskClient,
+    monkeypatch: pytest.MonkeyPatch,
+) -> FlaskClient:
+    """Return a test client of an application configured with API_TOKEN."""
+    monkeypatch.setitem(app.config, "API_TOKEN", API_TOKEN)
+    return client
+
+
+@pytest.fixture
+def api_headers() -> dict[str, str]:
+    """Return the headers authenticating a request with API_TOKEN."""
+    return {"Authorization": f"Bearer {API_TOKEN}"}
@@ -0,0 +1,113 @@
+"""This module contains tests for archiving and restoring cycles."""
+
+import datetime
+
+import pytest
+from sqlalchemy import func, select
+
+from app import db
+from app.archive import ArchiveError, archive_cycle, restore_cycle
+from app.attendance import AttendanceRate, class_attendance_rate, record_attendance
+from app.models import (
+    ArchivedAttendance,
+    ArchivedClass,
+    ArchivedCycle,
+    ArchivedPayment,
+    Attendance,
+    Class,
+    Cycle,
+    Payment,
+)
+from factories import ClassFactory, CycleFactory, PaymentFactory, StudentFactory
+
+
+def count(model: type) -> int:
+    """Return the number of rows of model."""
+    return db.session.execute(select(func.count()).select_from(model)).scalar_one()
+
+
+def test_archive_and_restore_cycle(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a closed cycle with two classes and three payments
+    WHEN the cycle is archived and then restored
+    THEN
+        - archiving moves every row into the archive tables
+        - restoring moves every row back keeping the same ids
+    """
+    cycle = CycleFactory(year=2022)
+    cycle_id = cycle.id
+    class_ids = {ClassFactory(cycle=cycle).id for _ in range(2)}
+    payment_ids = {PaymentFactory(cycle=cycle).id for _ in range(3)}
+
+    archive_cycle(cycle_id, today=datetime.date(2060, 1, 1))
+
+    assert count(Cycle) == 0
+    assert count(Class) == 0
+    assert count(Payment) == 0
+    archived_cycle = db.session.get(ArchivedCycle, cycle_id)
+    assert {class_.id for class_ in archived_cycle.classes} == class_ids
+    assert {payment.id for payment in archived_cycle.payments} == payment_ids
+
+    restore_cycle(cycle_id)
+
+    assert count(ArchivedCycle) == 0
+    assert count(ArchivedClass) == 0
+    assert count(ArchivedPayment) == 0
+    restored_cycle = db.session.get(Cycle, cycle_id)
+    assert {class_.id for class_ in restored_cycle.classes} == class_ids
+    assert {payment.id for payment in restored_cycle.payments} == payment_ids
+
+
+def test_open_cycle_cannot_be_archived(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a cycle which end_date is today
+    WHEN archiving the cycle
+    THEN ArchiveError is raised
+    """
+    today = datetime.date(2022, 10, 31)
+    cycle = CycleFactory(start_date=datetime.date(2022, 10, 1), end_date=today)
+
+    with pytest.raises(ArchiveError):
+        archive_cycle(cycle.id, today=today)
+
+
+def test_cycle_with_enrolled_students_cannot_be_archived(
+    app,
+):  # pylint: disable=unused-argument
+    """
+    GIVEN a closed cycle which has a class with an enrolled student
+    WHEN archiving the cycle
+    THEN ArchiveError is raised
+    """
+    class_ = ClassFactory(cycle=CycleFactory(year=2022))
+    StudentFactory(class_=class_)
+
+    with pytest.raises(ArchiveError):
+        archive_cycle(class_.cycle_id, today=datetime.date(2060, 1, 1))
+
+
+def test_archive_keeps_attendance(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a closed cycle with a class whose students attended a session and
+        were then moved out of it
+    WHEN archiving the cycle and then restoring it
+    THEN the attendance is archived with the class and restored along with
+        its counters
+    """
+    class_ = ClassFactory(cycle=CycleFactory(year=2022))
+    present, absent = StudentFactory.create_batch(2, class_=class_)
+    record_attendance(class_.id, datetime.date(2022, 11, 14), {present.id})
+    present.class_id = absent.class_id = None
+    db.session.commit()
+    cycle_id, class_id = class_.cycle_id, class_.id
+
+    archive_cycle(cycle_id, today=datetime.date(2060, 1, 1))
+
+    assert count(Attendance) == 0
+    assert count(ArchivedAttendance) == 2
+
+    restore_cycle(cycle_id)
+
+    assert count(ArchivedAttendance) == 0
+    assert count(Attendance) == 2
+    assert class_attendance_rate(class_id) == AttendanceRate(2, 1)
@@ -0,0 +1,127 @@
+"""This module contains tests for the static asset pipeline."""
+
+import gzip
+from pathlib import Path
+
+import brotli
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+
+from app.assets import (
+    VENDORED_ASSETS,
+    build_assets,
+    cdn_fallbacks,
+    fingerprint,
+    load_manifest,
+)
+from scripts.vendor_assets import integrity
+
+
+@pytest.fixture(name="static_folder")
+def fixture_static_folder(tmp_path: Path) -> Path:
+    """Return a static folder with a stylesheet which references a font."""
+    (tmp_path / "fonts").mkdir()
+    (tmp_path / "fonts" / "icons.woff2").write_bytes(b"font")
+    (tmp_path / "icons.css").write_text(
+        '@font-face { src: url("./fonts/icons.woff2?v=1") format("woff2"); }\n'
+        + "/* padding */\n" * 100
+    )
+    return tmp_path
+
+
+def test_build_assets(static_folder: Path):
+    """
+    GIVEN a static folder with a stylesheet referencing a font
+    WHEN building the assets
+    THEN
+        - files are copied with their content hash in their names
+        - the stylesheet references the built font
+        - the stylesheet has gzip and brotli variants
+        - the manifest is written
+    """
+    manifest = build_assets(static_folder)
+
+    font = manifest["fonts/icons.woff2"]
+    assert font == fingerprint("fonts/icons.woff2", b"font")
+    dist = static_folder / "dist"
+    stylesheet = (dist / manifest["icons.css"]).read_bytes()
+    assert f'url("{font}")'.encode() in stylesheet
+    css_path = dist / manifest["icons.css"]
+    assert gzip.decompress(Path(f"{css_path}.gz").read_bytes()) == stylesheet
+    assert brotli.decompress(Path(f"{css_path}.br").read_bytes()) == stylesheet
+    assert load_manifest(static_folder) == manifest
+
+
+def test_built_asset_is_served_compressed_and_immutable(
+    app: Flask,
+    client: FlaskClient,
+    static_folder: Path,
+    monkeypatch: pytest.MonkeyPatch,
+):
+    """
+    GIVEN built assets
+    WHEN requesting a built stylesheet accepting brotli
+    THEN it is served brotli encoded with an immutable cache header
+    """
+    manifest = build_assets(static_folder)
+    monkeypatch.setattr(app, "static_folder", str(static_folder))
+    monkeypatch.setitem(app.extensions["assets"], "manifest", manifest)
+    with app.test_request_context():
+        url = app.jinja_env.globals["asset_url"]("icons.css")
+
+    response = client.get(url, headers={"Accept-Encoding": "gzip, br"})
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "br"
+    assert response.mimetype == "text/css"
+    assert "immutable" in response.headers["Cache-Control"]
+    assert "max-age=31536000" in response.headers["Cache-Control"]
+
+
+def test_html_is_compressed(client: FlaskClient):
+    """
+    GIVEN a client accepting gzip
+    WHEN requesting the index page
+    THEN the response is gzip encoded
+    """
+    response = client.get(url_for("main.index"), headers={"Accept-Encoding": "gzip"})
+
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert b"Blueberry School" in gzip.decompress(response.data)
+
+
+def test_vendored_assets_are_served_locally(client: FlaskClient):
+    """
+    GIVEN the third party assets vendored in the static folder
+    WHEN requesting the index page and its vendored assets
+    THEN the page does not reference the CDN and the assets are served
+    """
+    static_folder = Path(client.application.static_folder)
+    assert not cdn_fallbacks(static_folder)
+
+    response = client.get(url_for("main.index"))
+
+    assert response.status_code == 200
+    assert "cdn.jsdelivr.net" not in response.text
+    for filename, vendored in VENDORED_ASSETS.items():
+        data = (static_folder / filename).read_bytes()
+        if vendored.integrity is not None:
+            assert integrity(data) == vendored.integrity
+        assert client.get(url_for("static", filename=filename)).data == data
+
+
+def test_build_is_refused_without_vendored_assets(
+    app: Flask, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    GIVEN a static folder missing a third party asset
+    WHEN building the assets
+    THEN the build is refused
+    """
+    monkeypatch.setattr(app, "static_folder", str(tmp_path))
+
+    result = app.test_cli_runner().invoke(args=["assets", "build"])
+
+    assert result.exit_code != 0
+    assert "vendor/popper/popper.min.js" in result.output
@@ -0,0 +1,128 @@
+"""This module contains tests for recording attendance."""
+
+import datetime
+
+from flask import url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import delete, select
+
+from app import db
+from app.attendance import (
+    AttendanceRate,
+    class_attendance_rate,
+    record_attendance,
+    roster,
+    student_attendance_rate,
+    student_attendance_rates,
+)
+from app.models import Attendance, AttendanceCounter, Student
+from factories import ClassFactory, StudentFactory, UserFactory
+
+MONDAY = datetime.date(2022, 10, 3)
+TUESDAY = datetime.date(2022, 10, 4)
+
+
+def test_record_attendance(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a class with three students
+    WHEN two sessions are recorded and the first one is corrected
+    THEN
+        - the roster of each session reflects the last recording
+        - the counters match the attendance rows
+    """
+    class_ = ClassFactory()
+    first, second, third = (
+        student.id for student in StudentFactory.create_batch(3, class_=class_)
+    )
+
+    assert record_attendance(class_.id, MONDAY, {first, second}) == 3
+    record_attendance(class_.id, TUESDAY, {first})
+    record_attendance(class_.id, MONDAY, {first, third})
+
+    assert roster(class_.id, MONDAY) == {first: True, second: False, third: True}
+    assert roster(class_.id, TUESDAY) == {first: True, second: False, third: False}
+    assert student_attendance_rates(class_.id) == {
+        first: AttendanceRate(2, 2),
+        second: AttendanceRate(2, 0),
+        third: AttendanceRate(2, 1),
+    }
+    assert class_attendance_rate(class_.id) == AttendanceRate(6, 3)
+    assert class_attendance_rate(class_.id).rate == 0.5
+    assert student_attendance_rate(first) == AttendanceRate(2, 2)
+
+
+def test_record_attendance_single_insert(statements):
+    """
+    GIVEN a class with five students
+    WHEN a session is recorded
+    THEN the attendance rows are written with a single INSERT
+    """
+    class_ = ClassFactory()
+    StudentFactory.create_batch(5, class_=class_)
+
+    with statements() as executed:
+        record_attendance(class_.id, MONDAY, set())
+
+    assert len([s for s in executed if s.startswith("INSERT INTO attendance")]) == 1
+
+
+def test_deleting_attendance_updates_counters(app):  # pylint: disable=unused-argument
+    """
+    GIVEN two recorded sessions of a class
+    WHEN the attendance of one of them is deleted
+    THEN the counters only count the other session
+    """
+    class_ = ClassFactory()
+    student = StudentFactory(class_=class_)
+    record_attendance(class_.id, MONDAY, {student.id})
+    record_attendance(class_.id, TUESDAY, set())
+
+    db.session.execute(delete(Attendance).where(Attendance.session_date == MONDAY))
+    db.session.commit()
+
+    assert student_attendance_rate(student.id) == AttendanceRate(1, 0)
+
+
+def test_deleting_student_removes_attendance(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a recorded session of a class with a student
+    WHEN the student is deleted
+    THEN the attendance and counters of the student are deleted
+    """
+    class_ = ClassFactory()
+    student = StudentFactory(class_=class_)
+    record_attendance(class_.id, MONDAY, {student.id})
+
+    db.session.execute(delete(Student).where(Student.id == student.id))
+    db.session.commit()
+
+    assert db.session.execute(select(Attendance)).all() == []
+    assert db.session.execute(select(AttendanceCounter)).all() == []
+
+
+def test_class_attendance_views(client: FlaskClient):
+    """
+    GIVEN a class with two students
+    WHEN the roster is loaded and submitted with one student present
+    THEN the session is recorded and the class view shows the rate
+    """
+    login_user(UserFactory())
+    class_ = ClassFactory()
+    present, absent = StudentFactory.create_batch(2, class_=class_)
+    url = url_for("admin.class_attendance_get", class_id=class_.id)
+
+    response = client.get(url, query_string={"session_date": MONDAY.isoformat()})
+    assert response.status_code == 200
+    assert present.identity_document.encode() in response.data
+
+    response = client.post(
+        url_for("admin.class_attendance_post", class_id=class_.id),
+        data={"session_date": MONDAY.isoformat(), "present": [present.id]},
+        follow_redirects=True,
+    )
+
+    assert response.status_code == 200
+    assert response.request.path == url_for("admin.class_view", class_id=class_.id)
+    assert b"50%" in response.data
+    assert roster(class_.id, MONDAY) == {present.id: True, absent.id: False}
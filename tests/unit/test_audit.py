@@ -0,0 +1,144 @@
+"""This module contains tests for the audit trail."""
+
+from flask import url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import select
+
+from app import db
+from app.models import AuditAction, AuditEntry, Student
+from factories import ClassFactory, PaymentFactory, StudentFactory, UserFactory
+
+
+def entries(table_name: str, action: AuditAction) -> list[AuditEntry]:
+    """Return the audit entries of table_name with the given action."""
+    return (
+        db.session.execute(
+            select(AuditEntry)
+            .where(AuditEntry.table_name == table_name, AuditEntry.action == action)
+            .order_by(AuditEntry.row_id)
+        )
+        .scalars()
+        .all()
+    )
+
+
+def test_update_is_audited(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a student and a class
+    WHEN the student is enrolled in the class
+    THEN an entry records the old and new class of the student
+    """
+    student = StudentFactory()
+    class_ = ClassFactory()
+
+    student.class_ = class_
+    db.session.commit()
+
+    (entry,) = entries("student", AuditAction.UPDATE)
+    assert entry.row_id == student.id
+    assert entry.user_id is None
+    assert entry.changes == {"class_id": {"old": None, "new": class_.id}}
+
+
+def test_deleted_payment_is_audited_with_user(client: FlaskClient):
+    """
+    GIVEN a logged in user and a payment
+    WHEN the user deletes the payment
+    THEN an entry records the user and the values of the payment
+    """
+    user = UserFactory()
+    login_user(user)
+    payment = PaymentFactory()
+    payment_id, amount = payment.id, str(payment.amount)
+
+    client.post(url_for("admin.delete_payment", payment_id=payment_id))
+
+    (entry,) = entries("payment", AuditAction.DELETE)
+    assert entry.row_id == payment_id
+    assert entry.user_id == user.id
+    assert entry.changes["amount"] == {"old": amount, "new": None}
+
+
+def test_bulk_assign_is_audited(client: FlaskClient):
+    """
+    GIVEN two students enrolled in a class and another class
+    WHEN both students are moved to the other class in bulk
+    THEN an entry per student records its previous class
+    """
+    login_user(UserFactory())
+    old_class, new_class = ClassFactory(), ClassFactory()
+    students = StudentFactory.create_batch(2, class_=old_class)
+
+    client.post(
+        url_for("admin.bulk_assign_students"),
+        data={
+            "student_ids": [student.id for student in students],
+            "class_": new_class.id,
+        },
+    )
+
+    assert [
+        (entry.row_id, entry.changes)
+        for entry in entries("student", AuditAction.UPDATE)
+    ] == [
+        (student.id, {"class_id": {"old": old_class.id, "new": new_class.id}})
+        for student in sorted(students, key=lambda student: student.id)
+    ]
+
+
+def test_entries_are_written_in_one_insert(statements):
+    """
+    GIVEN three new students
+    WHEN they are committed
+    THEN their entries are written with a single INSERT
+    """
+    with statements() as executed:
+        db.session.add_all(StudentFactory.build_batch(3))
+        db.session.commit()
+
+    assert len(entries("student", AuditAction.INSERT)) == 3
+    assert (
+        len(
+            [
+                statement
+                for statement in executed
+                if "INSERT INTO audit_entry" in statement
+            ]
+        )
+        == 1
+    )
+
+
+def test_rolled_back_changes_are_not_audited(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a new student which is flushed
+    WHEN the session is rolled back
+    THEN no entry is written
+    """
+    student = StudentFactory.build()
+    db.session.add(student)
+    db.session.flush()
+
+    db.session.rollback()
+    db.session.commit()
+
+    assert db.session.execute(select(Student)).scalars().all() == []
+    assert entries("student", AuditAction.INSERT) == []
+
+
+def test_audit_table(client: FlaskClient):
+    """
+    GIVEN a logged in user and an audited student
+    WHEN requesting the audit trail filtered by table
+    THEN the response status code is 200
+    """
+    login_user(UserFactory())
+    StudentFactory()
+
+    response = client.get(
+        url_for("admin.audit_table"), query_string={"table_name": "student"}
+    )
+
+    assert response.status_code == 200
+    assert b"student" in response.data
@@ -0,0 +1,147 @@
+"""This module contains tests for the change feed of `api` blueprint."""
+
+import datetime
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from sqlalchemy import delete, insert, select
+
+from app import db
+from app.changes import changes, horizon
+from app.models import Cycle, Month, Representative, Tombstone
+from factories import RepresentativeFactory
+
+
+def test_change_feed_pages(api_client: FlaskClient, api_headers: dict[str, str]):
+    """
+    GIVEN three representatives
+    WHEN reading their change feed two changes at a time
+    THEN
+        - the first page has the first two representatives
+        - the second page, read with the returned cursor, has the last one
+        - the third page is empty and keeps the cursor
+    """
+    ids = [RepresentativeFactory().id for _ in range(3)]
+    url = url_for("api.change_feed", resource="representatives")
+
+    first = api_client.get(url, query_string={"limit": 2}, headers=api_headers).json
+    assert [change["id"] for change in first["changes"]] == ids[:2]
+    assert first["changes"][0]["data"]["id"] == ids[0]
+    assert first["has_more"]
+
+    second = api_client.get(
+        url, query_string={"limit": 2, "cursor": first["cursor"]}, headers=api_headers
+    ).json
+    assert [change["id"] for change in second["changes"]] == ids[2:]
+    assert not second["has_more"]
+
+    third = api_client.get(
+        url, query_string={"cursor": second["cursor"]}, headers=api_headers
+    ).json
+    assert third["changes"] == []
+    assert third["cursor"] == second["cursor"]
+
+
+def test_change_feed_reports_deletes(
+    api_client: FlaskClient, api_headers: dict[str, str]
+):
+    """
+    GIVEN two representatives, the first of them deleted with a bulk delete
+    WHEN reading their change feed
+    THEN the feed has a delete for the first one and an upsert for the second
+    """
+    first_id, second_id = RepresentativeFactory().id, RepresentativeFactory().id
+    db.session.execute(delete(Representative).where(Representative.id == first_id))
+
+    response = api_client.get(
+        url_for("api.change_feed", resource="representatives"), headers=api_headers
+    )
+
+    assert [
+        (change["operation"], change["id"]) for change in response.json["changes"]
+    ] == [("delete", first_id), ("upsert", second_id)]
+
+
+@pytest.mark.parametrize(
+    "resource, query_string, status_code",
+    [
+        ("teachers", {}, 404),
+        ("students", {"cursor": "not-a-cursor"}, 400),
+        ("students", {"limit": 0}, 400),
+    ],
+)
+def test_invalid_change_feed_request(
+    api_client: FlaskClient,
+    resource: str,
+    query_string: dict,
+    status_code: int,
+    api_headers: dict[str, str],
+):
+    """
+    GIVEN an unknown resource, an invalid cursor or an invalid limit
+    WHEN reading the change feed
+    THEN the request fails with the expected status code
+    """
+    response = api_client.get(
+        url_for("api.change_feed", resource=resource),
+        query_string=query_string,
+        headers=api_headers,
+    )
+
+    assert response.status_code == status_code
+
+
+def test_change_feed_waits_for_late_commits(
+    app: Flask,  # pylint: disable=unused-argument
+):
+    """
+    GIVEN a transaction creating a cycle, still running when a later
+        transaction creating another cycle commits
+    WHEN reading the change feed, then again from the returned cursor after
+        the first transaction commits
+    THEN the later cycle is held back until the first one is returned
+    """
+    engine = db.engine
+
+    def cycle(year: int) -> dict:
+        return {
+            "month": Month.JANUARY,
+            "year": year,
+            "start_date": datetime.date(year, 1, 1),
+            "end_date": datetime.date(year, 1, 31),
+        }
+
+    with engine.connect() as early, engine.connect() as late:
+        transaction = early.begin()
+        early.execute(insert(Cycle).values(cycle(2001)))
+        with late.begin():
+            late.execute(insert(Cycle).values(cycle(2002)))
+        try:
+            first, position = changes("cycles", None)
+            transaction.commit()
+            second, _ = changes("cycles", position)
+
+            assert first == []
+            assert [change["data"]["year"] for change in second] == [2001, 2002]
+        finally:
+            if transaction.is_active:
+                transaction.rollback()
+            with early.begin():
+                early.execute(delete(Cycle).where(Cycle.year.in_([2001, 2002])))
+                early.execute(delete(Tombstone).where(Tombstone.table_name == "cycle"))
+
+
+def test_horizon_ignores_read_only_transactions(
+    app: Flask,  # pylint: disable=unused-argument
+):
+    """
+    GIVEN a transaction which has only read, still running
+    WHEN reading the horizon of the change feed
+    THEN it is not held back by the transaction
+    """
+    with db.engine.connect() as reader:
+        with reader.begin():
+            reader.execute(select(Cycle.id)).all()
+
+            assert horizon() is None
@@ -0,0 +1,196 @@
+"""This module contains tests for the KPI dashboard of `admin` blueprint."""
+
+import datetime
+import threading
+import time
+from decimal import Decimal
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+
+from app.branches import current_branch_id
+from app.dashboard import SingleFlightCache, compute_dashboard, dashboard_cache
+from app.fan_out import FanOutError
+from app.models import Level, Month
+from factories import (
+    ClassFactory,
+    CycleFactory,
+    PaymentFactory,
+    StudentFactory,
+    UserFactory,
+)
+
+TODAY = datetime.date(2022, 11, 15)
+
+
+def current_cycle():
+    """Return a cycle which TODAY belongs to."""
+    return CycleFactory(
+        month=Month.NOVEMBER,
+        year=2022,
+        start_date=datetime.date(2022, 11, 1),
+        end_date=datetime.date(2022, 11, 30),
+    )
+
+
+def test_compute_dashboard(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    """
+    GIVEN a cycle in progress with three students in two classes, two of
+        them paid, and an older cycle with a student of its own
+    WHEN computing the dashboard
+    THEN only the cycle in progress is taken into account
+    """
+    monkeypatch.setattr(app.extensions["fan_out"], "workers", 0)
+    monkeypatch.setitem(app.config, "CLASS_CAPACITY", 4)
+    cycle = current_cycle()
+    l1_class = ClassFactory(cycle=cycle, level=Level.L1)
+    l2_class = ClassFactory(cycle=cycle, level=Level.L2)
+    students = StudentFactory.create_batch(2, class_=l1_class)
+    students.append(StudentFactory(class_=l2_class))
+    PaymentFactory(student=students[0], cycle=cycle, amount=100, discount=20)
+    PaymentFactory(student=students[1], cycle=cycle, amount=90, discount=None)
+    StudentFactory(class_=ClassFactory(cycle=CycleFactory(year=2021)))
+
+    dashboard = compute_dashboard(TODAY)
+
+    assert dashboard.cycle == str(cycle)
+    assert dashboard.active_students == 3
+    assert dashboard.students_per_level == {Level.L1: 2, Level.L2: 1, Level.L3: 0}
+    assert dashboard.revenue == Decimal("170.00")
+    assert dashboard.unpaid_students == 1
+    assert {(fill.class_id, fill.rate) for fill in dashboard.class_fill} == {
+        (l1_class.id, 0.5),
+        (l2_class.id, 0.25),
+    }
+
+
+def test_cache_computes_once_for_concurrent_callers():
+    """
+    GIVEN a cache with no value and a slow computation
+    WHEN ten threads get the value at the same time
+    THEN the value is computed once and every thread gets it
+    """
+    cache = SingleFlightCache()
+    calls = []
+
+    def compute():
+        calls.append(None)
+        time.sleep(0.1)
+        return "kpis"
+
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(cache.get("key", compute, 60)))
+        for _ in range(10)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert results == ["kpis"] * 10
+
+
+def test_cache_shares_failures_with_concurrent_callers():
+    """
+    GIVEN a cache with no value and a slow computation which fails
+    WHEN ten threads get the value at the same time
+    THEN the value is computed once and every thread gets its error
+    """
+    cache = SingleFlightCache()
+    calls = []
+
+    def compute():
+        calls.append(None)
+        time.sleep(0.1)
+        raise FanOutError("Queries revenue timed out after 10s.")
+
+    errors = []
+
+    def get():
+        try:
+            cache.get("key", compute, 60)
+        except FanOutError as exc:
+            errors.append(exc)
+
+    threads = [threading.Thread(target=get) for _ in range(10)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert len(errors) == 10
+
+
+def test_cache_recomputes_expired_values():
+    """
+    GIVEN a cached value which expired
+    WHEN getting the value
+    THEN it is computed again
+    """
+    cache = SingleFlightCache()
+    cache.get("key", lambda: 1, 0)
+
+    assert cache.get("key", lambda: 2, 60) == 2
+    assert cache.get("key", lambda: 3, 60) == 2
+
+
+def test_admin_index_shows_dashboard(
+    app: Flask, client: FlaskClient, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    GIVEN a logged in user and a class in a cycle in progress
+    WHEN requesting the admin index
+    THEN the class fill rate is shown
+    """
+    monkeypatch.setattr(app.extensions["fan_out"], "workers", 0)
+    dashboard_cache.clear()
+    login_user(UserFactory())
+    cycle = CycleFactory(
+        start_date=datetime.date.today(),
+        end_date=datetime.date.today() + datetime.timedelta(days=1),
+    )
+    StudentFactory(class_=ClassFactory(cycle=cycle))
+
+    response = client.get(url_for("admin.index"))
+    dashboard_cache.clear()
+
+    assert response.status_code == 200
+    assert "Class Fill Rates" in response.text
+    assert f"1/{app.config['CLASS_CAPACITY']}" in response.text
+
+
+@pytest.mark.parametrize("stale", [True, False], ids=["stale", "missing"])
+def test_admin_index_survives_dashboard_failure(
+    client: FlaskClient, monkeypatch: pytest.MonkeyPatch, stale: bool
+):
+    """
+    GIVEN a logged in user and KPIs which cannot be computed
+    WHEN requesting the admin index
+    THEN the page is shown, with the stale KPIs if there are any
+    """
+    login_user(UserFactory())
+    dashboard_cache.clear()
+    if stale:
+        with client.application.test_request_context():
+            dashboard_cache.get(
+                (datetime.date.today(), current_branch_id()),
+                lambda: compute_dashboard(TODAY),
+                0,
+            )
+
+    def fail(today):
+        raise FanOutError(f"Queries for {today} timed out after 10s.")
+
+    monkeypatch.setattr("app.dashboard.compute_dashboard", fail)
+
+    response = client.get(url_for("admin.index"))
+    dashboard_cache.clear()
+
+    assert response.status_code == 200
+    assert ("There is no cycle in progress." in response.text) == stale
+    assert ("The dashboard is not available" in response.text) != stale
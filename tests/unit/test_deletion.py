@@ -0,0 +1,162 @@
+"""This module contains tests for deleting rows with dependents."""
+
+import datetime
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import func, select
+
+from app import db
+from app.attendance import record_attendance
+from app.deletion import DeleteImpact, class_impact, cycle_impact
+from app.models import Attendance, AuditAction, AuditEntry, Class, Cycle, Student
+from factories import (
+    ClassFactory,
+    CycleFactory,
+    PaymentFactory,
+    RepresentativeFactory,
+    StudentFactory,
+    UserFactory,
+)
+
+MONDAY = datetime.date(2022, 11, 14)
+
+
+@pytest.fixture(name="cycle")
+def fixture_cycle(app: Flask):  # pylint: disable=unused-argument
+    """Return a cycle with two classes of three students with attendance."""
+    cycle = CycleFactory()
+    for class_ in ClassFactory.create_batch(2, cycle=cycle):
+        students = StudentFactory.create_batch(3, class_=class_)
+        record_attendance(class_.id, MONDAY, {students[0].id})
+    db.session.commit()
+    return cycle
+
+
+def test_cycle_impact(cycle):
+    """
+    GIVEN a cycle with two classes of three students with attendance
+    WHEN counting the impact of deleting it
+    THEN its classes and attendance are deleted and its students detached
+    """
+    impact = cycle_impact(cycle.id)
+
+    assert impact == DeleteImpact(
+        deleted={"classes": 2, "attendance records": 6, "payment reminders": 0},
+        detached={"students": 6},
+        blocking={"payments": 0},
+    )
+    assert not impact.blocked
+
+
+def test_delete_cycle_with_two_statements(client: FlaskClient, cycle, statements):
+    """
+    GIVEN a logged in user and a cycle with classes, students and attendance
+    WHEN deleting the cycle
+    THEN
+        - a single UPDATE detaches its students, recording it in the audit
+          trail
+        - a single DELETE removes it, its classes and their attendance
+    """
+    login_user(UserFactory())
+
+    with statements() as executed:
+        response = client.post(url_for("admin.delete_cycle", cycle_id=cycle.id))
+
+    assert response.status_code == 302
+    changed = [s for s in executed if s.startswith(("DELETE", "UPDATE"))]
+    assert len(changed) == 2
+    assert changed[0].startswith("UPDATE student SET updated_at=")
+    assert changed[1] == "DELETE FROM cycle WHERE cycle.id = %(id)s"
+    assert [
+        changes["class_id"]["new"]
+        for changes in db.session.execute(
+            select(AuditEntry.changes).where(
+                AuditEntry.table_name == "student",
+                AuditEntry.action == AuditAction.UPDATE,
+            )
+        ).scalars()
+    ] == [None] * 6
+    assert db.session.execute(select(func.count(Class.id))).scalar_one() == 0
+    assert (
+        db.session.execute(select(func.count()).select_from(Attendance)).scalar() == 0
+    )
+    assert (
+        db.session.execute(
+            select(func.count(Student.id)).where(Student.class_id.isnot(None))
+        ).scalar_one()
+        == 0
+    )
+
+
+def test_delete_cycle_with_payments(client: FlaskClient, cycle):
+    """
+    GIVEN a logged in user and a cycle with a payment
+    WHEN confirming, then requesting the deletion of the cycle
+    THEN it is shown as blocked and is not deleted
+    """
+    login_user(UserFactory())
+    PaymentFactory(cycle=cycle)
+    db.session.commit()
+    assert cycle_impact(cycle.id).blocked
+
+    confirmation = client.get(url_for("admin.delete_cycle_get", cycle_id=cycle.id))
+    response = client.post(url_for("admin.delete_cycle", cycle_id=cycle.id))
+
+    assert "cannot be deleted, it still has\n    1 payments" in confirmation.text
+    assert response.status_code == 302
+    assert db.session.get(Cycle, cycle.id) is not None
+
+
+def test_delete_class(client: FlaskClient, cycle):
+    """
+    GIVEN a logged in user and a class with three students with attendance
+    WHEN confirming, then deleting the class
+    THEN the impact is shown, the attendance is deleted and the students
+        are detached
+    """
+    login_user(UserFactory())
+    class_ = cycle.classes[0]
+    student_ids = [student.id for student in class_.students]
+    assert class_impact(class_.id) == DeleteImpact(
+        deleted={"attendance records": 3}, detached={"students": 3}
+    )
+
+    confirmation = client.get(url_for("admin.delete_class_get", class_id=class_.id))
+    response = client.post(url_for("admin.delete_class", class_id=class_.id))
+
+    assert "3 students will be detached" in confirmation.text
+    assert response.status_code == 302
+    assert db.session.execute(
+        select(Student.class_id).where(Student.id.in_(student_ids))
+    ).scalars().all() == [None, None, None]
+
+
+def test_delete_representative(client: FlaskClient):
+    """
+    GIVEN a logged in user and a representative of two students
+    WHEN confirming, then deleting the representative
+    THEN the students are detached
+    """
+    login_user(UserFactory())
+    representative = RepresentativeFactory()
+    students = StudentFactory.create_batch(2, representative=representative)
+    db.session.commit()
+    db.session.expire_all()
+
+    confirmation = client.get(
+        url_for("admin.delete_representative_get", representative_id=representative.id)
+    )
+    response = client.post(
+        url_for("admin.delete_representative", representative_id=representative.id)
+    )
+
+    assert "2 students will be detached" in confirmation.text
+    assert response.status_code == 302
+    assert db.session.execute(
+        select(Student.representative_id).where(
+            Student.id.in_([student.id for student in students])
+        )
+    ).scalars().all() == [None, None]
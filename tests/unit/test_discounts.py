@@ -0,0 +1,154 @@
+"""This module contains tests for sibling discounts."""
+
+from decimal import Decimal
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import select
+
+from app import db
+from app.discounts import apply_sibling_discounts, sibling_discount, sibling_discounts
+from app.models import AuditAction, AuditEntry, Payment
+from factories import (
+    ClassFactory,
+    CycleFactory,
+    PaymentFactory,
+    RepresentativeFactory,
+    StudentFactory,
+    UserFactory,
+)
+
+TIERS = {2: Decimal("5.00"), 3: Decimal("10.00")}
+
+
+@pytest.fixture(name="family")
+def fixture_family(app: Flask):  # pylint: disable=unused-argument
+    """
+    Return a cycle, three siblings and two siblings enrolled in it, and an
+    only child.
+    """
+    cycle = CycleFactory()
+    class_ = ClassFactory(cycle=cycle)
+    big, small = RepresentativeFactory.create_batch(2)
+    big_family = StudentFactory.create_batch(3, class_=class_, representative=big)
+    small_family = StudentFactory.create_batch(2, class_=class_, representative=small)
+    StudentFactory(class_=ClassFactory(), representative=small)
+    only_child = StudentFactory(class_=class_, representative=RepresentativeFactory())
+    db.session.commit()
+    return cycle, big_family, small_family, only_child
+
+
+def test_sibling_discounts(family):
+    """
+    GIVEN three siblings, two siblings and an only child enrolled in a cycle
+    WHEN computing the sibling discounts of the cycle
+    THEN each sibling gets the discount of the tier of their family
+    """
+    cycle, big_family, small_family, only_child = family
+
+    discounts = sibling_discounts(cycle.id, TIERS)
+
+    assert discounts == {
+        **{student.id: Decimal("10.00") for student in big_family},
+        **{student.id: Decimal("5.00") for student in small_family},
+    }
+    assert sibling_discount(small_family[0].id, cycle.id, TIERS) == Decimal("5.00")
+    assert sibling_discount(only_child.id, cycle.id, TIERS) == Decimal(0)
+    assert not sibling_discounts(cycle.id, {})
+
+
+def test_apply_sibling_discounts(family):
+    """
+    GIVEN payments of a cycle by siblings, one with a manual discount and
+        one smaller than its discount, and by an only child
+    WHEN applying the sibling discounts of the cycle
+    THEN payments without a discount get theirs, capped at their amount,
+        and each change is audited
+    """
+    cycle, big_family, small_family, only_child = family
+    full = PaymentFactory(student=big_family[0], cycle=cycle, amount=100, discount=0)
+    manual = PaymentFactory(student=big_family[1], cycle=cycle, amount=100, discount=30)
+    small = PaymentFactory(student=small_family[0], cycle=cycle, amount=3, discount=0)
+    single = PaymentFactory(student=only_child, cycle=cycle, amount=100, discount=0)
+    db.session.commit()
+
+    assert apply_sibling_discounts(cycle.id, TIERS) == 2
+
+    discounts = dict(db.session.execute(select(Payment.id, Payment.discount)).all())
+    assert discounts[full.id] == Decimal("10.00")
+    assert discounts[manual.id] == Decimal("30.00")
+    assert discounts[small.id] == Decimal("3.00")
+    assert discounts[single.id] == Decimal("0.00")
+    audited = db.session.execute(
+        select(AuditEntry.row_id, AuditEntry.changes).where(
+            AuditEntry.table_name == "payment",
+            AuditEntry.action == AuditAction.UPDATE,
+        )
+    ).all()
+    assert dict(audited) == {
+        full.id: {"discount": {"old": "0.00", "new": "10.00"}},
+        small.id: {"discount": {"old": "0.00", "new": "3.00"}},
+    }
+
+
+def test_apply_sibling_discounts_once_per_student(family):
+    """
+    GIVEN two payments of a cycle by the same sibling, without a discount
+    WHEN applying the sibling discounts of the cycle twice
+    THEN only the earliest payment gets the discount
+    """
+    cycle, big_family, *_ = family
+    first, second = PaymentFactory.create_batch(
+        2, student=big_family[0], cycle=cycle, amount=100, discount=None
+    )
+    db.session.commit()
+
+    assert apply_sibling_discounts(cycle.id, TIERS) == 1
+    assert apply_sibling_discounts(cycle.id, TIERS) == 0
+
+    discounts = dict(db.session.execute(select(Payment.id, Payment.discount)).all())
+    assert discounts[first.id] == Decimal("10.00")
+    assert discounts[second.id] is None
+
+
+def test_create_payment_prefills_discount(
+    client: FlaskClient, family, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    GIVEN a logged in user and a sibling enrolled in a cycle
+    WHEN requesting the payment form for the sibling and the cycle
+    THEN the discount is pre-filled with their sibling discount
+    """
+    monkeypatch.setitem(client.application.config, "SIBLING_DISCOUNTS", TIERS)
+    login_user(UserFactory())
+    cycle, big_family, *_ = family
+
+    response = client.get(
+        url_for("admin.create_payment_get", student=big_family[0].id, cycle=cycle.id)
+    )
+
+    assert response.status_code == 200
+    assert 'value="10.00"' in response.text
+
+
+def test_apply_discounts_post(
+    client: FlaskClient, family, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    GIVEN a logged in user and a payment of a sibling without a discount
+    WHEN posting the discount form of the cycle
+    THEN the sibling discount is applied to the payment
+    """
+    monkeypatch.setitem(client.application.config, "SIBLING_DISCOUNTS", TIERS)
+    login_user(UserFactory())
+    cycle, _, small_family, _ = family
+    payment = PaymentFactory(student=small_family[0], cycle=cycle, discount=None)
+    db.session.commit()
+
+    response = client.post(url_for("admin.apply_discounts_post", cycle_id=cycle.id))
+
+    assert response.status_code == 302
+    db.session.refresh(payment)
+    assert payment.discount == Decimal("5.00")
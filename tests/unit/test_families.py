@@ -0,0 +1,92 @@
+"""This module contains tests for the family page of representatives."""
+
+from decimal import Decimal
+
+from flask import url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+
+from app import db
+from app.families import paid_amounts, recent_cycles
+from app.models import Month
+from factories import (
+    ClassFactory,
+    CycleFactory,
+    PaymentFactory,
+    RepresentativeFactory,
+    StudentFactory,
+    UserFactory,
+)
+
+
+def test_paid_amounts(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a student with two payments of a cycle and none of another
+    WHEN summing what they paid per cycle
+    THEN the payments of the first cycle are added up net of discounts
+    """
+    paid, unpaid = CycleFactory.create_batch(2)
+    student = StudentFactory()
+    PaymentFactory(student=student, cycle=paid, amount=100, discount=20)
+    PaymentFactory(student=student, cycle=paid, amount=30, discount=None)
+
+    assert paid_amounts([student.id], [paid.id, unpaid.id]) == {
+        (student.id, paid.id): Decimal("110.00")
+    }
+    assert paid_amounts([], [paid.id]) == {}
+
+
+def test_recent_cycles(app):  # pylint: disable=unused-argument
+    """
+    GIVEN three cycles
+    WHEN getting the last two
+    THEN they are returned the latest first
+    """
+    first, second, third = (
+        CycleFactory(month=month, year=2022)
+        for month in (Month.SEPTEMBER, Month.OCTOBER, Month.NOVEMBER)
+    )
+    assert first.start_date < second.start_date < third.start_date
+
+    assert recent_cycles(2) == [third, second]
+
+
+def test_representative_view(client: FlaskClient, statements):
+    """
+    GIVEN a logged in user and a representative of two students in classes
+        of different cycles, one of whom paid the current cycle
+    WHEN requesting the page of the representative, then adding students
+    THEN the students, their classes and payments are shown, and the page
+        runs the same number of queries for a larger family
+    """
+    login_user(UserFactory())
+    representative = RepresentativeFactory()
+    cycle = CycleFactory(month=Month.NOVEMBER, year=2022)
+    first = StudentFactory(
+        representative=representative, class_=ClassFactory(cycle=cycle)
+    )
+    StudentFactory(representative=representative, class_=ClassFactory())
+    PaymentFactory(student=first, cycle=cycle, amount=100, discount=0)
+    db.session.commit()
+    url = url_for("admin.representative_view", representative_id=representative.id)
+
+    response = client.get(url)
+
+    assert response.status_code == 200
+    assert first.identity_document in response.text
+    assert "November 2022" in response.text
+    assert "$100.00" in response.text
+    assert "Unpaid" in response.text
+
+    db.session.commit()
+    with statements() as small_family:
+        client.get(url)
+    for _ in range(4):
+        StudentFactory(representative=representative, class_=ClassFactory())
+    db.session.commit()
+    with statements() as large_family:
+        client.get(url)
+
+    assert len([s for s in large_family if s.startswith("SELECT")]) == len(
+        [s for s in small_family if s.startswith("SELECT")]
+    )
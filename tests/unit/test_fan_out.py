@@ -0,0 +1,100 @@
+"""This module contains tests for running read-only queries concurrently."""
+
+import time
+
+import pytest
+from flask import Flask
+from sqlalchemy import func, select, text
+
+from app import db
+from app.fan_out import FanOutError, run_concurrently
+from app.models import Student
+from factories import StudentFactory
+
+
+def sleep(seconds: float, value: int):
+    """Return a query sleeping for seconds before returning value."""
+    return lambda connection: connection.execute(
+        text("SELECT :value FROM pg_sleep(:seconds)"),
+        {"seconds": seconds, "value": value},
+    ).scalar_one()
+
+
+def test_queries_run_concurrently(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    """
+    GIVEN a fan-out pool of four workers
+    WHEN running three queries sleeping 0.3 seconds each
+    THEN every result is returned in less time than their sum
+    """
+    monkeypatch.setattr(app.extensions["fan_out"], "workers", 4)
+    start = time.monotonic()
+
+    results = run_concurrently(
+        {f"query_{index}": sleep(0.3, index) for index in range(3)}
+    )
+
+    assert results == {"query_0": 0, "query_1": 1, "query_2": 2}
+    assert time.monotonic() - start < 0.8
+
+
+def test_queries_are_read_only(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    """
+    GIVEN a fan-out pool of four workers
+    WHEN running a query which writes
+    THEN it fails
+    """
+    monkeypatch.setattr(app.extensions["fan_out"], "workers", 4)
+
+    with pytest.raises(FanOutError, match="Query write failed"):
+        run_concurrently(
+            {
+                "read": sleep(0, 1),
+                "write": lambda connection: connection.exec_driver_sql(
+                    "CREATE TEMPORARY TABLE fan_out (id integer)"
+                ),
+            }
+        )
+
+
+def test_slow_queries_are_cancelled(app: Flask, monkeypatch: pytest.MonkeyPatch):
+    """
+    GIVEN a fan-out pool of four workers
+    WHEN running a query sleeping for longer than the timeout
+    THEN it is cancelled once the timeout expires
+    """
+    monkeypatch.setattr(app.extensions["fan_out"], "workers", 4)
+    start = time.monotonic()
+
+    with pytest.raises(FanOutError, match="slow"):
+        run_concurrently({"fast": sleep(0, 1), "slow": sleep(5, 2)}, timeout=0.2)
+
+    assert time.monotonic() - start < 2
+
+
+def test_queries_run_serially_on_the_session(
+    app: Flask, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    GIVEN a fan-out pool without workers and a student not committed yet
+    WHEN running queries
+    THEN they run on the connection of the session, which sees the student,
+        and its statement timeout is restored
+    """
+    monkeypatch.setattr(app.extensions["fan_out"], "workers", 0)
+    StudentFactory()
+    previous = db.session.execute(text("SHOW statement_timeout")).scalar_one()
+
+    results = run_concurrently(
+        {
+            "students": lambda connection: connection.execute(
+                select(func.count(Student.id))
+            ).scalar_one(),
+            "timeout": lambda connection: connection.exec_driver_sql(
+                "SHOW statement_timeout"
+            ).scalar_one(),
+        },
+        timeout=2,
+    )
+
+    assert results == {"students": 1, "timeout": "2s"}
+    assert db.session.execute(text("SHOW statement_timeout")).scalar_one() == previous
@@ -0,0 +1,123 @@
+"""This module contains tests for the on-demand request profiler."""
+
+import datetime
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+
+from app.dashboard import dashboard_cache
+from app.models import Month
+from app.profiler import list_profiles, load_profile, profile_folder
+from factories import CycleFactory, StudentFactory, UserFactory
+
+
+@pytest.fixture(name="folder")
+def fixture_folder(app: Flask, tmp_path, monkeypatch):
+    """Store the profiles of the test in a temporary folder."""
+    monkeypatch.setitem(app.config, "PROFILER_FOLDER", str(tmp_path))
+    return profile_folder(app)
+
+
+@pytest.mark.parametrize(
+    "kwargs",
+    [
+        pytest.param({"headers": {"X-Profile": "1"}}, id="header"),
+        pytest.param({"query_string": {"_profile": ""}}, id="query-argument"),
+    ],
+)
+def test_profile_request(client: FlaskClient, folder, kwargs):
+    """
+    GIVEN a logged in user
+    WHEN a request asks to be profiled
+    THEN its profile, SQL timeline included, is stored and can be viewed
+    """
+    login_user(UserFactory())
+    StudentFactory()
+
+    response = client.get(url_for("admin.student_table"), **kwargs)
+
+    profile_id = response.headers["X-Profile-Id"]
+    profile = load_profile(folder, profile_id)
+    assert profile["path"].startswith("/admin/student")
+    assert profile["status_code"] == 200
+    assert any("FROM student" in query["statement"] for query in profile["queries"])
+    assert "cumulative" in profile["stats"]
+    assert (folder / f"{profile_id}.prof").is_file()
+
+    response = client.get(url_for("admin.profile_view", profile_id=profile_id))
+    assert response.status_code == 200
+    assert b"SQL Timeline" in response.data
+
+
+def test_profile_records_fan_out_queries(
+    app: Flask, client: FlaskClient, folder, monkeypatch
+):
+    """
+    GIVEN a logged in user, a cycle in progress and a fan-out pool of four
+        workers
+    WHEN the dashboard is profiled
+    THEN the statements run by the fan-out threads are recorded
+    """
+    monkeypatch.setattr(app.extensions["fan_out"], "workers", 4)
+    dashboard_cache.clear()
+    today = datetime.date.today()
+    CycleFactory(
+        month=list(Month)[today.month - 1],
+        year=today.year,
+        start_date=today,
+        end_date=today,
+    )
+    login_user(UserFactory())
+
+    response = client.get(url_for("admin.index"), headers={"X-Profile": "1"})
+    dashboard_cache.clear()
+
+    profile = load_profile(folder, response.headers["X-Profile-Id"])
+    assert any("FROM payment" in query["statement"] for query in profile["queries"])
+
+
+def test_request_not_profiled(client: FlaskClient, folder):
+    """
+    GIVEN a logged in user and an anonymous client
+    WHEN the user does not ask for a profile and the anonymous client does
+    THEN no profile is stored
+    """
+    client.get(url_for("main.index"), headers={"X-Profile": "1"})
+    login_user(UserFactory())
+    response = client.get(url_for("admin.student_table"))
+
+    assert "X-Profile-Id" not in response.headers
+    assert not list_profiles(folder)
+
+
+def test_profiles_are_pruned(client: FlaskClient, folder, monkeypatch):
+    """
+    GIVEN a limit of two profiles
+    WHEN three requests are profiled
+    THEN only the two newest profiles are kept
+    """
+    monkeypatch.setitem(client.application.config, "PROFILER_MAX_PROFILES", 2)
+    login_user(UserFactory())
+
+    for _ in range(3):
+        client.get(url_for("admin.index"), headers={"X-Profile": "1"})
+
+    assert len(list_profiles(folder)) == 2
+    assert len(list(folder.glob("*.prof"))) == 2
+
+
+def test_unknown_profile(
+    client: FlaskClient, folder
+):  # pylint: disable=unused-argument
+    """
+    GIVEN a logged in user
+    WHEN a profile that does not exist or an invalid id is requested
+    THEN 404 is returned
+    """
+    login_user(UserFactory())
+
+    for profile_id in ["20220101T000000-00000000", "..%2F..%2Fsecret"]:
+        response = client.get(f"/admin/profile/{profile_id}")
+        assert response.status_code == 404
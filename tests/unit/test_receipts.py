@@ -0,0 +1,172 @@
+"""This module contains tests for payment receipts."""
+
+import datetime
+import io
+import zipfile
+from decimal import Decimal
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import update
+
+from app import db
+from app.models import Month, Payment, Representative
+from app.receipts import (
+    ReceiptData,
+    build_receipts,
+    get_receipt,
+    receipt_data,
+    render_receipt,
+)
+from factories import (
+    CycleFactory,
+    PaymentFactory,
+    RepresentativeFactory,
+    StudentFactory,
+    UserFactory,
+)
+
+
+def receipt(payment_id: int, version: datetime.datetime) -> ReceiptData:
+    """Return the receipt of a payment of $100 with a discount of $20."""
+    return ReceiptData(
+        payment_id=payment_id,
+        version=version,
+        paid_at=version,
+        amount=Decimal("100.00"),
+        discount=Decimal("20.00"),
+        description="Tuition",
+        student="Ana Lucía Pérez",
+        identity_document="0102030405",
+        representative=None,
+        cycle="November 2022",
+    )
+
+
+@pytest.fixture(name="folder")
+def fixture_folder(app: Flask, tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """Cache the receipts of the test in a temporary folder."""
+    monkeypatch.setitem(app.config, "RECEIPT_FOLDER", str(tmp_path))
+    return tmp_path
+
+
+def test_receipt_data(app: Flask):  # pylint: disable=unused-argument
+    """
+    GIVEN a payment of a student with a representative
+    WHEN loading its receipt
+    THEN it shows the student, the representative, the cycle and the total
+    """
+    representative = RepresentativeFactory(first_name="Rosa", first_surname="Mora")
+    student = StudentFactory(representative=representative)
+    cycle = CycleFactory(month=Month.NOVEMBER, year=2022)
+    payment = PaymentFactory(student=student, cycle=cycle, amount=100, discount=20)
+
+    (data,) = receipt_data(Payment.id == payment.id)
+
+    assert data.payment_id == payment.id
+    assert data.identity_document == student.identity_document
+    assert data.representative == "Rosa Mora"
+    assert data.cycle == "November 2022"
+    assert data.total == Decimal("80.00")
+    assert render_receipt(data).startswith(b"%PDF")
+
+
+def test_receipt_version_follows_representative(
+    app: Flask,  # pylint: disable=unused-argument
+):
+    """
+    GIVEN a payment of a student with a representative
+    WHEN the representative is updated after the payment
+    THEN the version of the receipt is the update of the representative
+    """
+    representative = RepresentativeFactory()
+    payment = PaymentFactory(student=StudentFactory(representative=representative))
+    updated_at = datetime.datetime(2100, 1, 1)
+    db.session.execute(
+        update(Representative)
+        .where(Representative.id == representative.id)
+        .values(first_name="Rosa", updated_at=updated_at)
+    )
+
+    (data,) = receipt_data(Payment.id == payment.id)
+
+    assert data.version == updated_at
+
+
+def test_receipt_is_cached_per_version(tmp_path, monkeypatch: pytest.MonkeyPatch):
+    """
+    GIVEN a cached receipt
+    WHEN getting it again, then getting a newer version of it
+    THEN it is only rendered again for the newer version, which replaces it
+    """
+    version = datetime.datetime(2022, 11, 15, 10)
+    path = get_receipt(tmp_path, receipt(1, version))
+    monkeypatch.setattr("app.receipts.render_receipt", lambda data: b"%PDF-new")
+
+    assert get_receipt(tmp_path, receipt(1, version)) == path
+    assert path.read_bytes() != b"%PDF-new"
+
+    new_path = get_receipt(tmp_path, receipt(1, version + datetime.timedelta(1)))
+
+    assert new_path.read_bytes() == b"%PDF-new"
+    assert list(tmp_path.iterdir()) == [new_path]
+
+
+def test_build_receipts_in_processes(tmp_path):
+    """
+    GIVEN more receipts than are rendered per task
+    WHEN building them with two processes
+    THEN every receipt is rendered
+    """
+    version = datetime.datetime(2022, 11, 15, 10)
+    receipts = [receipt(payment_id, version) for payment_id in range(1, 41)]
+
+    paths = build_receipts(tmp_path, receipts, processes=2)
+
+    assert [path.name for path in paths] == [data.filename for data in receipts]
+    assert all(path.read_bytes().startswith(b"%PDF") for path in paths)
+
+
+def test_payment_receipt(client: FlaskClient, folder):
+    """
+    GIVEN a logged in user and a payment
+    WHEN requesting its receipt
+    THEN a PDF is returned and cached
+    """
+    login_user(UserFactory())
+    payment = PaymentFactory()
+
+    response = client.get(url_for("admin.payment_receipt", payment_id=payment.id))
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/pdf"
+    assert response.data.startswith(b"%PDF")
+    assert [path.name for path in folder.iterdir()] == [
+        receipt_data(Payment.id == payment.id)[0].filename
+    ]
+
+
+def test_cycle_receipts(client: FlaskClient, folder):  # pylint: disable=unused-argument
+    """
+    GIVEN a logged in user and a cycle with two payments
+    WHEN requesting the receipts of the cycle
+    THEN a zip archive with a receipt per payment is streamed
+    """
+    login_user(UserFactory())
+    cycle = CycleFactory(month=Month.NOVEMBER, year=2022)
+    payments = PaymentFactory.create_batch(2, cycle=cycle)
+    PaymentFactory()
+    db.session.commit()
+
+    response = client.get(url_for("admin.cycle_receipts", cycle_id=cycle.id))
+
+    assert response.status_code == 200
+    assert response.is_streamed
+    assert "receipts-november-2022.zip" in response.headers["Content-Disposition"]
+    with zipfile.ZipFile(io.BytesIO(response.data)) as archive:
+        assert archive.namelist() == [
+            f"receipt-{payment.id}.pdf" for payment in payments
+        ]
+        assert archive.read(archive.namelist()[0]).startswith(b"%PDF")
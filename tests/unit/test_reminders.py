@@ -0,0 +1,329 @@
+"""This module contains tests for payment reminders."""
+
+import datetime
+import socketserver
+import threading
+import time
+from email.message import EmailMessage
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import select
+
+from app import db
+from app.models import Month, Reminder, ReminderStatus
+from app.reminders import Mailer, queue_reminders, send_reminders, unpaid_recipients
+from factories import (
+    ClassFactory,
+    CycleFactory,
+    PaymentFactory,
+    RepresentativeFactory,
+    StudentFactory,
+    UserFactory,
+)
+
+
+class SMTPHandler(socketserver.StreamRequestHandler):
+    """This class handles a connection to the SMTP stand-in."""
+
+    server: "SMTPServer"
+
+    def reply(self, line: str) -> None:
+        """Send line to the client."""
+        self.wfile.write(f"{line}\r\n".encode())
+
+    def handle(self) -> None:
+        self.server.connections += 1
+        self.reply("220 localhost SMTP stand-in")
+        recipients: list[str] = []
+        while line := self.rfile.readline().decode().rstrip("\r\n"):
+            command = line[:4].upper()
+            if command in ("HELO", "EHLO"):
+                self.reply("250 localhost")
+            elif command == "MAIL":
+                recipients = []
+                self.reply("250 OK")
+            elif command == "RCPT":
+                address = line.split(":", 1)[1].strip(" <>")
+                code = self.server.rejections.get(address)
+                if code is None:
+                    recipients.append(address)
+                    self.reply("250 OK")
+                else:
+                    self.reply(f"{code} Rejected")
+            elif command == "DATA":
+                self.reply("354 End data with <CR><LF>.<CR><LF>")
+                data = []
+                while (data_line := self.rfile.readline().decode()) != ".\r\n":
+                    data.append(data_line)
+                self.server.messages.append((recipients, "".join(data)))
+                self.reply("250 OK")
+            elif command == "QUIT":
+                self.reply("221 Bye")
+                return
+            else:
+                self.reply("250 OK")
+
+
+class SMTPServer(socketserver.ThreadingTCPServer):
+    """This class represents a local SMTP server recording what it gets."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self) -> None:
+        super().__init__(("127.0.0.1", 0), SMTPHandler)
+        self.connections = 0
+        self.messages: list[tuple[list[str], str]] = []
+        self.rejections: dict[str, int] = {}
+
+
+@pytest.fixture(name="smtp_server")
+def fixture_smtp_server():
+    """Run an SMTP stand-in for the test."""
+    server = SMTPServer()
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture(name="mailer")
+def fixture_mailer(smtp_server: SMTPServer):
+    """Return a mailer connected to the SMTP stand-in."""
+    with Mailer(
+        "127.0.0.1", smtp_server.server_address[1], "school@example.com"
+    ) as mailer:
+        yield mailer
+
+
+@pytest.fixture(name="cycle")
+def fixture_cycle(app: Flask):  # pylint: disable=unused-argument
+    """
+    Return a cycle with two siblings who did not pay, a student who did and
+    a student without a representative email who did not.
+    """
+    cycle = CycleFactory(month=Month.NOVEMBER, year=2022)
+    class_ = ClassFactory(cycle=cycle)
+    representative = RepresentativeFactory(
+        first_name="Rosa", first_surname="Mora", email="rosa@example.com"
+    )
+    for first_name in ("Ana", "Luis"):
+        StudentFactory(
+            class_=class_,
+            first_name=first_name,
+            first_surname="Mora",
+            representative=representative,
+        )
+    paid = StudentFactory(class_=class_)
+    PaymentFactory(student=paid, cycle=cycle)
+    StudentFactory(
+        class_=class_,
+        first_name="Eva",
+        first_surname="Paz",
+        email="eva@example.com",
+        representative=RepresentativeFactory(email=None),
+    )
+    db.session.commit()
+    return cycle
+
+
+def test_unpaid_recipients(cycle):
+    """
+    GIVEN a cycle with two siblings who did not pay, a student who did and
+        a student without a representative email who did not
+    WHEN looking up who to remind
+    THEN the siblings' representative is reminded once and the other
+        student at their own email
+    """
+    recipients = unpaid_recipients(cycle.id)
+
+    assert [(r.email, r.name, r.students) for r in recipients] == [
+        ("eva@example.com", "Eva Paz", ["Eva Paz"]),
+        ("rosa@example.com", "Rosa Mora", ["Ana Mora", "Luis Mora"]),
+    ]
+
+
+def test_queue_reminders_once(cycle):
+    """
+    GIVEN a cycle with two recipients to remind
+    WHEN queueing its reminders twice
+    THEN a rendered reminder is queued per recipient, only the first time
+    """
+    assert queue_reminders(cycle) == 2
+    assert queue_reminders(cycle) == 0
+
+    reminder = db.session.execute(
+        select(Reminder).where(Reminder.recipient == "rosa@example.com")
+    ).scalar_one()
+    assert reminder.status == ReminderStatus.PENDING
+    assert reminder.subject == "Payment reminder: November 2022"
+    assert "Dear Rosa Mora," in reminder.body
+    assert "- Ana Mora\n- Luis Mora\n" in reminder.body
+
+
+def test_send_reminders_over_one_connection(cycle, mailer, smtp_server):
+    """
+    GIVEN queued reminders
+    WHEN sending them in batches of one
+    THEN they are sent over a single connection and marked as sent
+    """
+    queue_reminders(cycle)
+
+    counts = send_reminders(mailer, batch_size=1, max_attempts=3)
+
+    assert counts[ReminderStatus.SENT] == 2
+    assert smtp_server.connections == 1
+    assert sorted(recipients for recipients, _ in smtp_server.messages) == [
+        ["eva@example.com"],
+        ["rosa@example.com"],
+    ]
+    assert all(
+        reminder.status == ReminderStatus.SENT and reminder.sent_at
+        for reminder in db.session.execute(select(Reminder)).scalars()
+    )
+
+
+def test_send_reminders_retries_transient_failures(cycle, mailer, smtp_server):
+    """
+    GIVEN queued reminders, one rejected temporarily and one for good
+    WHEN sending them
+    THEN the first is retried later and the second fails
+    """
+    queue_reminders(cycle)
+    smtp_server.rejections = {"rosa@example.com": 451, "eva@example.com": 550}
+
+    counts = send_reminders(mailer, batch_size=10, max_attempts=3)
+
+    assert counts == {
+        ReminderStatus.PENDING: 1,
+        ReminderStatus.SENT: 0,
+        ReminderStatus.FAILED: 1,
+    }
+    reminders = {
+        reminder.recipient: reminder
+        for reminder in db.session.execute(select(Reminder)).scalars()
+    }
+    retried = reminders["rosa@example.com"]
+    assert retried.status == ReminderStatus.PENDING
+    assert retried.attempts == 1
+    assert retried.next_attempt_at > datetime.datetime.utcnow()
+    assert reminders["eva@example.com"].status == ReminderStatus.FAILED
+
+
+def test_send_reminders_stops_when_the_server_is_down(cycle):
+    """
+    GIVEN queued reminders and no SMTP server
+    WHEN sending them
+    THEN the run stops after the first one, which is retried later
+    """
+    queue_reminders(cycle)
+    mailer = Mailer("127.0.0.1", 1, "school@example.com", timeout=1)
+
+    counts = send_reminders(mailer, batch_size=10, max_attempts=3)
+
+    assert counts[ReminderStatus.PENDING] == 1
+    assert sorted(db.session.execute(select(Reminder.attempts)).scalars().all()) == [
+        0,
+        1,
+    ]
+
+
+class FlakyMailer:  # pylint: disable=too-few-public-methods
+    """This class represents a mailer raising exc for the messages to address."""
+
+    sender = "school@example.com"
+
+    def __init__(self, address: str, exc: Exception) -> None:
+        self.address = address
+        self.exc = exc
+        self.sent: list[str] = []
+
+    def send(self, message: EmailMessage) -> None:
+        """Record message, or raise exc if it is sent to address."""
+        if message["To"] == self.address:
+            raise self.exc
+        self.sent.append(message["To"])
+
+
+def test_send_reminders_retries_network_errors(cycle):
+    """
+    GIVEN queued reminders, one of which times out
+    WHEN sending them
+    THEN it is retried later and the other one is sent
+    """
+    queue_reminders(cycle)
+    mailer = FlakyMailer("eva@example.com", TimeoutError("timed out"))
+
+    counts = send_reminders(mailer, batch_size=10, max_attempts=3)
+
+    assert counts[ReminderStatus.SENT] == 1
+    assert counts[ReminderStatus.PENDING] == 1
+    statuses = dict(
+        db.session.execute(select(Reminder.recipient, Reminder.status)).all()
+    )
+    assert statuses == {
+        "eva@example.com": ReminderStatus.PENDING,
+        "rosa@example.com": ReminderStatus.SENT,
+    }
+
+
+def test_sent_reminders_are_committed_one_by_one(cycle):
+    """
+    GIVEN queued reminders
+    WHEN the run crashes after sending the first one
+    THEN the first one stays sent and the second one is not sent again
+        until its claim expires
+    """
+    queue_reminders(cycle)
+    mailer = FlakyMailer("rosa@example.com", RuntimeError("crash"))
+
+    with pytest.raises(RuntimeError):
+        send_reminders(mailer, batch_size=10, max_attempts=3)
+    db.session.rollback()
+
+    assert mailer.sent == ["eva@example.com"]
+    statuses = dict(
+        db.session.execute(select(Reminder.recipient, Reminder.status)).all()
+    )
+    assert statuses["eva@example.com"] == ReminderStatus.SENT
+    assert send_reminders(mailer, batch_size=10, max_attempts=3) == {
+        status: 0 for status in ReminderStatus
+    }
+
+
+def test_mailer_rate_limit(smtp_server: SMTPServer):
+    """
+    GIVEN a mailer limited to 20 messages per second
+    WHEN sending five messages
+    THEN it takes at least 0.2 seconds
+    """
+    with Mailer(
+        "127.0.0.1", smtp_server.server_address[1], "school@example.com", rate=20
+    ) as mailer:
+        start = time.monotonic()
+        for _ in range(5):
+            message = EmailMessage()
+            message["From"], message["To"] = "school@example.com", "ana@example.com"
+            message.set_content("Hello")
+            mailer.send(message)
+
+    assert time.monotonic() - start >= 0.2
+    assert len(smtp_server.messages) == 5
+
+
+def test_remind_cycle_post(client: FlaskClient, cycle):
+    """
+    GIVEN a logged in user and a cycle with two recipients to remind
+    WHEN posting the reminder form of the cycle
+    THEN their reminders are queued
+    """
+    login_user(UserFactory())
+
+    response = client.post(url_for("admin.remind_cycle_post", cycle_id=cycle.id))
+
+    assert response.status_code == 302
+    assert len(db.session.execute(select(Reminder)).scalars().all()) == 2
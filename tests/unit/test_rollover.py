@@ -0,0 +1,149 @@
+"""This module contains tests for rolling cycles over."""
+
+import pytest
+from sqlalchemy import select
+
+from app import db
+from app.models import AuditAction, AuditEntry, Class, Level, Student, SubLevel
+from app.rollover import (
+    PromotionRule,
+    RolloverError,
+    preview_rollover,
+    promote,
+    rollover_cycle,
+)
+from factories import ClassFactory, CycleFactory, StudentFactory
+
+
+@pytest.mark.parametrize(
+    "level,sub_level,expected",
+    [
+        pytest.param(
+            Level.L1, SubLevel.P1, (Level.L1, SubLevel.P2), id="next-sub-level"
+        ),
+        pytest.param(Level.L1, SubLevel.P4, (Level.L2, SubLevel.P1), id="next-level"),
+        pytest.param(Level.L3, SubLevel.P4, (Level.L3, SubLevel.P4), id="last"),
+    ],
+)
+def test_promote(level, sub_level, expected):
+    """
+    GIVEN a level and a sub level
+    WHEN promoting them
+    THEN the following level and sub level are returned
+    """
+    assert promote(level, sub_level) == expected
+
+
+@pytest.mark.parametrize("rule", list(PromotionRule))
+def test_rollover_cycle(app, rule):  # pylint: disable=unused-argument,too-many-locals
+    """
+    GIVEN a cycle with two classes, each of them with students, and an empty cycle
+    WHEN the first cycle is rolled over into the second one
+    THEN
+        - the preview lists both classes with their new level and student count
+        - the classes are cloned into the second cycle
+        - the students are enrolled in the clones
+    """
+    source = CycleFactory()
+    target = CycleFactory()
+    first = ClassFactory(cycle=source, level=Level.L1, sub_level=SubLevel.P4)
+    second = ClassFactory(cycle=source, level=Level.L2, sub_level=SubLevel.P1)
+    first_ids = [student.id for student in StudentFactory.create_batch(2, class_=first)]
+    second_ids = [StudentFactory(class_=second).id]
+
+    items = preview_rollover(source.id, target.id, rule)
+    count = rollover_cycle(source.id, target.id, rule)
+
+    expected = {
+        (Level.L1, SubLevel.P4): promote(Level.L1, SubLevel.P4),
+        (Level.L2, SubLevel.P1): promote(Level.L2, SubLevel.P1),
+    }
+    if rule == PromotionRule.KEEP:
+        expected = {key: key for key in expected}
+
+    assert count == 2
+    assert {
+        (item.level, item.sub_level): (item.new_level, item.new_sub_level)
+        for item in items
+    } == expected
+    assert sorted(item.students for item in items) == [1, 2]
+
+    for old_level, student_ids in [
+        ((Level.L1, SubLevel.P4), first_ids),
+        ((Level.L2, SubLevel.P1), second_ids),
+    ]:
+        new_level, new_sub_level = expected[old_level]
+        clone = db.session.execute(
+            select(Class).where(
+                (Class.cycle_id == target.id)
+                & (Class.level == new_level)
+                & (Class.sub_level == new_sub_level)
+            )
+        ).scalar_one()
+        assert sorted(
+            db.session.execute(select(Student.id).where(Student.class_id == clone.id))
+            .scalars()
+            .all()
+        ) == sorted(student_ids)
+
+
+def test_rollover_is_audited(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a cycle with a class of two students and an empty cycle
+    WHEN the first cycle is rolled over into the second one
+    THEN the clone of the class and the move of each student are audited
+    """
+    class_ = ClassFactory()
+    student_ids = [
+        student.id for student in StudentFactory.create_batch(2, class_=class_)
+    ]
+    target = CycleFactory()
+
+    rollover_cycle(class_.cycle_id, target.id, PromotionRule.KEEP)
+
+    clone_id = db.session.execute(
+        select(Class.id).where(Class.cycle_id == target.id)
+    ).scalar_one()
+    inserted = db.session.execute(
+        select(AuditEntry.row_id).where(
+            AuditEntry.table_name == "class", AuditEntry.action == AuditAction.INSERT
+        )
+    ).scalars()
+    moved = db.session.execute(
+        select(AuditEntry.row_id, AuditEntry.changes).where(
+            AuditEntry.table_name == "student", AuditEntry.action == AuditAction.UPDATE
+        )
+    ).all()
+    assert clone_id in inserted
+    assert sorted(moved) == [
+        (student_id, {"class_id": {"old": class_.id, "new": clone_id}})
+        for student_id in sorted(student_ids)
+    ]
+
+
+def test_rollover_into_cycle_with_classes(app):  # pylint: disable=unused-argument
+    """
+    GIVEN two cycles which have classes
+    WHEN rolling over the first cycle into the second one
+    THEN RolloverError is raised
+    """
+    source = ClassFactory().cycle
+    target = ClassFactory().cycle
+
+    with pytest.raises(RolloverError):
+        rollover_cycle(source.id, target.id, PromotionRule.KEEP)
+
+
+def test_rollover_locks_cycles_before_checking(statements):
+    """
+    GIVEN a cycle with a class and an empty cycle
+    WHEN rolling over the first cycle into the second one
+    THEN both cycles are locked before the second one is checked for classes
+    """
+    source_id, target_id = ClassFactory().cycle.id, CycleFactory().id
+
+    with statements() as executed:
+        rollover_cycle(source_id, target_id, PromotionRule.KEEP)
+
+    assert "FROM cycle" in executed[0] and executed[0].endswith("FOR UPDATE")
+    assert "EXISTS" in executed[1]
@@ -0,0 +1,181 @@
+"""This module contains tests for detecting schedule conflicts between classes."""
+
+import datetime
+
+import pytest
+from flask import url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import func, select
+
+from app import db
+from app.models import Class
+from app.schedule import ScheduleError, check_schedule, conflict_report
+from factories import ClassFactory, CycleFactory, UserFactory
+
+
+def _time(hour: int, minute: int = 0) -> datetime.time:
+    return datetime.time(hour, minute)
+
+
+@pytest.mark.parametrize(
+    "start_at,end_at,room,teacher,clashes",
+    [
+        pytest.param(_time(17, 30), _time(19), "A1", None, True, id="room-overlap"),
+        pytest.param(_time(16), _time(18, 30), None, "Ana", True, id="teacher-overlap"),
+        pytest.param(_time(18), _time(19), "A1", "Ana", False, id="back-to-back"),
+        pytest.param(_time(17), _time(18), "B2", "Luis", False, id="other-resources"),
+        pytest.param(_time(17), _time(18), None, None, False, id="no-resources"),
+    ],
+)
+def test_check_schedule(
+    app, start_at, end_at, room, teacher, clashes
+):  # pylint: disable=unused-argument,too-many-arguments
+    """
+    GIVEN a class taking room A1 and teacher Ana from 17H00 to 18H00
+    WHEN checking the schedule of another class of the same cycle
+    THEN ScheduleError is raised only if the classes share a resource at the
+        same time
+    """
+    class_ = ClassFactory(
+        start_at=_time(17), end_at=_time(18), room="A1", teacher="Ana"
+    )
+
+    if clashes:
+        with pytest.raises(ScheduleError):
+            check_schedule(class_.cycle_id, start_at, end_at, room, teacher)
+    else:
+        check_schedule(class_.cycle_id, start_at, end_at, room, teacher)
+
+
+def test_check_schedule_other_cycle_and_itself(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a class taking room A1 from 17H00 to 18H00
+    WHEN checking the same schedule in another cycle or for the class itself
+    THEN no ScheduleError is raised
+    """
+    class_ = ClassFactory(start_at=_time(17), end_at=_time(18), room="A1")
+    other_cycle = CycleFactory()
+
+    check_schedule(other_cycle.id, _time(17), _time(18), "A1", None)
+    check_schedule(
+        class_.cycle_id, _time(17), _time(18), "A1", None, class_id=class_.id
+    )
+
+
+def test_check_schedule_time_range(app):  # pylint: disable=unused-argument
+    """
+    GIVEN a cycle
+    WHEN checking a class that does not end after it starts
+    THEN ScheduleError is raised
+    """
+    cycle = CycleFactory()
+
+    with pytest.raises(ScheduleError):
+        check_schedule(cycle.id, _time(18), _time(17), None, None)
+
+
+def test_conflict_report(app):  # pylint: disable=unused-argument
+    """
+    GIVEN three classes of a cycle, two of them sharing a room and two of them
+        sharing a teacher at overlapping times, and a class of another cycle
+    WHEN reporting the conflicts of the cycle
+    THEN each clashing pair is reported once for the resource they share
+    """
+    cycle = CycleFactory()
+    first = ClassFactory(
+        cycle=cycle, start_at=_time(17), end_at=_time(19), room="A1", teacher="Ana"
+    )
+    second = ClassFactory(
+        cycle=cycle, start_at=_time(18), end_at=_time(20), room="A1", teacher="Luis"
+    )
+    third = ClassFactory(
+        cycle=cycle, start_at=_time(18, 30), end_at=_time(21), room="B2", teacher="Ana"
+    )
+    ClassFactory(start_at=_time(17), end_at=_time(19), room="A1", teacher="Ana")
+
+    conflicts = conflict_report(cycle.id)
+
+    assert [
+        (conflict.resource, conflict.value, conflict.first, conflict.second)
+        for conflict in conflicts
+    ] == [("room", "A1", first, second), ("teacher", "Ana", first, third)]
+
+
+def test_create_class_conflict(client: FlaskClient):
+    """
+    GIVEN a class taking room A1 from 17H00 to 18H00
+    WHEN creating a class of the same cycle in room A1 from 17H30 to 18H30
+    THEN the class is not created
+    """
+    login_user(UserFactory())
+    class_ = ClassFactory(start_at=_time(17), end_at=_time(18), room="A1")
+    data = {
+        "mode": class_.mode.name,
+        "start_at": "17:30",
+        "end_at": "18:30",
+        "room": " A1 ",
+        "teacher": "",
+        "cycle": class_.cycle_id,
+        "level": class_.level.name,
+        "sub_level": class_.sub_level.name,
+    }
+
+    response = client.post(
+        url_for("admin.create_class_post"), data=data, follow_redirects=True
+    )
+
+    assert response.status_code == 200
+    assert response.request.path == url_for("admin.create_class_get")
+    assert db.session.execute(select(func.count(Class.id))).scalar_one() == 1
+
+    data["room"] = "B2"
+    client.post(url_for("admin.create_class_post"), data=data)
+
+    created = db.session.execute(select(Class).where(Class.room == "B2")).scalar_one()
+    assert created.teacher is None
+    assert created.start_at == _time(17, 30)
+
+
+def test_class_conflicts_view(client: FlaskClient):
+    """
+    GIVEN two classes of a cycle sharing a teacher at overlapping times
+    WHEN the conflict report of the cycle is requested
+    THEN the teacher is listed
+    """
+    login_user(UserFactory())
+    cycle = CycleFactory()
+    ClassFactory.create_batch(
+        2, cycle=cycle, start_at=_time(17), end_at=_time(18), teacher="Ana"
+    )
+
+    response = client.get(url_for("admin.class_conflicts", cycle_id=cycle.id))
+
+    assert response.status_code == 200
+    assert b"Ana" in response.data
+
+
+def test_create_class_invalid_end_at(client: FlaskClient):
+    """
+    GIVEN a logged in user and a cycle
+    WHEN creating a class whose End At is not a valid time
+    THEN the form is shown again and the class is not created
+    """
+    login_user(UserFactory())
+    cycle = CycleFactory()
+    data = {
+        "mode": "NORMAL",
+        "start_at": "17:00",
+        "end_at": "25:99",
+        "cycle": cycle.id,
+        "level": "L1",
+        "sub_level": "P1",
+    }
+
+    response = client.post(
+        url_for("admin.create_class_post"), data=data, follow_redirects=True
+    )
+
+    assert response.status_code == 200
+    assert response.request.path == url_for("admin.create_class_get")
+    assert db.session.execute(select(func.count(Class.id))).scalar_one() == 0
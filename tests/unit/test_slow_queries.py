@@ -0,0 +1,121 @@
+"""This module contains tests for the slow query log."""
+
+import json
+import logging
+import os
+
+import pytest
+from flask import Flask, url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import select
+
+from app import db
+from app.models import Student
+from app.slow_queries import ProcessRotatingFileHandler, _parameters
+from factories import UserFactory
+
+
+@pytest.fixture(name="log_path")
+def fixture_log_path(app: Flask, tmp_path, monkeypatch):
+    """Log every statement of the test to a temporary file."""
+    slow_query_log = app.extensions["slow_queries"]
+    logger = logging.getLogger("tests.slow_queries")
+    logger.propagate = False
+    handler = logging.FileHandler(tmp_path / "slow_queries.log")
+    logger.addHandler(handler)
+    monkeypatch.setattr(slow_query_log, "logger", logger)
+    monkeypatch.setattr(slow_query_log, "threshold", 0)
+    yield tmp_path / "slow_queries.log"
+    logger.removeHandler(handler)
+    handler.close()
+
+
+def entries(app: Flask, path) -> list[dict]:
+    """Wait for pending plans and return the entries logged to path."""
+    app.extensions["slow_queries"].wait()
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.mark.parametrize("analyze", [False, True])
+def test_slow_query_is_explained(app, log_path, monkeypatch, analyze):
+    """
+    GIVEN a threshold every statement exceeds
+    WHEN a query is executed
+    THEN it is logged along with its parameters and its plan
+    """
+    monkeypatch.setattr(app.extensions["slow_queries"], "analyze", analyze)
+
+    db.session.execute(select(Student).where(Student.first_name == "Ana")).all()
+
+    (entry,) = [
+        entry
+        for entry in entries(app, log_path)
+        if "FROM student" in entry["statement"]
+    ]
+    assert entry["parameters"] == {"first_name_1": "'Ana'"}
+    assert entry["analyze"] is analyze
+    assert "Seq Scan on student" in entry["plan"]
+    assert ("actual time" in entry["plan"]) is analyze
+
+
+def test_slow_query_endpoint(client: FlaskClient, log_path):
+    """
+    GIVEN a threshold every statement exceeds
+    WHEN a page is requested
+    THEN its statements are logged along with its endpoint
+    """
+    login_user(UserFactory())
+
+    client.get(url_for("admin.payment_table"))
+
+    assert any(
+        entry["endpoint"] == "admin.payment_table"
+        and "FROM payment" in entry["statement"]
+        for entry in entries(client.application, log_path)
+    )
+
+
+def test_fast_queries_are_not_logged(app, log_path, monkeypatch):
+    """
+    GIVEN a threshold no statement exceeds
+    WHEN a query is executed
+    THEN nothing is logged
+    """
+    monkeypatch.setattr(app.extensions["slow_queries"], "threshold", 60_000)
+
+    db.session.execute(select(Student)).all()
+
+    assert not log_path.exists() or not entries(app, log_path)
+
+
+def test_parameters_are_truncated():
+    """
+    GIVEN parameters with a long value
+    WHEN they are prepared for the log
+    THEN the long value is truncated
+    """
+    parameters = _parameters({"id": 1, "name": "x" * 1000, "ids": (1, 2)})
+
+    assert parameters["id"] == 1
+    assert len(parameters["name"]) == 200
+    assert parameters["ids"] == [1, 2]
+
+
+def test_each_process_writes_its_own_log(tmp_path, monkeypatch):
+    """
+    GIVEN a log handler created by a process
+    WHEN the process, then a process forked from it, log a record
+    THEN each record is written to the log file of its process
+    """
+    handler = ProcessRotatingFileHandler(tmp_path / "slow_queries.log", 1024, 3)
+    record = logging.makeLogRecord({"msg": "slow"})
+    parent = os.getpid()
+
+    handler.emit(record)
+    monkeypatch.setattr(os, "getpid", lambda: parent + 1)
+    handler.emit(record)
+    handler.close()
+
+    for pid in (parent, parent + 1):
+        assert (tmp_path / f"slow_queries.{pid}.log").read_text() == "slow\n"
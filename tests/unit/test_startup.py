@@ -0,0 +1,77 @@
+"""This module contains tests for the import time of the Flask app."""
+
+import os
+import subprocess
+import sys
+
+# modules that are only needed by the shell or the test suite
+SHELL_ONLY_MODULES = ["factory", "faker", "flask_debugtoolbar"]
+IMPORT_TIME_BUDGET_US = int(os.getenv("IMPORT_TIME_BUDGET_US", "1500000"))
+# imports measured at most, since other tests, e.g. xdist workers, compete
+# for the CPU and slow a single import down
+IMPORT_TIME_ATTEMPTS = 5
+
+
+def import_times(module: str) -> dict[str, int]:
+    """
+    Import module in a fresh interpreter using `-X importtime` and return
+    the cumulative import time, in microseconds, of every imported module.
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        check=True,
+        text=True,
+    )
+    times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        _, cumulative, name = line.removeprefix("import time:").split("|")
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def test_school_does_not_import_shell_only_modules():
+    """
+    GIVEN the `school` module
+    WHEN it is imported
+    THEN no shell-only module is imported
+    """
+    times = import_times("school")
+    imported = {name.split(".")[0] for name in times}
+
+    assert imported.isdisjoint(SHELL_ONLY_MODULES)
+
+
+def test_school_import_time_is_within_budget():
+    """
+    GIVEN the `school` module
+    WHEN it is imported, again while it is over the budget
+    THEN its fastest cumulative import time is within the budget
+    """
+    fastest = None
+    for _ in range(IMPORT_TIME_ATTEMPTS):
+        time = import_times("school")["school"]
+        fastest = time if fastest is None else min(fastest, time)
+        if fastest < IMPORT_TIME_BUDGET_US:
+            break
+
+    assert fastest < IMPORT_TIME_BUDGET_US
+
+
+def test_config_import_does_not_read_settings():
+    """
+    GIVEN invalid settings in the environment
+    WHEN the `config` module is imported
+    THEN it is imported, the settings are only read by `Config()`
+    """
+    result = subprocess.run(
+        [sys.executable, "-c", "import config"],
+        capture_output=True,
+        check=False,
+        env=os.environ
+        | {"BRANCH_DATABASES": "{", "SIBLING_DISCOUNTS": "{", "MAIL_PORT": "x"},
+    )
+
+    assert result.returncode == 0, result.stderr
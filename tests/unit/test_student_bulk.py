@@ -0,0 +1,82 @@
+"""This module contains tests for the bulk actions over students."""
+
+from flask import url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy import select
+
+from app import db
+from app.models import Student
+from factories import ClassFactory, PaymentFactory, StudentFactory, UserFactory
+
+
+def test_bulk_assign_students(client: FlaskClient):
+    """
+    GIVEN three students and a class
+    WHEN two of the students are moved to the class in bulk
+    THEN only the selected students belong to the class
+    """
+    login_user(UserFactory())
+    students = StudentFactory.create_batch(3)
+    class_ = ClassFactory()
+    selected = [students[0].id, students[1].id]
+
+    url = url_for("admin.bulk_assign_students")
+    response = client.post(
+        url, data={"student_ids": selected, "class_": class_.id}, follow_redirects=True
+    )
+
+    assert response.status_code == 200
+    assert response.request.path == url_for("admin.student_table")
+    assert set(
+        db.session.execute(select(Student.id).where(Student.class_id == class_.id))
+        .scalars()
+        .all()
+    ) == set(selected)
+
+
+def test_bulk_detach_students(client: FlaskClient):
+    """
+    GIVEN two students enrolled in a class
+    WHEN both students are detached in bulk
+    THEN the class has no students
+    """
+    login_user(UserFactory())
+    class_ = ClassFactory()
+    students = StudentFactory.create_batch(2, class_=class_)
+
+    url = url_for("admin.bulk_detach_students")
+    client.post(url, data={"student_ids": [student.id for student in students]})
+
+    assert (
+        db.session.execute(select(Student.id).where(Student.class_id == class_.id))
+        .scalars()
+        .all()
+        == []
+    )
+
+
+def test_bulk_delete_students(client: FlaskClient):
+    """
+    GIVEN two students without payments and one student with a payment
+    WHEN
+        - the students without payments are deleted in bulk
+        - the student with a payment is deleted in bulk
+    THEN
+        - the students without payments are deleted
+        - the student with a payment is kept
+    """
+    login_user(UserFactory())
+    students = StudentFactory.create_batch(2)
+    payment = PaymentFactory()
+
+    url = url_for("admin.bulk_delete_students")
+    client.post(url, data={"student_ids": [student.id for student in students]})
+    response = client.post(
+        url, data={"student_ids": [payment.student_id]}, follow_redirects=True
+    )
+
+    assert response.status_code == 200
+    assert db.session.execute(select(Student.id)).scalars().all() == [
+        payment.student_id
+    ]
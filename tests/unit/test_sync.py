@@ -0,0 +1,190 @@
+"""This module contains tests for the sync view function of `api` blueprint."""
+
+import pytest
+from flask import url_for
+from flask.testing import FlaskClient
+from sqlalchemy import select
+
+from app import db
+from app.models import Representative, Student
+from factories import RepresentativeFactory, StudentFactory
+
+
+def representative_record(document: str, **kwargs) -> dict:
+    """Return a representative record as sent by the registry."""
+    return {
+        "identity_document": document,
+        "first_name": "Jane",
+        "first_surname": "Doe",
+        "sex": "FEMALE",
+        "phone_number": "+593987654321",
+    } | kwargs
+
+
+def student_record(document: str, **kwargs) -> dict:
+    """Return a student record as sent by the registry."""
+    return {
+        "identity_document": document,
+        "first_name": "John",
+        "first_surname": "Doe",
+        "sex": "MALE",
+        "email": f"{document}@example.com",
+        "birth_date": "2010-05-01",
+    } | kwargs
+
+
+def test_sync_without_token_is_unauthorized(api_client: FlaskClient):
+    """
+    GIVEN a configured API token
+    WHEN syncing without the token
+    THEN the response status code is 401
+    """
+    response = api_client.post(url_for("api.sync"), json={})
+
+    assert response.status_code == 401
+
+
+def test_sync_upserts_records(api_client: FlaskClient, api_headers: dict[str, str]):
+    """
+    GIVEN an existing representative and an existing student
+    WHEN syncing
+        - the existing representative and a new one
+        - the existing student, a new student linked to the new
+          representative and an invalid student
+    THEN
+        - existing records are updated and new records are created
+        - the new student is linked to the new representative
+        - the invalid student is reported with its errors
+    """
+    existing_representative = RepresentativeFactory()
+    existing_student = StudentFactory()
+    payload = {
+        "representatives": [
+            representative_record(
+                existing_representative.identity_document, first_name="Updated"
+            ),
+            representative_record("0900000001"),
+        ],
+        "students": [
+            student_record(existing_student.identity_document, first_name="Updated"),
+            student_record("1700000001", representative_identity_document="0900000001"),
+            student_record("1700000002", sex="OTHER"),
+        ],
+    }
+
+    response = api_client.post(
+        url_for("api.sync"),
+        json=payload,
+        headers=api_headers,
+    )
+
+    assert response.status_code == 200
+    assert [outcome["status"] for outcome in response.json["representatives"]] == [
+        "updated",
+        "created",
+    ]
+    assert [outcome["status"] for outcome in response.json["students"]] == [
+        "updated",
+        "created",
+        "invalid",
+    ]
+    assert "sex" in response.json["students"][2]["errors"]
+
+    db.session.expire_all()
+    assert existing_representative.first_name == "Updated"
+    assert existing_student.first_name == "Updated"
+    student = db.session.execute(
+        select(Student).where(Student.identity_document == "1700000001")
+    ).scalar_one()
+    assert (
+        student.representative
+        == db.session.execute(
+            select(Representative).where(
+                Representative.identity_document == "0900000001"
+            )
+        ).scalar_one()
+    )
+
+
+def test_sync_reports_constraint_errors_per_record(
+    api_client: FlaskClient, api_headers: dict[str, str]
+):
+    """
+    GIVEN an existing student
+    WHEN syncing a new student with the same email and another new student
+    THEN
+        - the student with the repeated email is reported as an error
+        - the other student is created
+    """
+    existing_student = StudentFactory()
+
+    response = api_client.post(
+        url_for("api.sync"),
+        json={
+            "students": [
+                student_record("1700000001", email=existing_student.email),
+                student_record("1700000002"),
+            ]
+        },
+        headers=api_headers,
+    )
+
+    assert [outcome["status"] for outcome in response.json["students"]] == [
+        "error",
+        "created",
+    ]
+
+
+def test_sync_reports_long_fields_per_record(
+    api_client: FlaskClient, api_headers: dict[str, str]
+):
+    """
+    GIVEN a representative with a too long identity document
+    WHEN syncing it and another representative
+    THEN the long document is reported as invalid and the other one created
+    """
+    response = api_client.post(
+        url_for("api.sync"),
+        json={
+            "representatives": [
+                representative_record("0" * 300),
+                representative_record("0900000001"),
+            ]
+        },
+        headers=api_headers,
+    )
+
+    assert response.status_code == 200
+    outcomes = response.json["representatives"]
+    assert [outcome["status"] for outcome in outcomes] == ["invalid", "created"]
+    assert "identity_document" in outcomes[0]["errors"]
+
+
+def test_sync_reports_database_errors_per_record(
+    api_client: FlaskClient,
+    monkeypatch: pytest.MonkeyPatch,
+    api_headers: dict[str, str],
+):
+    """
+    GIVEN a representative refused by the database, not by validation
+    WHEN syncing it and another representative
+    THEN it is reported as an error and the other one is created
+    """
+    monkeypatch.setattr("app.sync.column_lengths", lambda model: {})
+
+    response = api_client.post(
+        url_for("api.sync"),
+        json={
+            "representatives": [
+                representative_record("0" * 300),
+                representative_record("0900000001"),
+            ]
+        },
+        headers=api_headers,
+    )
+
+    assert response.status_code == 200
+    assert [outcome["status"] for outcome in response.json["representatives"]] == [
+        "error",
+        "created",
+    ]
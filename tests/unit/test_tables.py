@@ -0,0 +1,108 @@
+"""This module contains tests for the table query layer of `admin` blueprint."""
+
+import pytest
+from flask import url_for
+from flask.testing import FlaskClient
+from flask_login import login_user
+from sqlalchemy_utils import PhoneNumberType
+
+from app import db
+from app.admin.tables import TableQuery, class_table_query
+from app.models import Level, Mode, Student
+from factories import ClassFactory, RepresentativeFactory, StudentFactory, UserFactory
+
+
+def test_unindexed_sort_column_is_rejected():
+    """
+    GIVEN a column which is not indexed
+    WHEN defining a table query sortable by that column
+    THEN ValueError is raised
+    """
+    with pytest.raises(ValueError):
+        TableQuery(model=Student, sortable={"second_name": Student.second_name})
+
+
+def test_class_table_query_filters_and_sorts(app):  # pylint: disable=unused-argument
+    """
+    GIVEN classes of different modes and levels
+    WHEN selecting intensive L2 classes sorted by id ascending
+    THEN only those classes are returned, in ascending order
+    """
+    expected = [
+        ClassFactory(mode=Mode.INTENSIVE, level=Level.L2).id,
+        ClassFactory(mode=Mode.INTENSIVE, level=Level.L2).id,
+    ]
+    ClassFactory(mode=Mode.NORMAL, level=Level.L2)
+    ClassFactory(mode=Mode.INTENSIVE, level=Level.L1)
+
+    args = {"mode": "INTENSIVE", "level": "L2", "sort": "id", "direction": "asc"}
+    statement, table = class_table_query.select(args)
+
+    assert [class_.id for class_ in db.session.scalars(statement)] == expected
+    assert table.values == {"mode": "INTENSIVE", "level": "L2"}
+    assert table.sort_args("id")["direction"] == "desc"
+
+
+@pytest.mark.parametrize(
+    "query_string",
+    [
+        pytest.param({"sort": "end_at"}, id="unknown-sort"),
+        pytest.param({"direction": "sideways"}, id="unknown-direction"),
+        pytest.param({"level": "L9"}, id="invalid-filter-value"),
+    ],
+)
+def test_invalid_table_query_is_bad_request(client: FlaskClient, query_string):
+    """
+    GIVEN a logged in user
+    WHEN requesting the class table with an invalid sort or filter
+    THEN the response status code is 400
+    """
+    login_user(UserFactory())
+    response = client.get(url_for("admin.class_table", **query_string))
+
+    assert response.status_code == 400
+
+
+def test_class_table_renders_filtered_rows(client: FlaskClient):
+    """
+    GIVEN a logged in user and classes of different modes
+    WHEN requesting the class table filtered by mode
+    THEN only classes of that mode are listed
+    """
+    login_user(UserFactory())
+    ClassFactory(mode=Mode.INTENSIVE)
+    ClassFactory(mode=Mode.NORMAL)
+
+    response = client.get(url_for("admin.class_table", mode="NORMAL"))
+
+    assert response.status_code == 200
+    assert response.data.count(b"<td>Normal</td>") == 1
+    assert b"<td>Intensive</td>" not in response.data
+
+
+def test_people_tables_do_not_parse_phone_numbers(
+    client: FlaskClient, monkeypatch: pytest.MonkeyPatch
+):
+    """
+    GIVEN a logged in user and a student whose representative has a phone number
+    WHEN requesting the student and representative tables
+    THEN
+        - no stored phone number is parsed into a PhoneNumber
+        - phone numbers are displayed in national format
+    """
+    login_user(UserFactory())
+    representative = RepresentativeFactory(phone_number="+12025550143")
+    StudentFactory(representative=representative, phone_number="+12025550178")
+    db.session.expire_all()
+
+    def fail(*args):
+        raise AssertionError("A phone number was parsed.")
+
+    monkeypatch.setattr(PhoneNumberType, "process_result_value", fail)
+    student_response = client.get(url_for("admin.student_table"))
+    representative_response = client.get(url_for("admin.representative_table"))
+
+    assert student_response.status_code == 200
+    assert "(202) 555-0178" in student_response.text
+    assert representative_response.status_code == 200
+    assert "(202) 555-0143" in representative_response.text
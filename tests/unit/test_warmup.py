@@ -0,0 +1,45 @@
+"""This module contains tests for warming the app up in pre-fork servers."""
+
+from unittest import mock
+
+from app import db
+from app.dashboard import dashboard_cache
+from app.warmup import dispose_engine, warm_templates, warm_worker
+
+
+def test_warm_templates(app):
+    """
+    GIVEN the app
+    WHEN its templates are warmed up
+    THEN every template is compiled into the cache of its environment
+    """
+    count = warm_templates(app)
+
+    assert count == len(app.jinja_env.list_templates(extensions=["jinja"]))
+    assert "admin/index.html.jinja" in {name for _, name in app.jinja_env.cache}
+
+
+def test_dispose_engine(app):
+    """
+    GIVEN the app
+    WHEN its engine is disposed after a fork
+    THEN its pool is replaced without closing the inherited connections
+    """
+    with mock.patch.object(db.engine, "dispose") as dispose:
+        dispose_engine(app)
+
+    dispose.assert_called_once_with(close=False)
+
+
+def test_warm_worker(app):
+    """
+    GIVEN the app and an empty dashboard cache
+    WHEN a worker is warmed up
+    THEN the dashboard is cached
+    """
+    dashboard_cache.clear()
+
+    warm_worker(app)
+
+    assert dashboard_cache._values  # pylint: disable=protected-access
+    dashboard_cache.clear()
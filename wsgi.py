@@ -0,0 +1,11 @@
+"""
+In this module, a Flask app is created for WSGI servers, e.g. gunicorn,
+see `gunicorn.conf.py`. Unlike `school`, it has no shell context and
+compiles the templates up front, so they are shared by forked workers.
+"""
+
+from app import create_app
+from app.warmup import warm_templates
+
+app = create_app()
+warm_templates(app)